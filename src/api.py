@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Read-only HTTP API over the sale state.
+
+Serves the current ``sale_state.json`` (joined with its
+``sale_state.volatile.json`` run data) from memory for dashboards and
+scripts, without running any scrapers:
+
+  GET /active         Stores with an active sale
+  GET /store/{name}   One store's entry (or a multi-section store's summary)
+  GET /history        Every recorded sale, most recently seen first
+
+Responses are JSON with an ``ETag``; a request with a matching
+``If-None-Match`` gets ``304 Not Modified``. The state files are checked for
+changes at most once per ``--reload-interval`` seconds, and only stores
+whose entry changed are re-serialized.
+
+Examples:
+  python src/api.py --port 8080
+  python src/main.py serve --port 8080
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import unquote, urlparse
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.state import join_state
+
+
+class Response:
+    """A serialized JSON body and its ETag."""
+
+    __slots__ = ("body", "etag")
+
+    def __init__(self, data: object):
+        self.body = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:16] + '"'
+
+
+class StateIndex:
+    """
+    In-memory view of the sale state with pre-serialized responses.
+
+    Args:
+        state_file: Path to sale_state.json
+        reload_interval: Minimum seconds between checks of the files
+        volatile_file: Its run data (default: next to ``state_file``)
+    """
+
+    def __init__(
+        self,
+        state_file: str = "sale_state.json",
+        reload_interval: float = 1.0,
+        volatile_file: Optional[str] = None,
+    ):
+        self.state_file = Path(state_file)
+        self.volatile_file = (
+            Path(volatile_file)
+            if volatile_file
+            else self.state_file.with_name(f"{self.state_file.stem}.volatile.json")
+        )
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._signature: Optional[tuple] = None
+        self._checked = 0.0
+        self.last_check: Optional[str] = None
+        self._store_data: dict[str, dict] = {}
+        self._store_responses: dict[str, Response] = {}
+        self._lookup: dict[str, str] = {}
+        self.active: Response = Response({})
+        self.history: Response = Response([])
+        self.reloads = 0
+        self.refresh(force=True)
+
+    @staticmethod
+    def _read(path: Path) -> Optional[dict]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, IOError):
+            return None
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reload the state if either file changed since the last load.
+
+        Returns:
+            True if anything was reloaded
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._checked < self.reload_interval:
+                return False
+            self._checked = now
+            signature = (self._stat(self.state_file), self._stat(self.volatile_file))
+            if signature == self._signature and not force:
+                return False
+            durable = self._read(self.state_file)
+            if durable is None:
+                # Missing or being replaced: keep serving what we have
+                return False
+            self._signature = signature
+            self._apply(join_state(durable, self._read(self.volatile_file) or {}))
+            self.reloads += 1
+            return True
+
+    def _apply(self, state: dict) -> None:
+        sales = state.get("sales", {})
+        stores = state.get("stores", {})
+
+        # Re-serialize only the entries that changed
+        for name in set(self._store_responses) - set(sales) - set(stores):
+            del self._store_responses[name]
+            del self._store_data[name]
+        for name in set(sales) | set(stores):
+            data = {"store_name": name, **sales.get(name, {})}
+            summary = stores.get(name)
+            if summary is not None:
+                data.update({k: v for k, v in summary.items() if k != "sections"})
+                data["sections"] = {section: sales.get(section) for section in summary.get("sections", [])}
+            if data != self._store_data.get(name):
+                self._store_data[name] = data
+                self._store_responses[name] = Response(data)
+
+        self.last_check = state.get("last_check")
+        self._lookup = {name.lower(): name for name in self._store_responses}
+        active = {name: info for name, info in sales.items() if info.get("active", False)}
+        self.active = Response({"count": len(active), "last_check": self.last_check, "sales": active})
+        history = sorted(
+            ({"store_name": name, **info} for name, info in sales.items()),
+            key=lambda e: max(e.get("last_seen") or "", e.get("ended") or ""),
+            reverse=True,
+        )
+        self.history = Response(history)
+
+    def store(self, name: str) -> Optional[Response]:
+        key = self._lookup.get(name.lower())
+        return self._store_responses.get(key) if key else None
+
+
+def make_handler(index: StateIndex) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are separate writes; don't let Nagle delay keep-alive replies
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def _send(self, status: int, response: Optional[Response] = None) -> None:
+            body = response.body if response is not None and status == 200 else b""
+            if status == 404:
+                body = b'{"error": "not found"}'
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-cache")
+            if response is not None:
+                self.send_header("ETag", response.etag)
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            index.refresh()
+            path = urlparse(self.path).path.rstrip("/")
+            if path == "/active":
+                response = index.active
+            elif path == "/history":
+                response = index.history
+            elif path.startswith("/store/"):
+                response = index.store(unquote(path[len("/store/"):]))
+            else:
+                response = None
+
+            if response is None:
+                self._send(404)
+            elif self.headers.get("If-None-Match") == response.etag:
+                self._send(304, response)
+            else:
+                self._send(200, response)
+
+        do_HEAD = do_GET
+
+    return Handler
+
+
+def serve(
+    state_file: str = "sale_state.json",
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    reload_interval: float = 1.0,
+) -> None:
+    """Serve the state until interrupted."""
+    index = StateIndex(state_file, reload_interval)
+    server = ThreadingHTTPServer((host, port), make_handler(index))
+    server.daemon_threads = True
+    print(f"🌐 Serving {state_file} on http://{host}:{server.server_address[1]} (/active, /store/<name>, /history)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-only HTTP API over the sale state")
+    parser.add_argument("--state-file", default="sale_state.json", help="State file (default: sale_state.json)")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Port (default: 8080)")
+    parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=1.0,
+        help="Check the state file for changes at most this often, in seconds (default: 1)",
+    )
+    args = parser.parse_args()
+    serve(args.state_file, args.host, args.port, args.reload_interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Load test the sale checker against a local farm of synthetic storefronts.
+
+Starts an HTTP server on localhost hosting generated stores with
+controllable sale state, page size, JS-rendered variants, latency and
+error rate, generates scrapers pointing at it and runs the real
+``check_all_stores``/``SaleState``/ntfy code paths at growing store counts.
+
+Examples:
+  python src/loadtest.py --stores 100,1000,3000
+  python src/loadtest.py --stores 2000 --latency-ms 80 --error-rate 0.02 --concurrency 32
+  python src/loadtest.py --stores 1000 --workers 4
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.main import check_all_stores
+from src.notifiers import NtfyNotifier
+from src.scrapers import BaseScraper, DetectionPool
+from src.utils import SaleState
+
+FILLER = (
+    "<p class='copy'>Nya plagg varje vecka i butik och online. Fri frakt över 500 kr, "
+    "30 dagars öppet köp och snabba leveranser till hela Sverige.</p>\n"
+)
+
+
+class StoreSpec:
+    """Generated behaviour of one synthetic store."""
+
+    __slots__ = ("index", "on_sale", "discount", "page_bytes", "js_rendered")
+
+    def __init__(self, index: int, on_sale: bool, discount: int, page_bytes: int, js_rendered: bool):
+        self.index = index
+        self.on_sale = on_sale
+        self.discount = discount
+        self.page_bytes = page_bytes
+        self.js_rendered = js_rendered
+
+
+class StorefrontFarm:
+    """
+    Local HTTP server with ``count`` synthetic storefronts.
+
+    Store ``i`` serves its main page at ``/store/i/`` and its sale page at
+    ``/store/i/sale``. ``POST /ntfy`` accepts notifications like ntfy.sh.
+
+    Args:
+        count: Number of stores
+        seed: Seed for the generated store behaviour
+        sale_ratio: Share of stores with an active sale
+        page_kb: (min, max) main page size in kB
+        js_ratio: Share of stores whose content is rendered by JavaScript
+        latency_ms: Mean response delay
+        error_rate: Share of requests answered with 503
+    """
+
+    def __init__(
+        self,
+        count: int,
+        seed: int = 0,
+        sale_ratio: float = 0.3,
+        page_kb: tuple[int, int] = (20, 300),
+        js_ratio: float = 0.1,
+        latency_ms: float = 0.0,
+        error_rate: float = 0.0,
+    ):
+        self.rng = random.Random(seed)
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        self.specs = [
+            StoreSpec(
+                index=i,
+                on_sale=self.rng.random() < sale_ratio,
+                discount=self.rng.choice([20, 30, 40, 50, 60, 70]),
+                page_bytes=self.rng.randint(*page_kb) * 1000,
+                js_rendered=self.rng.random() < js_ratio,
+            )
+            for i in range(count)
+        ]
+        self.requests = 0
+        self.bytes_served = 0
+        self.notifications: list[dict] = []
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def flip(self, fraction: float) -> int:
+        """Toggle the sale state of a random share of stores; returns how many."""
+        flipped = self.rng.sample(self.specs, int(len(self.specs) * fraction))
+        for spec in flipped:
+            spec.on_sale = not spec.on_sale
+        return len(flipped)
+
+    def main_page(self, spec: StoreSpec) -> str:
+        if spec.on_sale:
+            header = (
+                f"<header><div class='banner'>REA upp till {spec.discount}% rabatt</div>"
+                f"<nav><a href='/store/{spec.index}/sale'>Rea</a><a href='/store/{spec.index}/new'>Nyheter</a></nav></header>"
+            )
+        else:
+            header = f"<header><nav><a href='/store/{spec.index}/new'>Nyheter</a></nav></header>"
+        filler = FILLER * max(1, spec.page_bytes // len(FILLER.encode("utf-8")))
+        if spec.js_rendered:
+            body = f"<div id='app'></div><script>document.getElementById('app').innerHTML = {json.dumps(header)};</script>"
+        else:
+            body = header
+        return f"<html><head><title>Store {spec.index}</title></head><body>{body}<main>{filler}</main></body></html>"
+
+    def sale_page(self, spec: StoreSpec) -> str:
+        count = 24 if spec.on_sale and not spec.js_rendered else 2
+        cards = "".join(
+            f"<div class='product'><a href='/p/{spec.index}/{n}'>Plagg {n}</a> <s>999 kr</s> 499 kr</div>"
+            for n in range(count)
+        )
+        return f"<html><body><h1>Rea</h1>{cards}</body></html>"
+
+    def _handler(self) -> type:
+        farm = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def _reply(self, status: int, body: str, content_type: str = "text/html; charset=utf-8") -> None:
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                with farm._lock:
+                    farm.requests += 1
+                    farm.bytes_served += len(data)
+
+            def do_GET(self) -> None:
+                if farm.latency:
+                    time.sleep(random.expovariate(1 / farm.latency))
+                if farm.error_rate and random.random() < farm.error_rate:
+                    self._reply(503, "Service Unavailable", "text/plain")
+                    return
+                parts = self.path.strip("/").split("/")
+                if len(parts) < 2 or parts[0] != "store" or not parts[1].isdigit():
+                    self._reply(404, "Not Found", "text/plain")
+                    return
+                index = int(parts[1])
+                if index >= len(farm.specs):
+                    self._reply(404, "Not Found", "text/plain")
+                    return
+                spec = farm.specs[index]
+                if len(parts) == 2:
+                    self._reply(200, farm.main_page(spec))
+                elif parts[2] == "sale":
+                    self._reply(200, farm.sale_page(spec))
+                else:
+                    self._reply(404, "Not Found", "text/plain")
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with farm._lock:
+                    farm.notifications.append(payload)
+                self._reply(200, "{}", "application/json")
+
+        return Handler
+
+    def start(self) -> str:
+        """Start serving in a background thread and return the base URL."""
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def generate_scrapers(farm: StorefrontFarm) -> list[BaseScraper]:
+    """Scraper definitions for every store in the farm."""
+    return [
+        BaseScraper(
+            name=f"Synthetic {spec.index:05d}",
+            base_url=f"{farm.url}/store/{spec.index}/",
+            sale_path=f"/store/{spec.index}/sale",
+            use_playwright=False,
+            platform="synthetic",
+        )
+        for spec in farm.specs
+    ]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process so far (Linux reports kB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1000
+
+
+def score(farm: StorefrontFarm, results: dict[str, dict]) -> dict:
+    """Compare detected sales with the farm's ground truth."""
+    counts = {"correct": 0, "missed": 0, "missed_js": 0, "false_alarm": 0, "errors": 0}
+    for spec in farm.specs:
+        result = results.get(f"Synthetic {spec.index:05d}", {})
+        if "error" in result or not result:
+            counts["errors"] += 1
+        elif result.get("active") == spec.on_sale:
+            counts["correct"] += 1
+        elif spec.on_sale:
+            counts["missed_js" if spec.js_rendered else "missed"] += 1
+        else:
+            counts["false_alarm"] += 1
+    return counts
+
+
+def run_round(
+    farm: StorefrontFarm,
+    scrapers: list[BaseScraper],
+    state: SaleState,
+    concurrency: int,
+) -> dict:
+    """One full check of every store, then state save and notification."""
+    results: dict[str, dict] = {}
+    requests_before, bytes_before = farm.requests, farm.bytes_served
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        new_sales = check_all_stores(
+            state, scrapers=scrapers, results=results, concurrency=concurrency
+        )
+    check_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    state.save()
+    save_seconds = time.perf_counter() - started
+
+    ntfy = NtfyNotifier("loadtest")
+    ntfy.base_url = f"{farm.url}/ntfy"
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ntfy.send_sale_alert(new_sales)
+    notify_seconds = time.perf_counter() - started
+
+    return {
+        "stores": len(scrapers),
+        "seconds": round(check_seconds, 2),
+        "stores_per_second": round(len(scrapers) / check_seconds, 1),
+        "requests": farm.requests - requests_before,
+        "mb_served": round((farm.bytes_served - bytes_before) / 1_000_000, 1),
+        "new_sales": len(new_sales),
+        "state_kb": round((state.state_file.stat().st_size + state.volatile_file.stat().st_size) / 1000, 1),
+        "save_ms": round(save_seconds * 1000, 1),
+        "notify_ms": round(notify_seconds * 1000, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        **score(farm, results),
+    }
+
+
+def run_load_test(
+    store_counts: list[int],
+    concurrency: int = 16,
+    workers: int = 0,
+    flip: float = 0.1,
+    **farm_options,
+) -> list[dict]:
+    """
+    Run two rounds per store count: a cold run and one after ``flip`` of
+    the stores changed sale state.
+
+    Returns:
+        One report row per round
+    """
+    rows = []
+    for count in store_counts:
+        farm = StorefrontFarm(count, **farm_options)
+        farm.start()
+        pool = DetectionPool(workers) if workers > 0 else None
+        try:
+            scrapers = generate_scrapers(farm)
+            for scraper in scrapers:
+                scraper.detection_pool = pool
+            with tempfile.TemporaryDirectory() as tmp:
+                state = SaleState(str(Path(tmp) / "sale_state.json"))
+                rows.append({"round": "cold", **run_round(farm, scrapers, state, concurrency)})
+                changed = farm.flip(flip)
+                row = run_round(farm, scrapers, state, concurrency)
+                rows.append({"round": f"{changed} flipped", **row})
+        finally:
+            if pool is not None:
+                pool.close()
+            farm.stop()
+    return rows
+
+
+def print_report(rows: list[dict]) -> None:
+    columns = [
+        ("stores", "stores"), ("round", "round"), ("seconds", "secs"),
+        ("stores_per_second", "stores/s"), ("requests", "reqs"), ("mb_served", "MB"),
+        ("peak_rss_mb", "RSS MB"), ("state_kb", "state kB"), ("save_ms", "save ms"),
+        ("notify_ms", "ntfy ms"), ("new_sales", "new"), ("correct", "ok"),
+        ("missed", "missed"), ("missed_js", "js"), ("false_alarm", "false"), ("errors", "errors"),
+    ]
+    widths = [max(len(title), *(len(str(row[key])) for row in rows)) for key, title in columns]
+    print("  ".join(title.rjust(w) for (_, title), w in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(row[key]).rjust(w) for (key, _), w in zip(columns, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load test the checker against synthetic storefronts",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("Examples:")[1] if "Examples:" in __doc__ else None,
+    )
+    parser.add_argument("--stores", type=str, default="100,500,1000", help="Comma-separated store counts")
+    parser.add_argument("--concurrency", type=int, default=16, help="Stores checked at once (default: 16)")
+    parser.add_argument("--workers", type=int, default=0, help="Detection worker processes (default: 0, inline)")
+    parser.add_argument("--sale-ratio", type=float, default=0.3, help="Share of stores on sale (default: 0.3)")
+    parser.add_argument("--js-ratio", type=float, default=0.1, help="Share of JS-rendered stores (default: 0.1)")
+    parser.add_argument("--page-kb", type=str, default="20-300", help="Main page size range in kB (default: 20-300)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Mean response delay (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0, help="Share of 503 responses (default: 0)")
+    parser.add_argument("--flip", type=float, default=0.1, help="Share of stores changing state between rounds")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated stores")
+    parser.add_argument("--json", type=str, help="Also write the report rows to this file")
+    args = parser.parse_args()
+
+    low, _, high = args.page_kb.partition("-")
+    rows = run_load_test(
+        [int(n) for n in args.stores.split(",")],
+        concurrency=args.concurrency,
+        workers=args.workers,
+        flip=args.flip,
+        seed=args.seed,
+        sale_ratio=args.sale_ratio,
+        page_kb=(int(low), int(high or low)),
+        js_ratio=args.js_ratio,
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+    )
+    print_report(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
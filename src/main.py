@@ -5,76 +5,838 @@ Main entry point for checking sales and sending notifications.
 """
 
 import argparse
+import os
 import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.scrapers import get_all_scrapers
-from src.notifiers import EmailNotifier, NtfyNotifier
-from src.utils import SaleState
+from src.scrapers import (
+    DEFAULT_CASCADE,
+    BaseScraper,
+    DetectionPool,
+    expand_sections,
+    get_all_scrapers,
+    group_by_family,
+    iter_by_family,
+    iter_sections,
+    section_names,
+)
+from src.notifiers import EmailNotifier, NotificationPolicy, NtfyNotifier
+from src.utils import (
+    BrowserStateStore,
+    CascadeStats,
+    EventStream,
+    PerfHistory,
+    PlatformCache,
+    Product,
+    ProductState,
+    RedirectCache,
+    ResultCache,
+    SaleLinkCache,
+    SaleState,
+    SitemapState,
+    SnapshotArchive,
+    StoreProfiler,
+    Subscriber,
+    WatchIndex,
+    WorkQueue,
+    assign_shards,
+    default_worker_name,
+    format_regression,
+    load_partials,
+    load_shard_plan,
+    load_subscribers,
+    load_watchlist,
+    open_queue,
+    parse_shard,
+    shards_from_plan,
+    write_partial,
+    write_shard_plan,
+)
 
 
-def check_all_stores(state: SaleState, verbose: bool = False) -> list[dict]:
+def configure_scraper(
+    scraper: BaseScraper,
+    args: argparse.Namespace,
+    platform_cache: PlatformCache,
+    snapshots: Optional[SnapshotArchive] = None,
+    sale_links: Optional[SaleLinkCache] = None,
+    redirects: Optional[RedirectCache] = None,
+    cascade_stats: Optional[CascadeStats] = None,
+    browser_state: Optional[BrowserStateStore] = None,
+) -> BaseScraper:
+    """Attach run-wide options and shared caches to a scraper."""
+    scraper.platform_cache = platform_cache
+    scraper.in_browser = args.in_browser
+    scraper.snapshots = snapshots
+    scraper.sale_links = sale_links
+    scraper.redirects = redirects
+    scraper.browser_state = browser_state
+    # Product tracking reads the sale pages the check already fetched
+    scraper.keep_pages = bool(args.track_products or Path(args.watchlist).exists())
+    if args.cascade:
+        scraper.cascade = DEFAULT_CASCADE
+        scraper.cascade_stats = cascade_stats
+    return scraper
+
+
+def apply_result(state: SaleState, store_name: str, result: dict, verbose: bool = False) -> bool:
+    """
+    Update the state with one store's check result.
+
+    Returns:
+        True if the result is a new sale that should be notified
+    """
+    # A cached result was observed when it was checked, not now
+    observed_at = result.get("checked_at") if result.get("cached") else None
+    if result.get("active", False):
+        # Check if this is a new sale
+        if state.is_new_sale(store_name, result):
+            state.record_sale(store_name, result, observed_at)
+            if verbose:
+                print(f"✅ NEW SALE! {result.get('description', '')}")
+            return True
+
+        if verbose:
+            print(f"📌 Sale ongoing")
+        # Update last seen time
+        state.record_sale(store_name, result, observed_at)
+        return False
+
+    # Mark as inactive if was previously active
+    if state.state.get("sales", {}).get(store_name, {}).get("active", False):
+        state.mark_inactive(store_name, observed_at)
+        if verbose:
+            print("❌ Sale ended")
+    elif verbose:
+        print("⬜ No sale")
+    return False
+
+
+def publish_result(
+    state: SaleState,
+    store_name: str,
+    result: dict,
+    verbose: bool = False,
+    events: Optional[EventStream] = None,
+    policy: Optional[NotificationPolicy] = None,
+) -> list[dict]:
+    """
+    Apply one store's result as soon as it arrives: update the state,
+    write it to the event stream and hand a new sale to the notification
+    policy.
+
+    A multi-section store's result is applied per section, and the
+    store's summary is recorded from them.
+
+    Returns:
+        The new sales in the result
+    """
+    new_sales = []
+    for name, section_result in expand_sections(store_name, result):
+        was_active = state.state.get("sales", {}).get(name, {}).get("active", False)
+        is_new = apply_result(state, name, section_result, verbose=verbose)
+        if events is not None:
+            ended = was_active and not section_result.get("active", False)
+            events.result(name, section_result, "new" if is_new else "ended" if ended else None)
+        if is_new:
+            new_sales.append(section_result)
+            if policy is not None and policy.add(section_result):
+                # Persist at once so a crash later in the run can't notify it twice
+                state.save()
+                if verbose:
+                    print("📣 Notified immediately")
+    if result.get("sections"):
+        state.record_store(store_name, result["sections"])
+    return new_sales
+
+
+def cached_check(
+    scraper: BaseScraper,
+    cache: Optional[ResultCache],
+    revalidate: Optional[ThreadPoolExecutor] = None,
+) -> tuple[dict, Optional[Future]]:
+    """
+    Check a store, serving the result from the cache when possible.
+
+    With ``revalidate`` a stale cached result is returned immediately and
+    a refresh is submitted to the executor.
+
+    Returns:
+        (result, pending_refresh)
+    """
+    def check() -> dict:
+        result = scraper.check()
+        result["checked_at"] = datetime.now().isoformat()
+        return result
+
+    if cache is None:
+        return check(), None
+
+    key = ResultCache.key(scraper.name, scraper.base_url)
+    cached = cache.get(key)
+    if cached is not None:
+        result, age = cached
+        if age <= cache.ttl:
+            return {**result, "cached": True}, None
+        if revalidate is not None:
+            def refresh() -> dict:
+                fresh = check()
+                if "error" not in fresh:
+                    cache.put(key, fresh)
+                return fresh
+
+            return {**result, "cached": True, "stale": True}, revalidate.submit(refresh)
+
+    # Failed checks are not cached so the next invocation retries them
+    result = check()
+    if "error" not in result:
+        cache.put(key, result)
+    return result, None
+
+
+def run_checks(
+    scrapers: list[BaseScraper],
+    verbose: bool = False,
+    state: Optional[SaleState] = None,
+    cache: Optional[ResultCache] = None,
+    revalidate: bool = False,
+    concurrency: int = 1,
+    profiler: Optional[StoreProfiler] = None,
+    history: Optional[PerfHistory] = None,
+) -> Iterator[tuple[BaseScraper, dict]]:
+    """
+    Check each store once and yield ``(scraper, result)`` as they finish.
+
+    Args:
+        scrapers: Scrapers to run
+        verbose: Print detailed progress
+        state: If given, check durations are recorded here
+        cache: Serve results younger than the cache TTL without checking
+        revalidate: Refresh stale cached results in the background while
+            the other stores are checked; such a store is yielded once, at
+            the end, with the refreshed result (the stale one if the
+            refresh fails)
+        concurrency: Number of stores checked at the same time; results
+            are then yielded in completion order
+        profiler: Profile each store's check under its name
+        history: If given, check durations and page bytes are recorded here
+    """
+    executor = ThreadPoolExecutor(max_workers=2) if cache is not None and revalidate else None
+    pending: list[tuple[BaseScraper, Future, dict]] = []
+
+    def timed_check(scraper: BaseScraper) -> tuple[dict, Optional[Future], float]:
+        scraper.bytes_fetched = 0
+        started = time.monotonic()
+        if profiler is not None:
+            result, refresh = profiler.run(scraper.name, cached_check, scraper, cache, executor)
+        else:
+            result, refresh = cached_check(scraper, cache, executor)
+        return result, refresh, time.monotonic() - started
+
+    if concurrency > 1:
+        # Sister storefronts share an HTTP session (and browser), which must
+        # stay on one thread: each family is one task, checked member by member
+        def check_group(members: list[BaseScraper]) -> list[tuple[BaseScraper, Any]]:
+            done = []
+            for scraper in iter_by_family(members):
+                try:
+                    done.append((scraper, timed_check(scraper)))
+                except Exception as e:
+                    done.append((scraper, e))
+            return done
+
+        def unwrap(outcome: Any) -> tuple[dict, Optional[Future], float]:
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        fetchers = ThreadPoolExecutor(max_workers=concurrency)
+        futures = [fetchers.submit(check_group, members) for members in group_by_family(scrapers)]
+        checks: Iterable = (
+            (scraper, lambda o=outcome: unwrap(o))
+            for future in as_completed(futures)
+            for scraper, outcome in future.result()
+        )
+    else:
+        fetchers = None
+        # Sister storefronts are checked back to back in one shared browser
+        checks = ((scraper, lambda s=scraper: timed_check(s)) for scraper in iter_by_family(scrapers))
+
+    for scraper, run in checks:
+        if verbose:
+            print(f"   Checking {scraper.name}...", end=" ", flush=True)
+
+        try:
+            result, refresh, elapsed = run()
+            if refresh is not None:
+                # Publishing the stale result now and the fresh one later
+                # could flip the state and notify twice
+                pending.append((scraper, refresh, result))
+                if verbose:
+                    print("[stale, revalidating]")
+                continue
+            if not result.get("cached"):
+                if state is not None:
+                    state.record_duration(scraper.name, elapsed)
+                if history is not None and "error" not in result:
+                    history.record(scraper.name, elapsed, scraper.bytes_fetched)
+
+            if verbose and result.get("cached"):
+                print("[cached]", end=" ", flush=True)
+            if verbose and result.get("detection_path"):
+                print(f"[{result['detection_path']}]", end=" ", flush=True)
+        except Exception as e:
+            print(f"   ⚠️  {scraper.name}: Error - {e}")
+            continue
+
+        yield scraper, result
+
+    if fetchers is not None:
+        fetchers.shutdown(wait=True)
+
+    for scraper, refresh, stale in pending:
+        if verbose:
+            print(f"   Revalidated {scraper.name}...", end=" ", flush=True)
+        try:
+            result = refresh.result()
+        except Exception as e:
+            print(f"   ⚠️  {scraper.name}: Error - {e}, using the cached result")
+            result = stale
+        yield scraper, result
+
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def print_detection_paths(results: Iterable[dict]) -> None:
+    """Print how many stores were decided by each detection path."""
+    detection_paths: dict[str, int] = {}
+    sections = (r for result in results for _, r in expand_sections("", result))
+    for result in sections:
+        path = result.get("detection_path")
+        if path:
+            detection_paths[path] = detection_paths.get(path, 0) + 1
+
+    if detection_paths:
+        paths = ", ".join(f"{path}: {count}" for path, count in sorted(detection_paths.items()))
+        print(f"\n   Detection paths: {paths}")
+
+
+def check_all_stores(
+    state: SaleState,
+    verbose: bool = False,
+    scrapers: Optional[list[BaseScraper]] = None,
+    results: Optional[dict[str, dict]] = None,
+    cache: Optional[ResultCache] = None,
+    revalidate: bool = False,
+    concurrency: int = 1,
+    profiler: Optional[StoreProfiler] = None,
+    history: Optional[PerfHistory] = None,
+    events: Optional[EventStream] = None,
+    policy: Optional[NotificationPolicy] = None,
+) -> list[dict]:
     """
     Check all stores for sales.
 
     Args:
         state: SaleState instance to track seen sales
         verbose: Print detailed progress
+        scrapers: Scrapers to run (default: all stores)
+        results: If given, every raw result is also stored here by store name
+        cache: Result cache to serve recent checks from
+        revalidate: Refresh stale cached results in the background
+        concurrency: Number of stores checked at the same time
+        profiler: Profile each store's check under its name
+        history: Record check durations and page bytes here
+        events: Write each result to this stream as it completes
+        policy: Hand each new sale to this policy as it is found
 
     Returns:
         List of newly detected sales
     """
-    scrapers = get_all_scrapers()
+    if scrapers is None:
+        scrapers = get_all_scrapers()
+    if results is None:
+        results = {}
     new_sales = []
 
     print(f"\n🔍 Checking {len(scrapers)} stores for sales...")
     print(f"   Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
 
-    for scraper in scrapers:
+    for scraper, result in run_checks(
+        scrapers,
+        verbose=verbose,
+        state=state,
+        cache=cache,
+        revalidate=revalidate,
+        concurrency=concurrency,
+        profiler=profiler,
+        history=history,
+    ):
+        results[scraper.name] = result
+        new_sales.extend(
+            publish_result(state, scraper.name, result, verbose=verbose, events=events, policy=policy)
+        )
+
+    print_detection_paths(results.values())
+    return new_sales
+
+
+def check_for_subscribers(
+    subscribers: list[Subscriber],
+    scrapers: list[BaseScraper],
+    verbose: bool = False,
+    dry_run: bool = False,
+    cache: Optional[ResultCache] = None,
+) -> None:
+    """
+    Check every store needed by any subscriber once, then fan out.
+
+    Each subscriber gets their own SaleState and notifiers, so scraping
+    cost depends on the number of distinct stores only.
+    """
+    # Section entries ("H&M Dam") belong to their store ("H&M")
+    parents = {name: s.name for s in scrapers for name in section_names(s)}
+    scrapers = [
+        s
+        for s in scrapers
+        if any(sub.wants(name, s.name) for sub in subscribers for name in section_names(s))
+    ]
+    print(f"\n🔍 Checking {len(scrapers)} stores for {len(subscribers)} subscriber(s)...")
+    print(f"   Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+
+    results: dict[str, dict] = {}
+    for scraper, result in run_checks(scrapers, verbose=verbose, cache=cache):
+        results.update(expand_sections(scraper.name, result))
         if verbose:
-            print(f"   Checking {scraper.name}...", end=" ", flush=True)
+            print("✅ Sale" if result.get("active") else "⬜ No sale")
+    print_detection_paths(results.values())
+
+    for sub in subscribers:
+        print(f"\n👤 {sub.name}")
+        state = SaleState(sub.state_file)
+        new_sales = []
+        for name in sorted(results):
+            result = results[name]
+            if not sub.wants(name, parents.get(name)):
+                continue
+            if result.get("active") and state.is_new_sale(name, result) and not sub.passes(result):
+                # Not recorded, so a deeper discount later in the same sale is still new
+                continue
+            if apply_result(state, name, result):
+                new_sales.append(result)
+
+        if not dry_run:
+            # Set channels explicitly so they never fall back to the
+            # environment-configured owner's address or topic
+            email_notifier = EmailNotifier()
+            email_notifier.email_address = sub.email_address
+            email_notifier.app_password = sub.email_password
+            ntfy_notifier = NtfyNotifier()
+            ntfy_notifier.topic = sub.ntfy_topic
+            send_notifications(new_sales, email_notifier=email_notifier, ntfy_notifier=ntfy_notifier)
+        print_summary(new_sales, state)
+        if state.save():
+            print(f"\n💾 State saved to {sub.state_file}")
+        else:
+            print(f"\n💾 No sale changes; run data saved to {state.volatile_file}")
 
-        try:
-            result = scraper.check()
-
-            if result.get("active", False):
-                # Check if this is a new sale
-                if state.is_new_sale(scraper.name, result):
-                    new_sales.append(result)
-                    state.record_sale(scraper.name, result)
-                    if verbose:
-                        print(f"✅ NEW SALE! {result.get('description', '')}")
-                else:
-                    if verbose:
-                        print(f"📌 Sale ongoing")
-                    # Update last seen time
-                    state.record_sale(scraper.name, result)
-            else:
-                # Mark as inactive if was previously active
-                if scraper.name in state.state.get("sales", {}):
-                    if state.state["sales"][scraper.name].get("active", False):
-                        state.mark_inactive(scraper.name)
-                        if verbose:
-                            print("❌ Sale ended")
-                    else:
-                        if verbose:
-                            print("⬜ No sale")
-                else:
-                    if verbose:
-                        print("⬜ No sale")
 
+def select_shard(
+    scrapers: list[BaseScraper], state: SaleState, shard: str, plan_file: Optional[str] = None
+) -> list[BaseScraper]:
+    """
+    Keep the scrapers that belong to shard ``i/N``.
+
+    With ``plan_file`` (written once by ``plan-shards`` for all shard jobs)
+    the assignment comes from it, so jobs that see different durations
+    can't check a store twice or not at all. Without one, stores are
+    balanced by this job's recorded durations.
+    """
+    index, count = parse_shard(shard)
+    names = [s.name for s in scrapers]
+    if plan_file:
+        plan = load_shard_plan(plan_file)
+        if plan is None or len(plan) != count:
+            print(f"⚠️  No usable {count}-shard plan in {plan_file}; splitting stores by name hash")
+        shards = shards_from_plan(names, plan, count)
+    else:
+        shards = assign_shards(names, state.get_durations(), count)
+    names = set(shards[index - 1])
+    return [s for s in scrapers if s.name in names]
+
+
+def merge_state(
+    state: SaleState,
+    partials: list[str],
+    verbose: bool = False,
+    platform_cache: Optional[PlatformCache] = None,
+    history: Optional[PerfHistory] = None,
+    sale_links: Optional[SaleLinkCache] = None,
+    redirects: Optional[RedirectCache] = None,
+    cascade_stats: Optional[CascadeStats] = None,
+    events: Optional[EventStream] = None,
+    policy: Optional[NotificationPolicy] = None,
+) -> tuple[list[dict], list[dict]]:
+    """
+    Apply the results of all shard jobs to the state.
+
+    Stores are applied in name order regardless of which shard finished
+    first, so each new sale is reported exactly once. Sales a shard job
+    already notified (priority stores) are not notified again.
+
+    Returns:
+        (new_sales, product_alerts)
+    """
+    results, durations, alerts, platforms, perf, learned_links, final_urls, notified = load_partials(partials)
+    print(f"\n🧩 Merging {len(results)} store results from {len(partials)} partial state file(s)...")
+    if policy is not None and notified:
+        policy.mark_sent(notified)
+
+    new_sales = []
+    for name in sorted(results):
+        if verbose:
+            print(f"   {name}...", end=" ", flush=True)
+        new_sales.extend(
+            publish_result(state, name, results[name], verbose=verbose, events=events, policy=policy)
+        )
+    state.update_durations(durations)
+    if platform_cache is not None and platforms:
+        platform_cache.entries.update(platforms)
+        platform_cache.dirty = True
+    if sale_links is not None and learned_links:
+        sale_links.entries.update(learned_links)
+        sale_links.dirty = True
+    if redirects is not None and final_urls:
+        redirects.entries.update(final_urls)
+        redirects.dirty = True
+    if history is not None:
+        for name, (seconds, page_bytes) in sorted(perf.items()):
+            history.record(name, seconds, page_bytes)
+    if cascade_stats is not None:
+        cascade_stats.record_results(results)
+        print_cascade_deciders(results.values(), cascade_stats)
+    return new_sales, alerts
+
+
+def run_worker(
+    queue: WorkQueue,
+    scrapers: list[BaseScraper],
+    worker: str,
+    verbose: bool = False,
+    idle_exit: float = 60,
+    poll: float = 2,
+    heartbeat_every: float = 30,
+) -> int:
+    """
+    Check stores leased from the queue until it has been empty for ``idle_exit`` seconds.
+
+    A background thread renews the lease every ``heartbeat_every``
+    seconds while a store is being checked, so slow stores are not handed
+    to another worker.
+
+    Returns:
+        Number of jobs completed
+    """
+    by_name = {scraper.name.lower(): scraper for scraper in scrapers}
+    completed = 0
+    idle_since = time.monotonic()
+    print(f"\n👷 Worker {worker} waiting for jobs...")
+
+    while True:
+        job = queue.lease(worker)
+        if job is None:
+            if time.monotonic() - idle_since >= idle_exit:
+                break
+            time.sleep(poll)
+            continue
+
+        scraper = by_name.get(job.store.lower())
+        if scraper is None:
+            queue.fail(job, worker, f"Unknown store: {job.store}")
+            continue
+        if verbose:
+            print(f"   {job.store} (attempt {job.attempts})...", end=" ", flush=True)
+
+        done = threading.Event()
+
+        def keep_leased() -> None:
+            while not done.wait(heartbeat_every):
+                if not queue.heartbeat(job, worker):
+                    return
+
+        heartbeat = threading.Thread(target=keep_leased, daemon=True)
+        heartbeat.start()
+        try:
+            result, _ = cached_check(scraper, None)
         except Exception as e:
-            print(f"   ⚠️  {scraper.name}: Error - {e}")
+            queue.fail(job, worker, str(e))
+            print(f"   ⚠️  {job.store}: Error - {e}")
+            continue
+        finally:
+            done.set()
+            heartbeat.join()
 
-    return new_sales
+        if queue.complete(job, worker, result):
+            completed += 1
+            if verbose:
+                print("✅ Sale" if result.get("active") else "⬜ No sale")
+        else:
+            print(f"   ⚠️  {job.store}: lease expired or run closed, result discarded")
+        idle_since = time.monotonic()
+
+    print(f"\n👷 Worker {worker} finished {completed} job(s)")
+    return completed
+
+
+def run_coordinator(
+    queue: WorkQueue,
+    state: SaleState,
+    scrapers: list[BaseScraper],
+    run_id: str,
+    verbose: bool = False,
+    events: Optional[EventStream] = None,
+    policy: Optional[NotificationPolicy] = None,
+    poll: float = 2,
+    timeout: float = 3600,
+) -> tuple[list[dict], dict[str, dict]]:
+    """
+    Queue a check of every store and apply results as workers return them.
+
+    Jobs whose lease expired are requeued while waiting. Gives up after
+    ``timeout`` seconds and cancels the run's unfinished jobs, so workers
+    don't keep checking stores whose results nobody will take; those
+    stores are checked again in the next run.
+
+    Returns:
+        (new_sales, results by store name)
+    """
+    queue.put(run_id, [scraper.name for scraper in scrapers])
+    print(f"\n📋 Queued {len(scrapers)} store checks as run {run_id}")
+
+    results: dict[str, dict] = {}
+    new_sales: list[dict] = []
+    deadline = time.monotonic() + timeout
+    closed = False
+    while True:
+        for store_name, result, seconds in queue.take_results(run_id):
+            results[store_name] = result
+            if seconds and "error" not in result:
+                state.record_duration(store_name, seconds)
+            if verbose:
+                print(f"   {store_name}...", end=" ", flush=True)
+            new_sales.extend(
+                publish_result(state, store_name, result, verbose=verbose, events=events, policy=policy)
+            )
+
+        if closed or queue.pending(run_id) == 0:
+            break
+        if time.monotonic() > deadline:
+            cancelled = queue.close_run(run_id)
+            print(f"   ⚠️  Timed out, cancelled {cancelled} unfinished store check(s)")
+            # One more pass for results that finished before the run closed
+            closed = True
+            continue
+        requeued = queue.requeue_expired()
+        if requeued:
+            print(f"   ↩️  Requeued {requeued} job(s) with expired leases")
+        time.sleep(poll)
+
+    print_detection_paths(results.values())
+    return new_sales, results
+
+
+def print_worker_stats(queue: WorkQueue) -> None:
+    """Print throughput per worker."""
+    stats = queue.worker_stats()
+    if not stats:
+        return
+    print("\n👷 Workers:")
+    for worker in stats:
+        print(
+            f"   • {worker['worker']}: {worker['jobs_done']} done, {worker['jobs_failed']} failed, "
+            f"{worker['jobs_per_minute']}/min, busy {worker['busy_seconds']}s"
+        )
+
+
+def sitemap_prepass(
+    scrapers: list[BaseScraper], sitemap_state: SitemapState, verbose: bool = False
+) -> list[BaseScraper]:
+    """
+    Keep only the stores whose sale-related sitemap URLs changed.
+
+    Returns:
+        Scrapers that need a full check this run
+    """
+    from src.scrapers.sitemap import SitemapPrepass
+
+    prepass = SitemapPrepass(sitemap_state)
+    selected = []
+
+    print(f"\n🗺️  Scanning sitemaps for {len(scrapers)} stores...")
+    for scraper in scrapers:
+        needed, reason = prepass.needs_check(scraper)
+        if needed:
+            selected.append(scraper)
+        if verbose:
+            print(f"   {'🔎' if needed else '⏭️ '} {scraper.name}: {reason}")
+
+    print(f"   {len(selected)} of {len(scrapers)} stores need a full check")
+    return selected
+
+
+def track_products(
+    product_state: ProductState,
+    verbose: bool = False,
+    watchlist: Optional[WatchIndex] = None,
+    scrapers: Optional[list[BaseScraper]] = None,
+) -> list[dict]:
+    """
+    Diff every store's sale products against the previous run.
+
+    The first run for a store only records a baseline. Later runs raise
+    alerts for newly marked down products and deeper discounts. Watchlist
+    rules are matched against new and repriced products only, and a
+    product is reported again only when its price drops below the price
+    it was last reported at.
+
+    Returns:
+        List of alert dicts in the same shape as sale results
+    """
+    if scrapers is None:
+        scrapers = get_all_scrapers()
+    alerts = []
+
+    print(f"\n🏷️  Tracking sale products in {len(scrapers)} stores...")
+    # Multi-section stores are tracked per section, each with its own diff
+    scrapers = list(iter_sections(scrapers))
+
+    for scraper in scrapers:
+        fetched = scraper.check_products()
+        if fetched is None:
+            if verbose:
+                print(f"   ⚠️  {scraper.name}: could not fetch sale page")
+            continue
+
+        url, products = fetched
+        is_baseline = not product_state.has_store(scraper.name)
+        diff = product_state.update(scraper.name, url, products)
+
+        if verbose:
+            print(
+                f"   {scraper.name}: {len(products)} products, "
+                f"{len(diff.added)} new, {len(diff.repriced)} repriced, {len(diff.removed)} gone"
+            )
+
+        if watchlist:
+            # A product is reported once, and again only if its price drops
+            # below the price it was reported at; the baseline run records
+            # its matches without alerting
+            reported = product_state.reported(scraper.name)
+            # One alert per product, naming every rule it matches
+            matched: dict[str, tuple[Product, list[str]]] = {}
+            for rule, product in watchlist.match_many(diff.added + diff.repriced, scraper.name):
+                matched.setdefault(product.id, (product, []))[1].append(rule.name)
+            newly_reported: dict[str, float] = {}
+            for product, rule_names in matched.values():
+                last = reported.get(product.id)
+                if last is not None and product.price >= last:
+                    continue
+                newly_reported[product.id] = product.price
+                if is_baseline:
+                    continue
+                discount = f" (-{product.discount}%)" if product.discount else ""
+                alerts.append(
+                    {
+                        "store_name": scraper.name,
+                        "description": f"{', '.join(rule_names)}: {product.name} {product.price:g} kr{discount}",
+                        "url": product.url or url,
+                    }
+                )
+            product_state.mark_reported(scraper.name, newly_reported)
+
+        if is_baseline:
+            continue
+
+        markdowns, deeper = diff.new_markdowns, diff.deeper
+        if not markdowns and not deeper:
+            continue
+
+        parts = []
+        if markdowns:
+            parts.append(f"{len(markdowns)} nya nedsättningar")
+        if deeper:
+            parts.append(f"{len(deeper)} större rabatter")
+        best = max(markdowns + deeper, key=lambda p: p.discount)
+        alerts.append(
+            {
+                "store_name": scraper.name,
+                "description": f"{', '.join(parts)} (upp till {best.discount}%)",
+                "url": url,
+            }
+        )
+
+    return alerts
+
+
+def replay_snapshots(archive: SnapshotArchive, store_name: str, run_id: Optional[str] = None) -> bool:
+    """
+    Run detection again on a store's archived pages and print the verdicts.
+
+    Returns:
+        False if the store or its snapshots could not be found
+    """
+    from src.scrapers import get_scraper_by_name
+
+    scraper = get_scraper_by_name(store_name)
+    if not scraper:
+        print(f"❌ Unknown store: {store_name}")
+        return False
+
+    pages = archive.pages(scraper.name, run_id)
+    if not pages:
+        print(f"❌ No snapshots of {scraper.name}" + (f" in run {run_id}" if run_id else ""))
+        return False
+
+    print(f"\n🔁 Replaying {scraper.name} from run {pages[0]['run']}...")
+    replayed_platform = False
+    for entry in pages:
+        if entry.get("kind", "").startswith("platform:"):
+            # The first platform entry replays the adapter on all of them
+            if replayed_platform:
+                continue
+            replayed_platform = True
+        verdict = archive.replay(scraper, entry)
+        if verdict is None:
+            print(f"   ⚠️  {entry['url']}: snapshot {entry['hash'][:12]} was evicted")
+            continue
+        status = "✅ SALE" if verdict["has_sale"] else "⬜ No sale"
+        print(f"   {status} [{verdict['detection_path']}] {entry['url']} ({entry['hash'][:12]})")
+        if verdict["description"]:
+            print(f"      {verdict['description']}")
+        if verdict["sale_link"]:
+            print(f"      → {verdict['sale_link']}")
+    return True
 
 
-def send_notifications(new_sales: list[dict]) -> None:
-    """Send notifications for new sales via all configured channels."""
+def send_notifications(
+    new_sales: list[dict],
+    email_notifier: Optional[EmailNotifier] = None,
+    ntfy_notifier: Optional[NtfyNotifier] = None,
+) -> None:
+    """
+    Send notifications for new sales via all configured channels.
+
+    Notifiers default to the ones configured through environment variables.
+    """
     if not new_sales:
         print("\n📭 No new sales to notify about.")
         return
@@ -82,7 +844,7 @@ def send_notifications(new_sales: list[dict]) -> None:
     print(f"\n📬 Sending notifications for {len(new_sales)} new sale(s)...")
 
     # Email notification
-    email_notifier = EmailNotifier()
+    email_notifier = email_notifier or EmailNotifier()
     if email_notifier.is_configured():
         if email_notifier.send_sale_alert(new_sales):
             print("   ✅ Email sent")
@@ -92,7 +854,7 @@ def send_notifications(new_sales: list[dict]) -> None:
         print("   ⏭️  Email not configured (skipping)")
 
     # Phone push notification
-    ntfy_notifier = NtfyNotifier()
+    ntfy_notifier = ntfy_notifier or NtfyNotifier()
     if ntfy_notifier.is_configured():
         if ntfy_notifier.send_sale_alert(new_sales):
             print("   ✅ Phone notification sent")
@@ -102,7 +864,65 @@ def send_notifications(new_sales: list[dict]) -> None:
         print("   ⏭️  Phone (ntfy) not configured (skipping)")
 
 
-def print_summary(new_sales: list[dict], state: SaleState) -> None:
+def print_cascade_deciders(results: Iterable[dict], stats: Optional[CascadeStats] = None) -> None:
+    """Print which cascade step decided this run's checks, and over all runs."""
+    deciders: dict[str, int] = {}
+    sections = (r for result in results for _, r in expand_sections("", result))
+    for result in sections:
+        steps = result.get("cascade")
+        if steps and not result.get("cached"):
+            deciders[steps[-1]] = deciders.get(steps[-1], 0) + 1
+    if deciders:
+        counts = ", ".join(f"{step}: {count}" for step, count in sorted(deciders.items()))
+        print(f"\n🪜 Cascade steps that decided: {counts}")
+    if stats is not None and stats.stores:
+        counts = ", ".join(f"{step}: {count}" for step, count in sorted(stats.deciders().items()))
+        print(f"   All runs ({len(stats.stores)} stores): {counts}")
+
+
+def print_sale_link_changes(sale_links: SaleLinkCache) -> None:
+    """Report stores whose sale section URL changed during this run."""
+    if sale_links.changes:
+        print("\n🔗 Sale links updated:")
+        for change in sale_links.changes:
+            print(f"   • {change['store_name']}: {change['old']} → {change['new']}")
+
+
+def print_redirect_savings(redirects: RedirectCache) -> None:
+    """Report the redirect hops skipped through cached final URLs."""
+    if redirects.hops_saved:
+        print(
+            f"\n↪️  Skipped {redirects.hops_saved} redirect hop(s) "
+            f"(~{redirects.seconds_saved:.1f}s) via {len(redirects.entries)} cached final URL(s)"
+        )
+
+
+def print_browser_state_savings(browser_state: BrowserStateStore) -> None:
+    """Report renders that started from a saved browser state."""
+    if browser_state.warm_renders:
+        print(
+            f"\n🍪 {browser_state.warm_renders} render(s) started from saved browser state "
+            f"(~{browser_state.seconds_saved:.1f}s saved), {browser_state.cold_renders} started cold"
+        )
+
+
+def send_perf_alert(regressions: list[dict]) -> None:
+    """Send slow or bloated stores to the ops ntfy topic (NTFY_OPS_TOPIC, else NTFY_TOPIC)."""
+    ntfy_notifier = NtfyNotifier(os.getenv("NTFY_OPS_TOPIC"))
+    if not regressions or not ntfy_notifier.is_configured():
+        return
+    ntfy_notifier.send(
+        title=f"⚠️ {len(regressions)} store check(s) regressed",
+        message="\n".join(format_regression(r) for r in regressions),
+        tags=["warning", "hourglass"],
+    )
+
+
+def print_summary(
+    new_sales: list[dict],
+    state: SaleState,
+    regressions: Optional[list[dict]] = None,
+) -> None:
     """Print a summary of the check."""
     print("\n" + "=" * 50)
     print("📊 SUMMARY")
@@ -123,6 +943,11 @@ def print_summary(new_sales: list[dict], state: SaleState) -> None:
         for name, info in active_sales.items():
             print(f"      • {name}: {info.get('description', 'Sale active')}")
 
+    if regressions:
+        print("\n   🐢 PERFORMANCE REGRESSIONS:")
+        for regression in regressions:
+            print(f"      • {format_regression(regression)}")
+
     print("\n" + "=" * 50)
 
 
@@ -138,6 +963,29 @@ Examples:
   python main.py --test-notify      # Send a test notification
   python main.py --dry-run          # Check without notifications
   python main.py --store "H&M Men"  # Check a specific store
+  python main.py --track-products   # Also alert on new markdowns
+  python main.py --sitemap-prepass  # Skip stores whose sitemap is unchanged
+  python main.py plan-shards --count 4
+                                    # Write shard_plan.json for the shard jobs
+  python main.py --shard 1/4 --shard-plan shard_plan.json --partial-state partial-1.json
+                                    # Check one shard without notifying
+  python main.py merge-state partial-*.json
+                                    # Merge shard results, then notify
+  python main.py --subscribers subscribers.json
+                                    # Check once, notify every subscriber
+  python main.py --store SSENSE --cache
+                                    # Reuse a check from the last 15 minutes
+  python main.py --workers 4        # Parse pages in 4 processes while fetching
+  python main.py --archive          # Keep a copy of every fetched page
+  python main.py --dry-run --profile
+                                    # Profile CPU and memory per store
+  python main.py replay "H&M Herr"  # Re-run detection on the archived pages
+  python main.py --cascade          # Try cheap detectors before rendering
+  python main.py --events - --priority "Zara Herr,SSENSE"
+                                    # Stream results, notify priority stores at once
+  python main.py coordinate         # Queue all stores for workers, then notify
+  python main.py work               # Check stores from the queue (run many)
+  python main.py serve --port 8080  # Read-only JSON API over the sale state
         """,
     )
 
@@ -164,8 +1012,247 @@ Examples:
         default="sale_state.json",
         help="Path to state file (default: sale_state.json)",
     )
+    parser.add_argument(
+        "--platform-cache",
+        type=str,
+        default="platform_cache.json",
+        help="Path to detected-platform cache (default: platform_cache.json)",
+    )
+    parser.add_argument(
+        "--sale-links",
+        type=str,
+        default="sale_links.json",
+        help="Path to learned sale URL cache (default: sale_links.json)",
+    )
+    parser.add_argument(
+        "--redirects",
+        type=str,
+        default="redirects.json",
+        help="Path to cache of redirect targets (default: redirects.json)",
+    )
+    parser.add_argument(
+        "--browser-state",
+        type=str,
+        default=".cache/browser_state",
+        help="Directory of saved cookies and localStorage per store (default: .cache/browser_state)",
+    )
+    parser.add_argument(
+        "--sitemap-prepass",
+        action="store_true",
+        help="Only check stores whose sale URLs changed in their sitemap",
+    )
+    parser.add_argument(
+        "--sitemap-state",
+        type=str,
+        default="sitemap_state.json",
+        help="Path to sitemap lastmod state (default: sitemap_state.json)",
+    )
+    parser.add_argument(
+        "--track-products",
+        action="store_true",
+        help="Also diff each store's sale products and alert on new markdowns",
+    )
+    parser.add_argument(
+        "--watchlist",
+        type=str,
+        default="watchlist.json",
+        help="Watchlist rules to match against sale products (default: watchlist.json)",
+    )
+    parser.add_argument(
+        "--products-dir",
+        type=str,
+        default="product_state",
+        help="Directory for per-store product state (default: product_state)",
+    )
+
+    parser.add_argument(
+        "--shard",
+        type=str,
+        help="Only check shard i of N (e.g. 1/4); requires --partial-state",
+    )
+    parser.add_argument(
+        "--shard-plan",
+        type=str,
+        help="Shard assignment written by plan-shards; every shard job should use the same one",
+    )
+    parser.add_argument(
+        "--partial-state",
+        type=str,
+        help="Write this shard's results here instead of notifying",
+    )
+
+    parser.add_argument(
+        "--subscribers",
+        type=str,
+        help="Subscriber profiles file; check each store once and notify every subscriber",
+    )
+
+    parser.add_argument(
+        "--in-browser",
+        action="store_true",
+        help="Run sale detection inside the browser page instead of parsing its HTML",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse results of checks made in the last --cache-ttl seconds by earlier invocations",
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="With --cache: ignore cached results and check every store again",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=900,
+        help="Reuse results younger than this many seconds (default: 900)",
+    )
+    parser.add_argument(
+        "--stale-while-revalidate",
+        action="store_true",
+        help="Refresh stale cached results in the background while the other stores are checked (implies --cache)",
+    )
+    parser.add_argument(
+        "--cache-file",
+        type=str,
+        default=".cache/results.json",
+        help="Path to result cache (default: .cache/results.json)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Parse and detect in this many worker processes while up to twice "
+        "as many stores are fetched concurrently (default: 0, inline)",
+    )
+    parser.add_argument(
+        "--archive",
+        action="store_true",
+        help="Archive every fetched page so verdicts can be replayed later",
+    )
+    parser.add_argument(
+        "--archive-dir",
+        type=str,
+        default=".cache/snapshots",
+        help="Directory of the page archive (default: .cache/snapshots)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile CPU and peak memory of each store check and print the hottest functions",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=str,
+        default="profiles",
+        help="Where to write .prof and flamegraph .collapsed files (default: profiles)",
+    )
+    parser.add_argument(
+        "--perf-history",
+        type=str,
+        default="perf_history.json",
+        help="Rolling per-store duration and page size history (default: perf_history.json)",
+    )
+    parser.add_argument(
+        "--perf-alerts",
+        action="store_true",
+        help="Send performance regressions to ntfy (NTFY_OPS_TOPIC, else NTFY_TOPIC)",
+    )
+
+    parser.add_argument(
+        "--cascade",
+        action="store_true",
+        help="Try cheap detectors (sale page probe, platform API, plain HTML) before the full check",
+    )
+    parser.add_argument(
+        "--cascade-stats",
+        type=str,
+        default="cascade_stats.json",
+        help="Per-store record of which cascade step decided (default: cascade_stats.json)",
+    )
+
+    parser.add_argument(
+        "--events",
+        type=str,
+        help="Append each store's result as a JSON line to this file as it completes "
+        "('-' for stdout; progress output then goes to stderr)",
+    )
+    parser.add_argument(
+        "--priority",
+        type=str,
+        default=os.getenv("PRIORITY_STORES", ""),
+        help="Comma-separated stores notified the moment a sale is found, '*' for all; "
+        "the rest are batched at the end (default: $PRIORITY_STORES)",
+    )
+
+    parser.add_argument(
+        "--queue",
+        type=str,
+        default="queue.db",
+        help="Work queue for coordinate/work, a SQLite file or sqlite:///path (default: queue.db)",
+    )
+    parser.add_argument(
+        "--lease",
+        type=float,
+        default=180,
+        help="Seconds a worker holds a job without a heartbeat before it is requeued (default: 180)",
+    )
+
+    subparsers = parser.add_subparsers(dest="command")
+    merge_parser = subparsers.add_parser(
+        "merge-state",
+        help="Merge partial state files from shard jobs, then notify",
+    )
+    merge_parser.add_argument("partials", nargs="+", help="Partial state files")
+    plan_parser = subparsers.add_parser(
+        "plan-shards",
+        help="Assign stores to shards by past duration and write the plan for the shard jobs",
+    )
+    plan_parser.add_argument("--count", type=int, default=4, help="Number of shards (default: 4)")
+    plan_parser.add_argument(
+        "--output", default="shard_plan.json", help="Plan file to write (default: shard_plan.json)"
+    )
+    replay_parser = subparsers.add_parser(
+        "replay",
+        help="Run detection again on a store's archived pages",
+    )
+    replay_parser.add_argument("replay_store", metavar="store", help="Store name")
+    replay_parser.add_argument("--run", type=str, help="Run id (default: latest)")
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Serve the sale state read-only over HTTP (/active, /store/<name>, /history)",
+    )
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8080, help="Port (default: 8080)")
+    coordinate_parser = subparsers.add_parser(
+        "coordinate",
+        help="Queue every store for workers, apply their results and notify",
+    )
+    coordinate_parser.add_argument("--run-id", type=str, help="Run id (default: current time)")
+    coordinate_parser.add_argument(
+        "--timeout", type=float, default=3600, help="Give up waiting after this many seconds (default: 3600)"
+    )
+    work_parser = subparsers.add_parser("work", help="Check stores taken from the queue")
+    work_parser.add_argument("--name", type=str, help="Worker name (default: host-pid)")
+    work_parser.add_argument(
+        "--idle-exit",
+        type=float,
+        default=60,
+        help="Exit after the queue has been empty this many seconds (default: 60)",
+    )
 
     args = parser.parse_args()
+    # With --events - stdout carries only the JSON lines; progress goes to stderr
+    events = EventStream(args.events) if args.events else None
+
+    if args.shard:
+        if not args.partial_state:
+            parser.error("--shard requires --partial-state")
+        try:
+            parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
 
     # Test notification mode
     if args.test_notify:
@@ -195,8 +1282,31 @@ Examples:
         print("\n✅ Test complete!")
         return
 
+    if args.command == "serve":
+        from src.api import serve
+
+        serve(args.state_file, args.host, args.port)
+        return
+
+    if args.command == "replay":
+        archive = SnapshotArchive(args.archive_dir)
+        if not replay_snapshots(archive, args.replay_store, args.run):
+            sys.exit(1)
+        return
+
     # Initialize state
     state = SaleState(args.state_file)
+    platform_cache = PlatformCache(args.platform_cache)
+    sale_links = SaleLinkCache(args.sale_links)
+    redirects = RedirectCache(args.redirects)
+    browser_state = BrowserStateStore(args.browser_state)
+    cache = None
+    if args.cache or args.stale_while_revalidate:
+        cache = ResultCache(args.cache_file, ttl=args.cache_ttl, fresh=args.fresh)
+    snapshots = SnapshotArchive(args.archive_dir) if args.archive else None
+    history = PerfHistory(args.perf_history)
+    cascade_stats = CascadeStats(args.cascade_stats)
+    priority = args.priority.split(",") if args.priority else []
 
     # Check specific store or all stores
     if args.store:
@@ -206,30 +1316,277 @@ Examples:
         if not scraper:
             print(f"❌ Unknown store: {args.store}")
             print("\nAvailable stores:")
-            from src.scrapers import get_all_scrapers
-
             for s in get_all_scrapers():
                 print(f"   • {s.name}")
             sys.exit(1)
 
         print(f"\n🔍 Checking {scraper.name}...")
-        result = scraper.check()
+        configure_scraper(
+            scraper, args, platform_cache, snapshots, sale_links, redirects, cascade_stats, browser_state
+        )
+        result, _ = cached_check(scraper, cache)
+        platform_cache.save()
+        sale_links.save()
+        print_sale_link_changes(sale_links)
+        redirects.save()
+        print_redirect_savings(redirects)
+        browser_state.save()
+        print_browser_state_savings(browser_state)
+        if cache is not None:
+            cache.save()
+        if snapshots is not None:
+            snapshots.prune()
+            snapshots.save()
         print(f"\nResult: {result}")
         return
 
-    # Full check
-    new_sales = check_all_stores(state, verbose=args.verbose)
+    if args.command == "merge-state":
+        policy = None if args.dry_run else NotificationPolicy(send_notifications, priority, events)
+        new_sales, product_alerts = merge_state(
+            state,
+            args.partials,
+            verbose=args.verbose,
+            platform_cache=platform_cache,
+            history=history,
+            sale_links=sale_links,
+            redirects=redirects,
+            cascade_stats=cascade_stats,
+            events=events,
+            policy=policy,
+        )
+        regressions = history.regressions()
+        if policy is not None:
+            policy.flush(product_alerts)
+            if args.perf_alerts:
+                send_perf_alert(regressions)
+        print_summary(new_sales, state, regressions)
+        if events is not None:
+            events.emit("run_finished", new_sales=len(new_sales))
+            events.close()
+        platform_cache.save()
+        sale_links.save()
+        redirects.save()
+        cascade_stats.save()
+        history.save()
+        if state.save():
+            print(f"\n💾 State saved to {args.state_file}")
+        else:
+            print(f"\n💾 No sale changes; run data saved to {state.volatile_file}")
+        return
+
+    if args.command == "plan-shards":
+        if args.count < 1:
+            parser.error("--count must be at least 1")
+        shards = assign_shards([s.name for s in get_all_scrapers()], state.get_durations(), args.count)
+        write_shard_plan(args.output, shards)
+        print(f"🧩 Wrote {args.count}-shard plan to {args.output}")
+        for index, names in enumerate(shards, 1):
+            print(f"   {index}/{args.count}: {len(names)} stores")
+        return
+
+    scrapers = get_all_scrapers()
+    for scraper in scrapers:
+        configure_scraper(
+            scraper, args, platform_cache, snapshots, sale_links, redirects, cascade_stats, browser_state
+        )
+
+    if args.command == "work":
+        queue = open_queue(args.queue, lease_seconds=args.lease)
+        run_worker(queue, scrapers, args.name or default_worker_name(), verbose=args.verbose, idle_exit=args.idle_exit)
+        platform_cache.save()
+        sale_links.save()
+        redirects.save()
+        browser_state.save()
+        if snapshots is not None:
+            snapshots.prune()
+            snapshots.save()
+        return
 
-    # Send notifications (unless dry run)
-    if not args.dry_run:
-        send_notifications(new_sales)
+    if args.command == "coordinate":
+        queue = open_queue(args.queue, lease_seconds=args.lease)
+        policy = None if args.dry_run else NotificationPolicy(send_notifications, priority, events)
+        if events is not None:
+            events.emit("run_started", stores=len(scrapers), shard=None)
+        new_sales, results = run_coordinator(
+            queue,
+            state,
+            scrapers,
+            args.run_id or datetime.now().strftime("%Y%m%dT%H%M%S"),
+            verbose=args.verbose,
+            events=events,
+            policy=policy,
+            timeout=args.timeout,
+        )
+        if policy is not None:
+            policy.flush()
+        print_worker_stats(queue)
+        print_summary(new_sales, state)
+        cascade_stats.record_results(results)
+        cascade_stats.save()
+        if state.save():
+            print(f"\n💾 State saved to {args.state_file}")
+        else:
+            print(f"\n💾 No sale changes; run data saved to {state.volatile_file}")
+        if events is not None:
+            events.emit("run_finished", stores=len(results), new_sales=len(new_sales))
+            events.close()
+        return
+
+    if args.subscribers:
+        subscribers = load_subscribers(args.subscribers)
+        if not subscribers:
+            print(f"❌ No subscribers found in {args.subscribers}")
+            sys.exit(1)
+        check_for_subscribers(
+            subscribers, scrapers, verbose=args.verbose, dry_run=args.dry_run, cache=cache
+        )
+        platform_cache.save()
+        sale_links.save()
+        print_sale_link_changes(sale_links)
+        redirects.save()
+        print_redirect_savings(redirects)
+        browser_state.save()
+        print_browser_state_savings(browser_state)
+        if cache is not None:
+            cache.save()
+        if snapshots is not None:
+            snapshots.prune()
+            snapshots.save()
+        return
+
+    if args.shard:
+        scrapers = select_shard(scrapers, state, args.shard, args.shard_plan)
+        print(f"\n🧩 Shard {args.shard}: {', '.join(s.name for s in scrapers)}")
+
+    sitemap_state = None
+    if args.sitemap_prepass:
+        sitemap_state = SitemapState(args.sitemap_state)
+        scrapers = sitemap_prepass(scrapers, sitemap_state, verbose=args.verbose)
+
+    profiler = StoreProfiler(args.profile_dir) if args.profile else None
+    if profiler is not None and args.workers > 0:
+        # cProfile and tracemalloc need one store at a time to attribute costs
+        print("⚠️  --profile checks stores one at a time and detects inline")
+        args.workers = 0
+
+    # Full check; single-store runs above always detect inline
+    detection_pool = DetectionPool(args.workers) if args.workers > 0 else None
+    for scraper in scrapers:
+        scraper.detection_pool = detection_pool
+
+    # Shard jobs notify priority stores themselves and leave the batch to merge-state
+    policy = None
+    if not args.dry_run and (priority or not args.shard):
+        policy = NotificationPolicy(send_notifications, priority, events)
+    if events is not None:
+        events.emit("run_started", stores=len(scrapers), shard=args.shard)
+
+    results: dict[str, dict] = {}
+    try:
+        new_sales = check_all_stores(
+            state,
+            verbose=args.verbose,
+            scrapers=scrapers,
+            results=results,
+            cache=cache,
+            revalidate=args.stale_while_revalidate,
+            concurrency=2 * args.workers if detection_pool else 1,
+            profiler=profiler,
+            history=history,
+            events=events,
+            policy=policy,
+        )
+    finally:
+        if detection_pool is not None:
+            detection_pool.close()
+    if cache is not None:
+        cache.save()
+    if args.cascade:
+        print_cascade_deciders(results.values())
+
+    if sitemap_state is not None:
+        for scraper in scrapers:
+            sitemap_state.mark_checked(scraper.name)
+        sitemap_state.save()
+
+    # A watchlist needs product tracking, so it switches it on
+    watchlist = load_watchlist(args.watchlist)
+    if watchlist is not None:
+        print(f"\n👀 Loaded {len(watchlist)} watchlist rule(s) from {args.watchlist}")
+
+    product_alerts = []
+    if args.track_products or watchlist:
+        product_alerts = track_products(
+            ProductState(args.products_dir),
+            verbose=args.verbose,
+            watchlist=watchlist,
+            scrapers=scrapers,
+        )
+    platform_cache.save()
+    sale_links.save()
+    print_sale_link_changes(sale_links)
+    redirects.save()
+    print_redirect_savings(redirects)
+    browser_state.save()
+    print_browser_state_savings(browser_state)
+    if snapshots is not None:
+        snapshots.prune()
+        snapshots.save()
+        print(f"\n🗄️  Pages archived as run {snapshots.run_id} in {args.archive_dir}")
+
+    # Shard jobs leave state changes and notifications to merge-state
+    if args.shard:
+        durations = state.get_durations()
+        write_partial(
+            args.partial_state,
+            args.shard,
+            results,
+            {name: durations[name] for name in results if name in durations},
+            product_alerts,
+            {s.name: platform_cache.entries[s.name] for s in scrapers if s.name in platform_cache.entries},
+            history.current,
+            {s.name: sale_links.entries[s.name] for s in scrapers if s.name in sale_links.entries},
+            redirects.entries,
+            [sale["store_name"] for sale in policy.sent_now] if policy is not None else [],
+        )
+        print(f"\n💾 Shard results saved to {args.partial_state}")
+        if events is not None:
+            events.emit("run_finished", stores=len(results), new_sales=len(new_sales))
+            events.close()
+        if profiler is not None:
+            profiler.print_report()
+            print(f"\n📊 Profiles written to {profiler.write()}")
+        return
+
+    # Send the batched notifications (priority stores were notified as found)
+    if policy is not None:
+        if profiler is not None:
+            profiler.run("notifications", policy.flush, product_alerts)
+        else:
+            policy.flush(product_alerts)
+
+    regressions = history.regressions()
+    if args.perf_alerts and not args.dry_run:
+        send_perf_alert(regressions)
+
+    if profiler is not None:
+        profiler.print_report()
+        print(f"\n📊 Profiles written to {profiler.write()}")
 
     # Print summary
-    print_summary(new_sales, state)
+    print_summary(new_sales, state, regressions)
 
     # Save state
-    state.save()
-    print(f"\n💾 State saved to {args.state_file}")
+    cascade_stats.record_results(results)
+    cascade_stats.save()
+    history.save()
+    if state.save():
+        print(f"\n💾 State saved to {args.state_file}")
+    else:
+        print(f"\n💾 No sale changes; run data saved to {state.volatile_file}")
+    if events is not None:
+        events.emit("run_finished", stores=len(results), new_sales=len(new_sales))
+        events.close()
 
 
 if __name__ == "__main__":
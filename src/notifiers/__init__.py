@@ -1,4 +1,5 @@
 from .email_notify import EmailNotifier
 from .ntfy_notify import NtfyNotifier
+from .policy import NotificationPolicy
 
-__all__ = ["EmailNotifier", "NtfyNotifier"]
+__all__ = ["EmailNotifier", "NtfyNotifier", "NotificationPolicy"]
@@ -0,0 +1,74 @@
+"""When new sales are notified: at once for priority stores, batched otherwise."""
+
+from typing import Callable, Iterable, Optional
+
+
+class NotificationPolicy:
+    """
+    Routes each new sale as soon as it is found.
+
+    Sales at priority stores are sent immediately, one notification each.
+    All other sales are held and sent together by :meth:`flush` at the end
+    of the run, so a long run doesn't delay the stores that matter most
+    and doesn't flood the phone with the rest.
+
+    Args:
+        send: Sends a list of sales through every channel
+        priority: Store names (case-insensitive) notified immediately;
+            "*" makes every store a priority store
+        events: Optional ``EventStream`` that gets a ``notified`` event
+            for every send
+    """
+
+    def __init__(
+        self,
+        send: Callable[[list[dict]], None],
+        priority: Iterable[str] = (),
+        events=None,
+    ):
+        self.send = send
+        self.priority = {name.strip().lower() for name in priority if name.strip()}
+        self.events = events
+        self.pending: list[dict] = []
+        self.sent_now: list[dict] = []
+        self.sent_elsewhere: set[str] = set()
+
+    def is_priority(self, store_name: str) -> bool:
+        return "*" in self.priority or store_name.lower() in self.priority
+
+    def mark_sent(self, store_names: Iterable[str]) -> None:
+        """Treat new sales at these stores as already notified, e.g. by a shard job."""
+        self.sent_elsewhere.update(name.lower() for name in store_names)
+
+    def add(self, sale: dict) -> bool:
+        """
+        Notify a new sale now or hold it for the batch.
+
+        Returns:
+            True if it was sent immediately (or already was, see :meth:`mark_sent`)
+        """
+        if sale.get("store_name", "").lower() in self.sent_elsewhere:
+            self.sent_now.append(sale)
+            return True
+        if not self.is_priority(sale.get("store_name", "")):
+            self.pending.append(sale)
+            return False
+        self._send([sale], immediate=True)
+        self.sent_now.append(sale)
+        return True
+
+    def flush(self, extra: Optional[list[dict]] = None) -> None:
+        """Send the held sales together with ``extra`` alerts (e.g. product markdowns)."""
+        batch = self.pending + list(extra or [])
+        self.pending = []
+        if batch or not self.sent_now:
+            self._send(batch, immediate=False)
+
+    def _send(self, sales: list[dict], immediate: bool) -> None:
+        self.send(sales)
+        if self.events is not None and sales:
+            self.events.emit(
+                "notified",
+                immediate=immediate,
+                stores=[sale.get("store_name") for sale in sales],
+            )
@@ -1,6 +1,10 @@
 """Scrapers for all fashion stores."""
 
 from .base import BaseScraper
+from .cascade import DEFAULT_CASCADE, Detector, run_cascade
+from .detect_pool import DetectionPool
+from .family import StoreFamily, check_family, group_by_family, iter_by_family
+from .sections import Section, SectionedStore, expand_sections, iter_sections, section_names
 from .hm_group import HM_GROUP_SCRAPERS
 from .inditex import INDITEX_SCRAPERS
 from .scandi_brands import SCANDI_SCRAPERS
@@ -33,16 +37,31 @@ def get_all_scrapers() -> list[BaseScraper]:
 
 
 def get_scraper_by_name(name: str) -> BaseScraper | None:
-    """Get a scraper by store name."""
+    """Get a scraper by store name, or a single section of a multi-section store."""
     for scraper_class in ALL_SCRAPERS:
         scraper = scraper_class()
         if scraper.name.lower() == name.lower():
             return scraper
+        if isinstance(scraper, SectionedStore) and scraper.section(name):
+            return scraper.section(name)
     return None
 
 
 __all__ = [
     "BaseScraper",
+    "DEFAULT_CASCADE",
+    "Detector",
+    "run_cascade",
+    "DetectionPool",
+    "StoreFamily",
+    "Section",
+    "SectionedStore",
+    "expand_sections",
+    "iter_sections",
+    "section_names",
+    "check_family",
+    "group_by_family",
+    "iter_by_family",
     "get_all_scrapers",
     "get_scraper_by_name",
     "ALL_SCRAPERS",
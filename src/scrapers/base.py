@@ -1,13 +1,28 @@
 """Base scraper class with common functionality."""
 
+import json
 import re
 import time
-from typing import Optional
-from urllib.parse import urljoin
+from typing import Any, Callable, Iterable, Optional
+from urllib.parse import urljoin, urlparse
 
 import requests
 from bs4 import BeautifulSoup
 
+from ..utils.products import Product
+from .cascade import run_cascade
+from .family import accept_consent
+from .page_script import DETECTION_SCRIPT
+from .platforms import NoSaleListing, PlatformAdapter, detect_platform, get_adapter
+from .structured import (
+    collect_products,
+    decode_blobs,
+    extract_products,
+    extract_structured,
+    parse_price,
+    summarize_products,
+)
+
 
 class BaseScraper:
     """Base class for all store scrapers."""
@@ -31,12 +46,48 @@ class BaseScraper:
         r"-\s*(\d{1,2})\s*%",
     ]
 
+    # URL paths that point at a sale section
+    SALE_URL_PATTERN = r"/(sale|rea|outlet|kampanj|erbjudande)"
+
+    # Link texts that point at a sale section
+    SALE_LINK_WORDS = ["sale", "rea", "rabatt", "erbjudande", "kampanj"]
+
+    # Areas where sales are typically announced
+    IMPORTANT_SELECTORS = [
+        "header", "nav", ".banner", ".hero",
+        ".announcement", ".promo", ".campaign",
+        "[class*='sale']", "[class*='rea']",
+        "[class*='banner']", "[class*='offer']",
+        "h1", "h2", "h3", "a"
+    ]
+
+    # A sale page listing more products than this is considered an active sale
+    MIN_SALE_PRODUCTS = 5
+
+    PRODUCT_SELECTOR = ".product, .product-card, .product-item, [data-product]"
+
+    BROWSER_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+
+    # StoreFamily shared with sister storefronts on the same platform
+    family = None
+
+    # Buttons that accept the store's cookie banner; clicked on a cold start
+    # and remembered in the saved browser state (families use theirs)
+    CONSENT_SELECTORS: list[str] = []
+
+    # Prices as shown on Swedish and international product cards
+    PRICE_PATTERN = re.compile(
+        r"(?:(?:SEK|kr)\s*)?(\d{1,3}(?:[ \u00a0.,]?\d{3})*(?:[.,]\d{1,2})?)\s*(?:kr|SEK|:-)",
+        re.IGNORECASE,
+    )
+
     def __init__(
         self,
         name: str,
         base_url: str,
         sale_path: Optional[str] = None,
         use_playwright: bool = True,
+        platform: Optional[str] = None,
     ):
         """
         Initialize scraper.
@@ -46,60 +97,254 @@ class BaseScraper:
             base_url: Main page URL (e.g., men's section)
             sale_path: Optional path to dedicated sale page
             use_playwright: Use browser for JS-heavy sites
+            platform: Known commerce platform (e.g. "shopify"); detected if omitted
         """
         self.name = name
         self.base_url = base_url
         self.sale_path = sale_path
         self.use_playwright = use_playwright
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.platform = platform
+        # Optional PlatformCache shared across scrapers, set by the caller
+        self.platform_cache = None
+        # Run detection inside the browser page instead of shipping the HTML
+        self.in_browser = False
+        # Optional DetectionPool that parses and detects in worker processes
+        self.detection_pool = None
+        # Optional SnapshotArchive that keeps a copy of every fetched page
+        self.snapshots = None
+        # Bytes of HTML fetched since the caller last reset it
+        self.bytes_fetched = 0
+        # Optional SaleLinkCache of learned sale URLs, set by the caller
+        self.sale_links = None
+        # Optional detector cascade (see ``cascade``) and its per-store stats
+        self.cascade = None
+        self.cascade_stats = None
+        # Revalidated sale URL for this check; skips the link scan when set
+        self.known_sale_link: Optional[str] = None
+        # Optional RedirectCache of final URLs, set by the caller
+        self.redirects = None
+        # Browser session lent by a multi-section store for one check
+        self.browser_session = None
+        # Optional BrowserStateStore of saved cookies and localStorage
+        self.browser_state = None
+        # Keep fetched pages by URL for check_products to reuse this run
+        self.keep_pages = False
+        self.fetched_pages: dict[str, str] = {}
+        headers = {
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
             "Accept-Language": "sv-SE,sv;q=0.9,en;q=0.8",
-        })
+        }
+        if self.family is not None:
+            # Sister storefronts share cookies and connections
+            self.session = self.family.session(headers)
+        else:
+            self.session = requests.Session()
+            self.session.headers.update(headers)
 
     def fetch_page(self, url: str) -> Optional[str]:
         """Fetch page content."""
         if self.use_playwright:
-            return self._fetch_with_playwright(url)
-        return self._fetch_with_requests(url)
+            html = self._fetch_with_playwright(url)
+        else:
+            html = self._fetch_with_requests(url)
+        return self._record_fetch(url, html)
+
+    def fetch_plain(self, url: str) -> Optional[str]:
+        """Fetch page content over plain HTTP, even for browser-rendered stores."""
+        return self._record_fetch(url, self._fetch_with_requests(url))
+
+    def _record_fetch(self, url: str, html: Optional[str]) -> Optional[str]:
+        """Count and archive a fetched page."""
+        if html:
+            self.bytes_fetched += len(html.encode("utf-8"))
+            if self.snapshots is not None:
+                self.snapshots.add(self.name, url, html)
+            if self.keep_pages:
+                self.fetched_pages[url] = html
+        return html
+
+    def _resolve_redirect(self, url: str) -> str:
+        """URL to fetch instead of ``url``, skipping known redirects."""
+        return self.redirects.resolve(url) if self.redirects is not None else url
+
+    def _note_redirects(
+        self,
+        url: str,
+        target: str,
+        final_url: str,
+        status: int,
+        hops: int,
+        seconds: Optional[float] = None,
+    ) -> None:
+        """Update the redirect cache after fetching ``target`` for ``url``."""
+        if self.redirects is None:
+            return
+        if target != url and hops == 0:
+            self.redirects.hit(url)
+            return
+        if target != url:
+            # The shortcut itself redirected: the chain got longer
+            hops += self.redirects.entries.get(url, {}).get("hops", 0)
+        self.redirects.record(url, final_url, status, hops, seconds)
+
+    def _shortcut_failed(self, url: str, target: str) -> bool:
+        """Drop a redirect shortcut that failed; True if ``url`` should be retried."""
+        if target == url or self.redirects is None:
+            return False
+        print(f"[{self.name}] Cached redirect failed, following redirects again")
+        self.redirects.invalidate(url)
+        return True
 
     def _fetch_with_requests(self, url: str) -> Optional[str]:
         """Fetch page using requests."""
+        target = self._resolve_redirect(url)
         try:
-            response = self.session.get(url, timeout=30, allow_redirects=True)
+            response = self.session.get(target, timeout=30, allow_redirects=True)
             response.raise_for_status()
-            return response.text
         except Exception as e:
+            if self._shortcut_failed(url, target):
+                return self._fetch_with_requests(url)
             print(f"[{self.name}] Request failed: {e}")
             return None
 
-    def _fetch_with_playwright(self, url: str) -> Optional[str]:
-        """Fetch page using playwright for JS-heavy sites."""
+        self._note_redirects(
+            url,
+            target,
+            response.url,
+            response.status_code,
+            len(response.history),
+            sum(r.elapsed.total_seconds() for r in response.history),
+        )
+        return response.text
+
+    def probe_url(self, url: str) -> Optional[str]:
+        """
+        Cheaply check that a URL still answers.
+
+        Uses HEAD (GET without reading the body if HEAD is refused) and
+        follows redirects.
+
+        Returns:
+            The final URL, or None on an error status or a redirect to the
+            site's front page
+        """
         try:
-            from playwright.sync_api import sync_playwright
+            response = self.session.head(url, timeout=10, allow_redirects=True)
+            if response.status_code in (403, 405, 501):
+                response = self.session.get(url, timeout=10, allow_redirects=True, stream=True)
+                response.close()
+        except Exception as e:
+            print(f"[{self.name}] Probe failed: {e}")
+            return None
 
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
+        if response.status_code >= 400:
+            return None
+        if response.history and urlparse(response.url).path in ("", "/"):
+            return None
+        return response.url
+
+    def _goto(self, page: Any, url: str) -> None:
+        """Navigate to ``url``, through a cached redirect target if known."""
+        target = self._resolve_redirect(url)
+        response = page.goto(target, wait_until="domcontentloaded", timeout=45000)
+        if (response is None or response.status >= 400) and self._shortcut_failed(url, target):
+            target = url
+            response = page.goto(url, wait_until="domcontentloaded", timeout=45000)
+        if response is not None:
+            hops = 0
+            request = response.request.redirected_from
+            while request is not None:
+                hops += 1
+                request = request.redirected_from
+            self._note_redirects(url, target, page.url, response.status, hops)
+
+    def _with_page(self, url: str, action: Callable[[Any], Any]) -> Any:
+        """Open ``url`` in a headless browser and return ``action(page)``."""
+        shared = self.browser_session
+        if shared is None and self.family is not None:
+            shared = self.family.browser
+        if shared is not None and shared.usable():
+            return shared.run(lambda page: self._goto(page, url), url, action)
+
+        from playwright.sync_api import sync_playwright
+
+        saved = self.browser_state.get(self.name) if self.browser_state is not None else None
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            try:
                 context = browser.new_context(
                     viewport={"width": 1920, "height": 1080},
-                    user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+                    user_agent=self.BROWSER_USER_AGENT,
                     locale="sv-SE",
+                    storage_state=saved,
                 )
                 page = context.new_page()
 
                 # Block heavy resources to speed up
                 page.route("**/*.{png,jpg,jpeg,gif,webp,svg}", lambda route: route.abort())
 
-                page.goto(url, wait_until="domcontentloaded", timeout=45000)
+                started = time.monotonic()
+                self._goto(page, url)
+                if accept_consent(page, self.consent_selectors(), wait=saved is None) and saved:
+                    # The saved state no longer gets past the banner
+                    print(f"[{self.name}] Saved browser state expired, refreshing")
+                    self.browser_state.invalidate(self.name)
+                    saved = None
                 time.sleep(2)  # Wait for dynamic content
-                content = page.content()
+                result = action(page)
+
+                if self.browser_state is not None:
+                    self.browser_state.record_render(self.name, time.monotonic() - started, saved is not None)
+                    if saved is None:
+                        self.browser_state.save_state(self.name, context)
+                return result
+            finally:
                 browser.close()
-                return content
+
+    def consent_selectors(self) -> list[str]:
+        """Cookie banner buttons to accept, from the family or the scraper."""
+        if self.family is not None and self.family.consent_selectors:
+            return self.family.consent_selectors
+        return self.CONSENT_SELECTORS
+
+    def _fetch_with_playwright(self, url: str) -> Optional[str]:
+        """Fetch page using playwright for JS-heavy sites."""
+        try:
+            return self._with_page(url, lambda page: page.content())
         except Exception as e:
             print(f"[{self.name}] Playwright fetch failed: {e}")
             return None
 
+    def evaluate_page(self, url: str) -> Optional[dict]:
+        """
+        Render a page and run the detection script inside it.
+
+        Returns:
+            Compact payload (see ``page_script``), or None on failure
+        """
+        selectors, product_selector = self.IMPORTANT_SELECTORS, self.PRODUCT_SELECTOR
+        if self.family is not None:
+            selectors = self.family.important_selectors + selectors
+            if self.family.product_selector:
+                product_selector = f"{self.family.product_selector}, {product_selector}"
+        options = {
+            "selectors": selectors,
+            "productSelector": product_selector,
+            "linkWords": self.SALE_LINK_WORDS,
+            "linkPattern": self.SALE_URL_PATTERN,
+            "maxLinks": 50,
+        }
+        try:
+            payload = self._with_page(url, lambda page: page.evaluate(DETECTION_SCRIPT, options))
+        except Exception as e:
+            print(f"[{self.name}] Playwright evaluate failed: {e}")
+            return None
+        if payload and self.snapshots is not None:
+            archived = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+            self.snapshots.add(self.name, url, archived, kind="payload")
+        return payload
+
     def parse_html(self, html: str) -> BeautifulSoup:
         """Parse HTML content."""
         return BeautifulSoup(html, "lxml")
@@ -116,29 +361,50 @@ class BaseScraper:
         Returns:
             (has_sale, description, sale_link)
         """
-        # Areas where sales are typically announced
-        important_selectors = [
-            "header", "nav", ".banner", ".hero",
-            ".announcement", ".promo", ".campaign",
-            "[class*='sale']", "[class*='rea']",
-            "[class*='banner']", "[class*='offer']",
-            "h1", "h2", "h3", "a"
-        ]
-
         important_text = ""
-        for selector in important_selectors:
-            for el in soup.select(selector):
-                important_text += " " + el.get_text()
-
-        important_text = important_text.lower()
-        full_text = soup.get_text().lower()
-
+        for el in self._important_elements(soup):
+            important_text += " " + el.get_text()
+
+        return self._detect_in_text(
+            important_text.lower(),
+            lambda: self._extract_discount(soup.get_text().lower()),
+            lambda: self._find_sale_link(soup),
+        )
+
+    def _important_elements(self, soup: BeautifulSoup) -> list:
+        """Elements of the regions where sales are announced."""
+        if self.family is not None:
+            return self.family.select_important(soup, self.IMPORTANT_SELECTORS)
+        return [el for selector in self.IMPORTANT_SELECTORS for el in soup.select(selector)]
+
+    def _product_elements(self, soup: BeautifulSoup) -> list:
+        """Product cards on a page."""
+        if self.family is not None:
+            return self.family.select_products(soup, self.PRODUCT_SELECTOR)
+        return soup.select(self.PRODUCT_SELECTOR)
+
+    def detect_sale_payload(self, payload: dict) -> tuple[bool, str, Optional[str]]:
+        """Same as :meth:`detect_sale` for an in-browser detection payload."""
+        discounts = [d for d in payload.get("discounts", []) if 10 <= d <= 80]
+        return self._detect_in_text(
+            payload.get("importantText", "").lower(),
+            lambda: max(discounts) if discounts else None,
+            lambda: self.known_sale_link or self._pick_sale_link(payload.get("links", [])),
+        )
+
+    def _detect_in_text(
+        self,
+        important_text: str,
+        page_discount: Callable[[], Optional[int]],
+        find_link: Callable[[], Optional[str]],
+    ) -> tuple[bool, str, Optional[str]]:
+        """Keyword and discount checks on the lowercased important-region text."""
         # Check for strong sale keywords
         for pattern in self.SALE_KEYWORDS_STRONG:
             if re.search(pattern, important_text, re.IGNORECASE):
-                discount = self._extract_discount(important_text) or self._extract_discount(full_text)
-                description = f"Upp till {discount}% rabatt" if discount else "REA pågår"
-                sale_link = self._find_sale_link(soup)
+                discount = self._extract_discount(important_text) or page_discount()
+                description = self._describe(discount)
+                sale_link = find_link()
                 return True, description, sale_link
 
         # Check for discount percentages
@@ -149,7 +415,7 @@ class BaseScraper:
                     discount = int(match.group(1))
                     if 10 <= discount <= 80:
                         description = f"Upp till {discount}% rabatt"
-                        sale_link = self._find_sale_link(soup)
+                        sale_link = find_link()
                         return True, description, sale_link
                 except (ValueError, IndexError):
                     pass
@@ -171,16 +437,22 @@ class BaseScraper:
 
     def _find_sale_link(self, soup: BeautifulSoup) -> Optional[str]:
         """Find a link to the sale page."""
-        for link in soup.find_all("a", href=True):
-            href = link.get("href", "")
-            link_text = link.get_text().lower()
-
+        if self.known_sale_link:
+            return self.known_sale_link
+        return self._pick_sale_link(
+            (link.get("href", ""), link.get_text().lower())
+            for link in soup.find_all("a", href=True)
+        )
+
+    def _pick_sale_link(self, links: Iterable[tuple[str, str]]) -> Optional[str]:
+        """Return the first ``(href, lowercased text)`` that points at a sale."""
+        for href, link_text in links:
             # Check link text for sale words
-            if any(w in link_text for w in ["sale", "rea", "rabatt", "erbjudande", "kampanj"]):
+            if any(w in link_text for w in self.SALE_LINK_WORDS):
                 return self._normalize_url(href)
 
             # Check URL for sale paths
-            if re.search(r"/(sale|rea|outlet|kampanj|erbjudande)", href, re.IGNORECASE):
+            if re.search(self.SALE_URL_PATTERN, href, re.IGNORECASE):
                 return self._normalize_url(href)
 
         return None
@@ -191,15 +463,272 @@ class BaseScraper:
             return href
         return urljoin(self.base_url, href)
 
-    def check_sale(self) -> dict:
+    def _describe(self, discount: Optional[int]) -> str:
+        """Human readable sale description."""
+        return f"Upp till {discount}% rabatt" if discount else "REA pågår"
+
+    def detect_page(self, html: str) -> tuple[bool, str, Optional[str], str]:
+        """
+        Detect a sale on a store's main page.
+
+        Uses the embedded JSON fast path when the page has a known product
+        blob with enough marked-down products. Too few is not proof of no
+        sale (the sale may only be announced in a banner), so the DOM is
+        parsed then as well.
+
+        Returns:
+            (has_sale, description, sale_link, detection_path)
+        """
+        structured = extract_structured(html)
+        if structured and structured["on_sale"] > self.MIN_SALE_PRODUCTS:
+            sale_link = self._normalize_url(self.sale_path) if self.sale_path else None
+            return True, self._describe(structured["max_discount"]), sale_link, "structured"
+
+        soup = self.parse_html(html)
+        has_sale, description, sale_link = self.detect_sale(soup)
+        return has_sale, description, sale_link, "dom"
+
+    def detect_sale_page(self, html: str) -> tuple[bool, str, str]:
+        """
+        Detect whether a dedicated sale page lists enough products.
+
+        An embedded blob may cover only the first few tiles, so too few
+        products in it is not final and the DOM cards are counted too.
+
+        Returns:
+            (has_sale, description, detection_path)
+        """
+        structured = extract_structured(html)
+        if structured and structured["products"] > self.MIN_SALE_PRODUCTS:
+            return True, self._describe(structured["max_discount"]), "structured"
+
+        soup = self.parse_html(html)
+        products = self._product_elements(soup)
+        if len(products) > self.MIN_SALE_PRODUCTS:
+            discount = self._extract_discount(soup.get_text().lower())
+            return True, self._describe(discount), "dom"
+        return False, "", "dom"
+
+    def _run_detect_page(self, html: str) -> tuple[bool, str, Optional[str], str]:
+        """:meth:`detect_page`, in the detection pool when one is attached."""
+        if self.detection_pool is None:
+            return self.detect_page(html)
+        result = self.detection_pool.detect(self, html, "main")
+        return result["has_sale"], result["description"], result["sale_link"], result["detection_path"]
+
+    def _run_detect_sale_page(self, html: str) -> tuple[bool, str, str]:
+        """:meth:`detect_sale_page`, in the detection pool when one is attached."""
+        if self.detection_pool is None:
+            return self.detect_sale_page(html)
+        result = self.detection_pool.detect(self, html, "sale")
+        return result["has_sale"], result["description"], result["detection_path"]
+
+    def detect_platform(self) -> Optional[str]:
+        """
+        Find out which supported commerce platform the store runs on.
+
+        Uses the configured platform or the cache when available, otherwise
+        makes one plain HTTP request to the main page and caches the answer.
+        """
+        if self.platform:
+            return self.platform
+
+        if self.platform_cache is not None:
+            found, platform = self.platform_cache.lookup(self.name)
+            if found:
+                return platform
+
+        # A failed fetch is cached as "no platform" too, so blocked stores
+        # don't pay for detection on every run
+        html = self._fetch_with_requests(self.base_url)
+        platform = detect_platform(html) if html else None
+        if self.platform_cache is not None:
+            self.platform_cache.set(self.name, platform)
+        return platform
+
+    def _platform_failed(self) -> None:
+        """Drop a cached platform whose adapter no longer works."""
+        if self.platform_cache is not None:
+            self.platform_cache.invalidate(self.name)
+
+    def _platform_adapter(self) -> Optional[PlatformAdapter]:
+        """The store's platform adapter, unless it is known to have no sale listing there."""
+        adapter = get_adapter(self.detect_platform())
+        if adapter is not None and self.platform_cache is not None:
+            if not self.platform_cache.has_sale_listing(self.name):
+                return None
+        return adapter
+
+    def _no_sale_listing(self, adapter: PlatformAdapter) -> None:
+        """Keep the platform but stop asking its adapter for a listing that isn't there."""
+        print(f"[{self.name}] No {adapter.name} sale listing, checking the HTML")
+        if self.platform_cache is not None:
+            self.platform_cache.mark_no_sale_listing(self.name)
+
+    def check_sale_with_platform(self) -> Optional[dict]:
+        """Check through the platform's JSON endpoint, or None to use HTML."""
+        adapter = self._platform_adapter()
+        if adapter is None:
+            return None
+        try:
+            result = adapter.check(self)
+        except NoSaleListing:
+            self._no_sale_listing(adapter)
+            return None
+        if result is None:
+            print(f"[{self.name}] {adapter.name} adapter failed, falling back to HTML")
+            self._platform_failed()
+        return result
+
+    def detect_page_payload(self, payload: dict) -> tuple[bool, str, Optional[str], str]:
+        """:meth:`detect_page` for an in-browser detection payload."""
+        structured = summarize_products(*collect_products(decode_blobs(payload.get("blobs", []))))
+        if structured and structured["on_sale"] > self.MIN_SALE_PRODUCTS:
+            sale_link = self._normalize_url(self.sale_path) if self.sale_path else None
+            return True, self._describe(structured["max_discount"]), sale_link, "structured"
+
+        has_sale, description, sale_link = self.detect_sale_payload(payload)
+        return has_sale, description, sale_link, "in-browser"
+
+    def detect_sale_page_payload(self, payload: dict) -> tuple[bool, str, str]:
+        """:meth:`detect_sale_page` for an in-browser detection payload."""
+        structured = summarize_products(*collect_products(decode_blobs(payload.get("blobs", []))))
+        if structured and structured["products"] > self.MIN_SALE_PRODUCTS:
+            return True, self._describe(structured["max_discount"]), "structured"
+
+        if payload.get("productCount", 0) > self.MIN_SALE_PRODUCTS:
+            discounts = [d for d in payload.get("discounts", []) if 10 <= d <= 80]
+            return True, self._describe(max(discounts) if discounts else None), "in-browser"
+        return False, "", "in-browser"
+
+    def revalidate_sale_link(self) -> Optional[str]:
+        """
+        Check that the remembered sale URL still works.
+
+        Returns:
+            Its current final URL, or None if nothing is remembered or the
+            remembered URL stopped working (it is then forgotten)
+        """
+        if self.sale_links is None:
+            return None
+        entry = self.sale_links.get(self.name)
+        if not entry:
+            return None
+
+        final_url = self.probe_url(entry["url"])
+        if final_url is None:
+            print(f"[{self.name}] Remembered sale link stopped working: {entry['url']}")
+            self.sale_links.invalidate(self.name)
+            return None
+        if final_url != entry.get("final_url"):
+            self.sale_links.set(self.name, entry["url"], final_url)
+        return final_url
+
+    def learn_sale_link(self, url: str, previous: Optional[str] = None) -> Optional[str]:
+        """
+        Remember a sale URL that replaces a configured one that stopped working.
+
+        Args:
+            url: Sale URL found on the main page, already verified to list
+                sale products
+            previous: URL it replaces, reported as a change if different
+
+        Returns:
+            The URL's final redirect target, or None if it does not answer
+        """
+        final_url = self.probe_url(url)
+        if final_url is None:
+            return None
+        if self.sale_links is not None:
+            self.sale_links.set(self.name, url, final_url, previous)
+        if previous and previous != url:
+            print(f"[{self.name}] Sale section moved: {previous} → {url}")
+        return final_url
+
+    def _fetch_sale_page(self, url: str, in_browser: bool) -> tuple[Any, bool, str, str]:
+        """
+        Fetch a sale page and detect on it.
+
+        Returns:
+            (page, has_sale, description, detection_path); page is None if
+            it could not be fetched
+        """
+        page = self.evaluate_page(url) if in_browser else self.fetch_page(url)
+        if not page:
+            return None, False, "", ""
+        if in_browser:
+            has_sale, description, path = self.detect_sale_page_payload(page)
+        else:
+            has_sale, description, path = self._run_detect_sale_page(page)
+        return page, has_sale, description, path
+
+    def _resolve_sale_url(self, main_page: Any, in_browser: bool) -> tuple[Optional[str], Optional[tuple]]:
+        """
+        URL of the dedicated sale page to check.
+
+        The configured ``sale_path`` is used as long as it answers. Only
+        when it is gone (an error status or a redirect to the front page)
+        is the remembered URL used, and only when that is gone too are the
+        main page's links scanned. A link found there is learned only if
+        its own page passes :meth:`detect_sale_page`, so a loose match on
+        link text can't become the store's sale URL.
+
+        Returns:
+            (sale_url, verdict); ``verdict`` is the ``_fetch_sale_page``
+            result when the page was already fetched to verify it
+        """
+        configured = self._normalize_url(self.sale_path) if self.sale_path else None
+        if self.sale_links is None or (configured and self.probe_url(configured)):
+            return configured, None
+
+        remembered = self.revalidate_sale_link()
+        if remembered:
+            self.known_sale_link = remembered
+            return remembered, None
+
+        if in_browser:
+            found = self._pick_sale_link(main_page.get("links", []))
+        else:
+            found = self._find_sale_link(self.parse_html(main_page))
+        if not found or found == configured:
+            return None, None
+        verdict = self._fetch_sale_page(found, in_browser)
+        if not verdict[1]:
+            return None, None
+        final_url = self.learn_sale_link(found, previous=configured)
+        if final_url is None:
+            return None, None
+        self.known_sale_link = final_url
+        return final_url, verdict
+
+    def check_sale(self, main_page: Optional[str] = None, platform_checked: bool = False) -> dict:
         """
         Check if there's an active sale.
 
-        Returns dict with: active, store_name, url, description
+        Args:
+            main_page: Already fetched HTML of ``base_url`` to use instead of
+                fetching it again (ignored for in-browser detection)
+            platform_checked: The platform endpoint was already asked and
+                left the verdict open, so don't ask it again
+
+        Returns dict with: active, store_name, url, description, detection_path
         """
+        if not platform_checked:
+            result = self.check_sale_with_platform()
+            if result is not None:
+                return result
+
+        in_browser = self.in_browser and self.use_playwright
+        # Set when the configured sale_path is gone and a remembered or
+        # newly learned sale URL stands in for it
+        self.known_sale_link = None
+
         # Check main page for sale announcements
-        html = self.fetch_page(self.base_url)
-        if not html:
+        if in_browser:
+            page = self.evaluate_page(self.base_url)
+        else:
+            page = main_page or self.fetch_page(self.base_url)
+        if not page:
             return {
                 "active": False,
                 "store_name": self.name,
@@ -207,8 +736,10 @@ class BaseScraper:
                 "error": "Failed to fetch page",
             }
 
-        soup = self.parse_html(html)
-        has_sale, description, sale_link = self.detect_sale(soup)
+        if in_browser:
+            has_sale, description, sale_link, path = self.detect_page_payload(page)
+        else:
+            has_sale, description, sale_link, path = self._run_detect_page(page)
 
         if has_sale:
             return {
@@ -216,35 +747,110 @@ class BaseScraper:
                 "store_name": self.name,
                 "url": sale_link or self.base_url,
                 "description": description,
+                "detection_path": path,
             }
 
         # If no sale found on main page, check dedicated sale page if exists
-        if self.sale_path:
-            sale_url = self._normalize_url(self.sale_path)
-            html = self.fetch_page(sale_url)
-            if html:
-                soup = self.parse_html(html)
-                # Check if sale page has products (indicates active sale)
-                products = soup.select(".product, .product-card, .product-item, [data-product]")
-                if len(products) > 5:  # More than 5 products = active sale
-                    discount = self._extract_discount(soup.get_text().lower())
-                    description = f"Upp till {discount}% rabatt" if discount else "REA pågår"
+        sale_url, verdict = self._resolve_sale_url(page, in_browser)
+        if sale_url:
+            sale_page, has_sale, description, page_path = verdict or self._fetch_sale_page(sale_url, in_browser)
+            if sale_page:
+                path = page_path
+                if has_sale:
                     return {
                         "active": True,
                         "store_name": self.name,
                         "url": sale_url,
                         "description": description,
+                        "detection_path": path,
                     }
 
         return {
             "active": False,
             "store_name": self.name,
             "url": self.base_url,
+            "detection_path": path,
         }
 
+    def extract_products(self, html: str) -> list[Product]:
+        """
+        Extract every product listed on a page.
+
+        Reads embedded JSON when present, otherwise the product cards in
+        the DOM. On cards with two prices the lower one is the sale price.
+        """
+        _, products = extract_products(html)
+        if products:
+            for product in products:
+                if product.url:
+                    product.url = self._normalize_url(product.url)
+            return products
+
+        soup = self.parse_html(html)
+        found: dict[str, Product] = {}
+        for card in self._product_elements(soup):
+            prices = [
+                p for p in (parse_price(m) for m in self.PRICE_PATTERN.findall(card.get_text(" ")))
+                if p
+            ]
+            if not prices:
+                continue
+
+            link = card.find("a", href=True)
+            url = self._normalize_url(link["href"]) if link else None
+            name_el = card.select_one("[class*='name'], [class*='title'], h2, h3, h4") or link
+            name = name_el.get_text(" ", strip=True) if name_el else ""
+            product_id = (
+                card.get("data-product-id")
+                or card.get("data-id")
+                or card.get("data-sku")
+                or url
+                or name
+            )
+            if not product_id or product_id in found:
+                continue
+
+            original = max(prices) if len(prices) > 1 else None
+            found[product_id] = Product(product_id, name, min(prices), original, url)
+        return list(found.values())
+
+    def check_products(self) -> Optional[tuple[str, list[Product]]]:
+        """
+        Fetch the sale page and extract its products.
+
+        Reuses the page if this run's sale check already fetched it.
+
+        Returns:
+            (sale_url, products), or None if the page could not be fetched
+        """
+        adapter = self._platform_adapter()
+        if adapter is not None:
+            try:
+                products = adapter.fetch_products(self)
+            except NoSaleListing:
+                self._no_sale_listing(adapter)
+            else:
+                if products is not None:
+                    return adapter.sale_url(self), products
+                self._platform_failed()
+
+        url = self.known_sale_link or (self._normalize_url(self.sale_path) if self.sale_path else self.base_url)
+        html = self.fetched_pages.get(url)
+        self.fetched_pages.clear()
+        try:
+            html = html or self.fetch_page(url)
+            if not html:
+                return None
+            return url, self.extract_products(html)
+        except Exception as e:
+            print(f"[{self.name}] Product extraction failed: {e}")
+            return None
+
     def check(self) -> dict:
         """Main entry point."""
         try:
+            if self.cascade:
+                return run_cascade(self, self.cascade, self.cascade_stats)
             return self.check_sale()
         except Exception as e:
             print(f"[{self.name}] Error: {e}")
@@ -0,0 +1,195 @@
+"""Cost-ordered cascade of sale detectors.
+
+Instead of always rendering the main page in a browser, a check runs a
+list of detectors from cheapest to most expensive and stops at the first
+one that settles the verdict:
+
+1. ``probe``: HEAD request to the sale page. A 404/410 or a redirect to
+   the front page means no sale is running, unless the main page still
+   shows sale words, sale products or a link to a sale section.
+2. ``platform``: the commerce platform's JSON endpoint, when known.
+3. ``keywords``: plain HTTP fetch of the main page. A regex scan of the
+   raw HTML, and DOM detection only if it finds sale words.
+4. ``structured``: embedded product JSON in the same plain HTML.
+5. ``render``: the full ``check_sale`` (browser or HTTP), which always
+   decides.
+
+Cheap steps can only settle what they are sure of. For example, the
+keyword scan never reports "no sale", because a JS-rendered page may
+still show one. :class:`CascadeStats` records per store which steps were
+tried and which one decided (see ``src.utils.cascade_stats``). Steps that
+never decide for a store are skipped, apart from an occasional
+exploration run.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+from .structured import extract_structured
+
+
+def _verdict(scraper, active: bool, url: str, description: str = "", path: str = "") -> dict:
+    result = {"active": active, "store_name": scraper.name, "url": url, "detection_path": path}
+    if active:
+        result["description"] = description
+    return result
+
+
+class CascadeContext:
+    """Data shared between the steps of one store's cascade."""
+
+    def __init__(self, scraper):
+        self.scraper = scraper
+        self._html: Optional[str] = None
+        self._fetched = False
+        # The platform endpoint ran and left the verdict open
+        self.platform_checked = False
+
+    def plain_html(self) -> Optional[str]:
+        """The main page fetched once over plain HTTP."""
+        if not self._fetched:
+            self._fetched = True
+            self._html = self.scraper.fetch_plain(self.scraper.base_url)
+        return self._html
+
+
+class Detector(ABC):
+    """One step of the cascade; ``run`` returns a result or None if undecided."""
+
+    name = ""
+
+    @abstractmethod
+    def run(self, scraper, context: CascadeContext) -> Optional[dict]:
+        """Settle the verdict, or return None to pass to the next step."""
+
+
+def _has_sale_evidence(scraper, html: str) -> bool:
+    """Whether plain main-page HTML hints at a sale somewhere on the site."""
+    text = html.lower()
+    patterns = scraper.SALE_KEYWORDS_STRONG + scraper.DISCOUNT_PATTERNS
+    if any(re.search(pattern, text) for pattern in patterns):
+        return True
+    structured = extract_structured(html)
+    if structured and structured["on_sale"]:
+        return True
+    # The sale section may have moved; check_sale can follow the link
+    return scraper._find_sale_link(scraper.parse_html(html)) is not None
+
+
+class SalePathProbe(Detector):
+    """Settles "no sale" when the sale page is gone and the main page agrees."""
+
+    name = "probe"
+
+    def run(self, scraper, context: CascadeContext) -> Optional[dict]:
+        if not scraper.sale_path:
+            return None
+        sale_url = scraper._normalize_url(scraper.sale_path)
+        try:
+            response = scraper.session.head(sale_url, timeout=10, allow_redirects=True)
+        except Exception:
+            return None
+
+        gone = response.status_code in (404, 410)
+        to_front = bool(response.history) and urlparse(response.url).path in ("", "/")
+        if not (gone or to_front):
+            return None
+        # A missing sale page alone doesn't mean no sale: the section may
+        # have moved or the sale may be announced on the front page
+        html = context.plain_html()
+        if not html or _has_sale_evidence(scraper, html):
+            return None
+        return _verdict(scraper, False, scraper.base_url, path="probe")
+
+
+class PlatformDetector(Detector):
+    """The store's commerce platform JSON endpoint."""
+
+    name = "platform"
+
+    def run(self, scraper, context: CascadeContext) -> Optional[dict]:
+        result = scraper.check_sale_with_platform()
+        context.platform_checked = result is None
+        return result
+
+
+class KeywordScan(Detector):
+    """Settles "sale" from the plain HTML when its DOM announces one."""
+
+    name = "keywords"
+
+    def run(self, scraper, context: CascadeContext) -> Optional[dict]:
+        html = context.plain_html()
+        if not html:
+            return None
+        text = html.lower()
+        patterns = scraper.SALE_KEYWORDS_STRONG + scraper.DISCOUNT_PATTERNS
+        if not any(re.search(pattern, text) for pattern in patterns):
+            return None
+
+        has_sale, description, sale_link = scraper.detect_sale(scraper.parse_html(html))
+        if has_sale:
+            return _verdict(scraper, True, sale_link or scraper.base_url, description, "keywords")
+        return None
+
+
+class StructuredScan(Detector):
+    """Settles "sale" from product JSON embedded in the plain HTML."""
+
+    name = "structured"
+
+    def run(self, scraper, context: CascadeContext) -> Optional[dict]:
+        html = context.plain_html()
+        structured = extract_structured(html) if html else None
+        if structured and structured["on_sale"] > scraper.MIN_SALE_PRODUCTS:
+            url = scraper._normalize_url(scraper.sale_path) if scraper.sale_path else scraper.base_url
+            return _verdict(scraper, True, url, scraper._describe(structured["max_discount"]), "structured")
+        return None
+
+
+class FullRender(Detector):
+    """The complete check; always decides."""
+
+    name = "render"
+
+    def run(self, scraper, context: CascadeContext) -> Optional[dict]:
+        # HTTP-only stores reuse the page the earlier steps fetched
+        prefetched = context.plain_html() if not scraper.use_playwright else None
+        return scraper.check_sale(main_page=prefetched, platform_checked=context.platform_checked)
+
+
+DEFAULT_CASCADE: list[Detector] = [
+    SalePathProbe(),
+    PlatformDetector(),
+    KeywordScan(),
+    StructuredScan(),
+    FullRender(),
+]
+
+
+def run_cascade(scraper, steps: list[Detector], stats: Optional[Any] = None) -> dict:
+    """
+    Run the cascade for one store until a step decides.
+
+    Args:
+        stats: A ``CascadeStats`` whose ``should_skip`` drops steps that
+            never decide for this store
+
+    Returns:
+        The deciding step's result, with ``cascade`` listing the steps
+        that ran (the last one decided)
+    """
+    context = CascadeContext(scraper)
+    tried: list[str] = []
+    for index, step in enumerate(steps):
+        is_last = index == len(steps) - 1
+        if not is_last and stats is not None and stats.should_skip(scraper.name, step.name):
+            continue
+        tried.append(step.name)
+        result = step.run(scraper, context)
+        if result is not None:
+            result["cascade"] = tried
+            return result
+    return {**_verdict(scraper, False, scraper.base_url, path="cascade"), "cascade": tried}
@@ -1,9 +1,12 @@
 """Scrapers for Swedish department stores."""
 
 from .base import BaseScraper
+from .family import ONETRUST_ACCEPT
 
 
 class NKScraper(BaseScraper):
+    CONSENT_SELECTORS = [ONETRUST_ACCEPT, "button:has-text('Acceptera')"]
+
     def __init__(self):
         super().__init__(
             name="NK Herr",
@@ -13,6 +16,8 @@ class NKScraper(BaseScraper):
 
 
 class AhlensScraper(BaseScraper):
+    CONSENT_SELECTORS = [ONETRUST_ACCEPT, "button:has-text('Acceptera')"]
+
     def __init__(self):
         super().__init__(
             name="Åhléns Herr",
@@ -0,0 +1,132 @@
+"""Process-pool offload for HTML parsing and sale detection.
+
+``parse_html`` and ``detect_sale`` are pure-Python CPU work that holds the
+GIL. Running them in worker processes keeps fetch I/O in the main process
+responsive. Workers get only the page bytes and the scraper's class and
+config, and send back a small result dict.
+"""
+
+import importlib
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+from .base import BaseScraper
+
+# Scraper instances per worker process, keyed by class path and config
+_worker_scrapers: dict[tuple, BaseScraper] = {}
+
+
+def _scraper_spec(scraper: BaseScraper) -> tuple[str, str, dict]:
+    """Picklable description of a scraper: module, class name and config."""
+    cls = type(scraper)
+    config = {
+        "name": scraper.name,
+        "base_url": scraper.base_url,
+        "sale_path": scraper.sale_path,
+        "known_sale_link": scraper.known_sale_link,
+    }
+    return cls.__module__, cls.__qualname__, config
+
+
+def _build_scraper(module: str, qualname: str, config: dict) -> BaseScraper:
+    key = (module, qualname, tuple(sorted(config.items())))
+    scraper = _worker_scrapers.get(key)
+    if scraper is None:
+        cls = getattr(importlib.import_module(module), qualname)
+        try:
+            scraper = cls()
+        except TypeError:
+            # Generic scrapers take their config as arguments
+            scraper = cls(config["name"], config["base_url"], config["sale_path"])
+        scraper.name = config["name"]
+        scraper.base_url = config["base_url"]
+        scraper.sale_path = config["sale_path"]
+        scraper.known_sale_link = config["known_sale_link"]
+        _worker_scrapers[key] = scraper
+    return scraper
+
+
+def detect_html(scraper: BaseScraper, html: str, kind: str) -> dict:
+    """
+    Run detection on one page.
+
+    Args:
+        kind: ``main`` for the store's main page, ``sale`` for its sale page
+
+    Returns:
+        Dict with ``has_sale``, ``description``, ``sale_link`` and
+        ``detection_path``
+    """
+    if kind == "sale":
+        has_sale, description, path = scraper.detect_sale_page(html)
+        sale_link = None
+    else:
+        has_sale, description, sale_link, path = scraper.detect_page(html)
+    return {
+        "has_sale": has_sale,
+        "description": description,
+        "sale_link": sale_link,
+        "detection_path": path,
+    }
+
+
+def _detect_worker(spec: tuple[str, str, dict], page: bytes, kind: str) -> dict:
+    return detect_html(_build_scraper(*spec), page.decode("utf-8", errors="replace"), kind)
+
+
+class DetectionPool:
+    """
+    Runs page detection in a process pool, or inline.
+
+    Inline mode (``workers=0``) runs everything in the calling process and
+    is the better choice for single-store checks, where starting workers
+    costs more than it saves.
+    """
+
+    def __init__(self, workers: int = 0):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = (
+            ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+        )
+
+    @property
+    def inline(self) -> bool:
+        return self._executor is None
+
+    def submit(self, scraper: BaseScraper, html: str, kind: str = "main") -> Future:
+        """Queue detection of one page and return a future for its result dict."""
+        if self._executor is None:
+            future: Future = Future()
+            try:
+                future.set_result(detect_html(scraper, html, kind))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return self._executor.submit(
+            _detect_worker, _scraper_spec(scraper), html.encode("utf-8"), kind
+        )
+
+    def detect(self, scraper: BaseScraper, html: str, kind: str = "main") -> dict:
+        """Detect on one page and wait for the result."""
+        return self.submit(scraper, html, kind).result()
+
+    def detect_many(self, pages: list[tuple[BaseScraper, str, str]]) -> list[dict]:
+        """
+        Detect on a batch of ``(scraper, html, kind)`` pages in parallel.
+
+        Returns:
+            Result dicts in the same order as ``pages``
+        """
+        futures = [self.submit(scraper, html, kind) for scraper, html, kind in pages]
+        return [f.result() for f in futures]
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self) -> "DetectionPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,252 @@
+"""Store families: sister storefronts that share a platform.
+
+Brands of the same group (H&M, COS, Arket, Weekday; Zara, Massimo Dutti)
+run on one platform with the same page structure, consent banner and CDN.
+A :class:`StoreFamily` gives its members one HTTP connection pool,
+selectors compiled once and tuned to the platform, and, while a
+:class:`FamilySession` is open, one browser context whose cookies and
+consent are shared by every brand and section.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Iterator, Optional
+from urllib.parse import urlparse
+
+import requests
+import soupsieve
+from bs4 import BeautifulSoup
+
+# Cookie banners used by most large retailers
+ONETRUST_ACCEPT = "#onetrust-accept-btn-handler"
+
+
+def accept_consent(page: Any, selectors: list[str], wait: bool = True) -> bool:
+    """
+    Click the first cookie banner button that is found.
+
+    Args:
+        wait: Give each selector up to 2s to appear; otherwise only click a
+            banner that is already showing (a warm state usually has none)
+
+    Returns:
+        True if a button was clicked
+    """
+    for selector in selectors:
+        try:
+            if not wait and not page.is_visible(selector):
+                continue
+            page.click(selector, timeout=2000)
+            return True
+        except Exception:
+            continue
+    return False
+
+
+class StoreFamily:
+    """
+    Shared configuration and resources for sister storefronts.
+
+    Args:
+        name: Family name, e.g. "hm_group"
+        important_selectors: Platform-specific regions where sales are
+            announced, checked in addition to the generic ones
+        product_selector: Platform-specific product cards, in addition to
+            the generic ones
+        consent_selectors: Buttons that accept the cookie banner
+        pool_size: Connections kept open per host
+    """
+
+    def __init__(
+        self,
+        name: str,
+        important_selectors: Optional[list[str]] = None,
+        product_selector: Optional[str] = None,
+        consent_selectors: Optional[list[str]] = None,
+        pool_size: int = 8,
+    ):
+        self.name = name
+        self.important_selectors = list(important_selectors or [])
+        self.product_selector = product_selector
+        self.consent_selectors = list(consent_selectors or [])
+        self.pool_size = pool_size
+        self._session: Optional[requests.Session] = None
+        self._compiled: dict[str, Any] = {}
+        # Browser context shared by members while a FamilySession is open
+        self.browser: Optional["FamilySession"] = None
+
+    def compiled(self, selector: str) -> Any:
+        """A selector compiled once per family and process."""
+        pattern = self._compiled.get(selector)
+        if pattern is None:
+            pattern = self._compiled[selector] = soupsieve.compile(selector)
+        return pattern
+
+    def select_important(self, soup: BeautifulSoup, generic: list[str]) -> list:
+        """Elements in the platform's and the generic announcement regions."""
+        return self.compiled(", ".join(self.important_selectors + generic)).select(soup)
+
+    def select_products(self, soup: BeautifulSoup, generic: str) -> list:
+        """Product cards matched by the platform's or the generic selector."""
+        selector = f"{self.product_selector}, {generic}" if self.product_selector else generic
+        return self.compiled(selector).select(soup)
+
+    def session(self, headers: dict) -> requests.Session:
+        """HTTP session shared by all members, with one connection pool per host."""
+        if self._session is None:
+            session = requests.Session()
+            session.headers.update(headers)
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=self.pool_size, pool_maxsize=self.pool_size
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._session = session
+        return self._session
+
+
+class FamilySession:
+    """
+    One browser and context used by every member of a family.
+
+    The browser starts on first use and lives until :meth:`close`. The
+    cookie banner is accepted once per host and its cookies are reused by
+    all later pages. Playwright's sync API is bound to the thread that
+    opened it, so a session must only be used from one thread.
+    """
+
+    def __init__(
+        self,
+        family: StoreFamily,
+        user_agent: str,
+        locale: str = "sv-SE",
+        browser_state=None,
+    ):
+        self.family = family
+        self.user_agent = user_agent
+        self.locale = locale
+        # Optional BrowserStateStore; the family's context is saved under its name
+        self.browser_state = browser_state
+        self._saved: Optional[str] = None
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._consented: set[str] = set()
+        self._thread = threading.get_ident()
+
+    def usable(self) -> bool:
+        """Whether the calling thread may use this session."""
+        return threading.get_ident() == self._thread
+
+    def _start(self) -> None:
+        from playwright.sync_api import sync_playwright
+
+        if self.browser_state is not None:
+            self._saved = self.browser_state.get(self.family.name)
+        self._playwright = sync_playwright().start()
+        self._browser = self._playwright.chromium.launch(headless=True)
+        self._context = self._browser.new_context(
+            viewport={"width": 1920, "height": 1080},
+            user_agent=self.user_agent,
+            locale=self.locale,
+            storage_state=self._saved,
+        )
+        # Block heavy resources to speed up
+        self._context.route("**/*.{png,jpg,jpeg,gif,webp,svg}", lambda route: route.abort())
+
+    def _accept_consent(self, page: Any, host: str) -> None:
+        if host in self._consented:
+            return
+        if accept_consent(page, self.family.consent_selectors, wait=self._saved is None) and self._saved:
+            # The saved state no longer gets past this host's banner
+            self._saved = None
+        # Also remember hosts without a banner so we don't wait again
+        self._consented.add(host)
+
+    def run(self, goto: Callable[[Any], Any], url: str, action: Callable[[Any], Any]) -> Any:
+        """
+        Open a page in the shared context and return ``action(page)``.
+
+        Args:
+            goto: Navigates the page to ``url`` (the scraper's own logic,
+                including redirect shortcuts)
+        """
+        if self._context is None:
+            self._start()
+        page = self._context.new_page()
+        try:
+            host = urlparse(url).netloc
+            first_visit = host not in self._consented
+            started = time.monotonic()
+            goto(page)
+            self._accept_consent(page, host)
+            time.sleep(1)  # Shorter wait: assets are cached by the shared context
+            result = action(page)
+            if first_visit and self.browser_state is not None:
+                # Only a host's first page meets the banner
+                seconds = time.monotonic() - started
+                self.browser_state.record_render(self.family.name, seconds, self._saved is not None)
+            return result
+        finally:
+            page.close()
+
+    def close(self) -> None:
+        if self._context is not None and self.browser_state is not None and self._saved is None:
+            self.browser_state.save_state(self.family.name, self._context)
+        for resource in (self._context, self._browser):
+            if resource is not None:
+                try:
+                    resource.close()
+                except Exception:
+                    pass
+        if self._playwright is not None:
+            self._playwright.stop()
+        self._playwright = self._browser = self._context = None
+
+
+def group_by_family(scrapers: list) -> list[list]:
+    """
+    Split scrapers into each family's members and single stores.
+
+    Members share one ``requests.Session``, which is not thread-safe, so
+    concurrent checks run each group in one thread, one member at a time.
+    """
+    groups: dict[Any, list] = {}
+    for index, scraper in enumerate(scrapers):
+        key = scraper.family.name if scraper.family is not None else index
+        groups.setdefault(key, []).append(scraper)
+    return list(groups.values())
+
+
+def iter_by_family(scrapers: list) -> Iterator:
+    """
+    Yield scrapers with each family's members together, holding one
+    browser session open while a family's members are checked.
+
+    Only one Playwright instance can run per thread, so a family's
+    session is closed before the next scraper starts its own browser.
+    """
+    for members in group_by_family(scrapers):
+        family = members[0].family
+        if family is None or not any(s.use_playwright for s in members):
+            yield from members
+            continue
+
+        family.browser = FamilySession(
+            family, members[0].BROWSER_USER_AGENT, browser_state=members[0].browser_state
+        )
+        try:
+            yield from members
+        finally:
+            family.browser.close()
+            family.browser = None
+
+
+def check_family(scrapers: list) -> list[dict]:
+    """
+    Check every member of one or more families in shared sessions.
+
+    Returns:
+        ``check()`` results, with each family's members together
+    """
+    return [scraper.check() for scraper in iter_by_family(scrapers)]
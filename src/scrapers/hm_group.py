@@ -1,18 +1,40 @@
 """Scrapers for H&M Group stores (H&M, COS, Arket, Weekday)."""
 
 from .base import BaseScraper
+from .family import ONETRUST_ACCEPT, StoreFamily
+from .sections import Section, SectionedStore
 
+# All four brands run on H&M Group's shared commerce platform
+HM_GROUP_FAMILY = StoreFamily(
+    name="hm_group",
+    important_selectors=["[data-testid*='banner']", "[class*='Banner']", "[class*='promotion']"],
+    product_selector="article[data-articlecode], [data-testid='product-card'], .product-item",
+    consent_selectors=[ONETRUST_ACCEPT],
+)
+
+
+class HMGroupScraper(BaseScraper):
+    """Base for H&M Group storefronts."""
+
+    family = HM_GROUP_FAMILY
+
+
+class HMScraper(SectionedStore):
+    family = HM_GROUP_FAMILY
+    section_class = HMGroupScraper
 
-class HMScraper(BaseScraper):
     def __init__(self):
         super().__init__(
-            name="H&M Herr",
-            base_url="https://www2.hm.com/sv_se/herr.html",
-            sale_path="/sv_se/herr/rea.html",
+            name="H&M",
+            sections=[
+                Section("Herr", "https://www2.hm.com/sv_se/herr.html", "/sv_se/herr/rea.html"),
+                Section("Dam", "https://www2.hm.com/sv_se/dam.html", "/sv_se/dam/rea.html"),
+                Section("Barn", "https://www2.hm.com/sv_se/barn.html", "/sv_se/barn/rea.html"),
+            ],
         )
 
 
-class COSScraper(BaseScraper):
+class COSScraper(HMGroupScraper):
     def __init__(self):
         super().__init__(
             name="COS Herr",
@@ -21,7 +43,7 @@ class COSScraper(BaseScraper):
         )
 
 
-class ArketScraper(BaseScraper):
+class ArketScraper(HMGroupScraper):
     def __init__(self):
         super().__init__(
             name="Arket Herr",
@@ -30,7 +52,7 @@ class ArketScraper(BaseScraper):
         )
 
 
-class WeekdayScraper(BaseScraper):
+class WeekdayScraper(HMGroupScraper):
     def __init__(self):
         super().__init__(
             name="Weekday Herr",
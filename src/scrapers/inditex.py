@@ -1,9 +1,24 @@
 """Scrapers for fast fashion brands (Zara, Mango, Uniqlo, Massimo Dutti)."""
 
 from .base import BaseScraper
+from .family import ONETRUST_ACCEPT, StoreFamily
 
+# Zara and Massimo Dutti share Inditex's storefront platform
+INDITEX_FAMILY = StoreFamily(
+    name="inditex",
+    important_selectors=["[class*='layout-header']", "[class*='promo-banner']"],
+    product_selector=".product-grid-product, [class*='product-grid-product'], [data-productid]",
+    consent_selectors=[ONETRUST_ACCEPT],
+)
 
-class ZaraScraper(BaseScraper):
+
+class InditexScraper(BaseScraper):
+    """Base for Inditex storefronts."""
+
+    family = INDITEX_FAMILY
+
+
+class ZaraScraper(InditexScraper):
     def __init__(self):
         super().__init__(
             name="Zara Herr",
@@ -30,7 +45,7 @@ class UniqloScraper(BaseScraper):
         )
 
 
-class MassimoDuttiScraper(BaseScraper):
+class MassimoDuttiScraper(InditexScraper):
     def __init__(self):
         super().__init__(
             name="Massimo Dutti Herr",
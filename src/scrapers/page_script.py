@@ -0,0 +1,63 @@
+"""Sale detection script run inside the browser page.
+
+Instead of serializing the whole DOM with ``page.content()`` and parsing
+it again in Python, this script collects only what ``BaseScraper`` needs
+and returns it as a compact payload:
+
+- ``importantText``: text of the header, nav, banner and heading regions
+- ``discounts``: distinct 10-80 % figures found anywhere in the page text
+- ``links``: ``[href, text]`` of candidate sale links, in document order
+- ``productCount``: number of product cards
+- ``blobs``: ``[source, text]`` of embedded JSON scripts for the
+  structured-data fast path
+"""
+
+DETECTION_SCRIPT = r"""
+(opts) => {
+  const important = [];
+  for (const selector of opts.selectors) {
+    let nodes;
+    try { nodes = document.querySelectorAll(selector); } catch (e) { continue; }
+    for (const el of nodes) important.push(el.textContent || "");
+  }
+
+  const fullText = document.body ? (document.body.textContent || "") : "";
+  const discounts = new Set();
+  for (const match of fullText.matchAll(/(\d{1,2})\s*%/g)) {
+    const value = parseInt(match[1], 10);
+    if (value >= 10 && value <= 80) discounts.add(value);
+  }
+
+  const linkPattern = new RegExp(opts.linkPattern, "i");
+  const links = [];
+  for (const a of document.querySelectorAll("a[href]")) {
+    const href = a.getAttribute("href") || "";
+    const text = (a.textContent || "").toLowerCase();
+    if (opts.linkWords.some((w) => text.includes(w)) || linkPattern.test(href)) {
+      links.push([href, text]);
+      if (links.length >= opts.maxLinks) break;
+    }
+  }
+
+  const blobs = [];
+  const scripts = document.querySelectorAll(
+    'script[type="application/ld+json"], script#__NEXT_DATA__, script[type="application/json"]'
+  );
+  for (const script of scripts) {
+    const source = script.id === "__NEXT_DATA__" ? "next-data"
+      : script.type === "application/ld+json" ? "json-ld" : "json-script";
+    blobs.push([source, script.textContent || ""]);
+  }
+
+  let productCount = 0;
+  try { productCount = document.querySelectorAll(opts.productSelector).length; } catch (e) {}
+
+  return {
+    importantText: important.join(" "),
+    discounts: Array.from(discounts),
+    links,
+    productCount,
+    blobs,
+  };
+}
+"""
@@ -0,0 +1,196 @@
+"""Adapters for commerce platforms with public storefront JSON endpoints.
+
+A store detected as running on one of these platforms is checked with a
+single JSON request instead of a browser render of its pages.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Optional
+from urllib.parse import urljoin
+
+from ..utils.products import Product
+from .structured import iter_products
+
+if TYPE_CHECKING:
+    from .base import BaseScraper
+
+
+class NoSaleListing(Exception):
+    """The platform works but the store has no sale listing at the expected URL."""
+
+
+class PlatformAdapter(ABC):
+    """Base class for platform adapters."""
+
+    name = ""
+
+    # Stop paging after this many pages even if the endpoint has more
+    MAX_PAGES = 20
+
+    @abstractmethod
+    def detect(self, html: str) -> bool:
+        """Whether a page looks like it is served by this platform."""
+
+    @abstractmethod
+    def fetch_products(self, scraper: "BaseScraper") -> Optional[list[Product]]:
+        """Fetch all sale products, or None if the endpoint failed."""
+
+    def sale_url(self, scraper: "BaseScraper") -> str:
+        """Human-facing URL of the sale listing."""
+        return scraper._normalize_url(scraper.sale_path) if scraper.sale_path else scraper.base_url
+
+    def _get_json(self, scraper: "BaseScraper", url: str, listing: bool = False):
+        """
+        GET a JSON endpoint; returns None on any HTTP or decode error.
+
+        Raises:
+            NoSaleListing: ``listing`` is set and the endpoint answered 404
+        """
+        try:
+            response = scraper.session.get(
+                url, timeout=30, headers={"Accept": "application/json"}
+            )
+        except Exception as e:
+            print(f"[{scraper.name}] {self.name} request failed: {e}")
+            return None
+        if response.status_code == 404 and listing:
+            raise NoSaleListing(url)
+        if response.status_code != 200:
+            return None
+        try:
+            data = response.json()
+        except ValueError:
+            return None
+        if scraper.snapshots is not None:
+            scraper.snapshots.add(scraper.name, url, response.text, kind=f"platform:{self.name}")
+        return data
+
+    def check(self, scraper: "BaseScraper") -> Optional[dict]:
+        """
+        Check a store for a sale through the platform's JSON endpoint.
+
+        Returns:
+            Result dict like ``BaseScraper.check_sale``, or None if the
+            adapter failed and the generic HTML path should be used.
+        """
+        products = self.fetch_products(scraper)
+        if products is None:
+            return None
+
+        # Only marked-down products count; a sale collection can hold full-price items
+        discounts = [p.discount for p in products if p.discount > 0]
+        active = len(discounts) > scraper.MIN_SALE_PRODUCTS
+        result = {
+            "active": active,
+            "store_name": scraper.name,
+            "url": self.sale_url(scraper) if active else scraper.base_url,
+            "detection_path": f"platform:{self.name}",
+        }
+        if active:
+            result["description"] = scraper._describe(max(discounts) if discounts else None)
+        return result
+
+
+class ShopifyAdapter(PlatformAdapter):
+    """Shopify stores expose ``/collections/<handle>/products.json``."""
+
+    name = "shopify"
+    PAGE_SIZE = 250
+
+    def detect(self, html: str) -> bool:
+        return "cdn.shopify.com" in html or "Shopify.theme" in html
+
+    def _collection(self, scraper: "BaseScraper") -> str:
+        match = re.search(r"/collections/([^/?#]+)", scraper.sale_path or "")
+        return match.group(1) if match else "sale"
+
+    def fetch_products(self, scraper: "BaseScraper") -> Optional[list[Product]]:
+        endpoint = urljoin(scraper.base_url, f"/collections/{self._collection(scraper)}/products.json")
+        products = []
+        for page in range(1, self.MAX_PAGES + 1):
+            data = self._get_json(
+                scraper, f"{endpoint}?limit={self.PAGE_SIZE}&page={page}", listing=page == 1
+            )
+            if not isinstance(data, dict) or not isinstance(data.get("products"), list):
+                # Missing collection or blocked endpoint; only fail on the first page
+                return products if page > 1 else None
+
+            batch = data["products"]
+            for raw in batch:
+                product = next(iter_products(raw), None)
+                if product:
+                    if raw.get("handle"):
+                        product.url = urljoin(scraper.base_url, f"/products/{raw['handle']}")
+                    products.append(product)
+            if len(batch) < self.PAGE_SIZE:
+                break
+        return products
+
+    def sale_url(self, scraper: "BaseScraper") -> str:
+        if scraper.sale_path:
+            return super().sale_url(scraper)
+        return urljoin(scraper.base_url, f"/collections/{self._collection(scraper)}")
+
+
+class WooCommerceAdapter(PlatformAdapter):
+    """WooCommerce stores expose the Store API at ``/wp-json/wc/store/v1``."""
+
+    name = "woocommerce"
+    PAGE_SIZE = 100
+
+    def detect(self, html: str) -> bool:
+        return "woocommerce" in html.lower() and "wp-content" in html
+
+    def fetch_products(self, scraper: "BaseScraper") -> Optional[list[Product]]:
+        endpoint = urljoin(scraper.base_url, "/wp-json/wc/store/v1/products")
+        products = []
+        for page in range(1, self.MAX_PAGES + 1):
+            data = self._get_json(
+                scraper, f"{endpoint}?on_sale=true&per_page={self.PAGE_SIZE}&page={page}"
+            )
+            if not isinstance(data, list):
+                return products if page > 1 else None
+
+            for raw in data:
+                if not isinstance(raw, dict):
+                    continue
+                prices = raw.get("prices") or {}
+                unit = 10 ** int(prices.get("currency_minor_unit", 2) or 0)
+                try:
+                    price = int(prices.get("price") or 0) / unit
+                    regular = int(prices.get("regular_price") or 0) / unit
+                except (TypeError, ValueError):
+                    continue
+                if not price:
+                    continue
+                products.append(
+                    Product(
+                        str(raw.get("id")),
+                        raw.get("name", ""),
+                        price,
+                        regular or None,
+                        raw.get("permalink"),
+                    )
+                )
+            if len(data) < self.PAGE_SIZE:
+                break
+        return products
+
+
+ADAPTERS: dict[str, PlatformAdapter] = {
+    adapter.name: adapter for adapter in (ShopifyAdapter(), WooCommerceAdapter())
+}
+
+
+def detect_platform(html: str) -> Optional[str]:
+    """Name of the platform serving this page, if any adapter recognises it."""
+    for name, adapter in ADAPTERS.items():
+        if adapter.detect(html):
+            return name
+    return None
+
+
+def get_adapter(name: Optional[str]) -> Optional[PlatformAdapter]:
+    """Look up an adapter by platform name."""
+    return ADAPTERS.get(name) if name else None
@@ -1,6 +1,7 @@
 """Scrapers for premium/designer stores."""
 
 from .base import BaseScraper
+from .family import ONETRUST_ACCEPT
 
 
 class ENDClothingScraper(BaseScraper):
@@ -13,6 +14,8 @@ class ENDClothingScraper(BaseScraper):
 
 
 class MrPorterScraper(BaseScraper):
+    CONSENT_SELECTORS = [ONETRUST_ACCEPT, "button:has-text('Accept')"]
+
     def __init__(self):
         super().__init__(
             name="Mr Porter",
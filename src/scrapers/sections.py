@@ -0,0 +1,228 @@
+"""Stores checked in several sections (men, women, kids, outlet) per run.
+
+A :class:`SectionedStore` holds a list of :class:`Section` and checks each
+one with a section scraper that shares the store's HTTP session and, for
+browser-rendered stores, one browser context. Plain HTTP sections are
+fetched in parallel up to ``max_parallel``, each worker thread on its own
+copy of the session, since a ``requests.Session`` must not be used from
+several threads at once. Browser sections reuse the context one after
+another, because Playwright's sync API is bound to one thread. Cost
+therefore grows with the number of pages, not launches.
+
+Every section gets its own result and state entry named
+``"<store> <label>"`` (e.g. "H&M Dam"), and the store's own result is a
+summary derived from them.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional
+
+import requests
+
+from .base import BaseScraper
+from .family import FamilySession, StoreFamily
+
+# Run-wide options and caches handed down from the store to its sections
+SECTION_OPTIONS = (
+    "platform_cache",
+    "in_browser",
+    "detection_pool",
+    "snapshots",
+    "sale_links",
+    "redirects",
+    "cascade",
+    "cascade_stats",
+    "browser_state",
+    "keep_pages",
+)
+
+
+class Section:
+    """One part of a store, e.g. its women's department."""
+
+    __slots__ = ("label", "base_url", "sale_path")
+
+    def __init__(self, label: str, base_url: str, sale_path: Optional[str] = None):
+        self.label = label
+        self.base_url = base_url
+        self.sale_path = sale_path
+
+
+class SectionedStore(BaseScraper):
+    """
+    A store whose sections are checked together in one session.
+
+    ``section_class`` is the scraper class used for each section; set it
+    to the store's family base class so sections get its selectors.
+
+    Args:
+        name: Store name; sections are named "<name> <label>"
+        sections: Sections to check; the first one is the store's
+            ``base_url`` and ``sale_path``
+        use_playwright: Use a browser for every section
+        platform: Known commerce platform, shared by all sections
+        max_parallel: Sections fetched at the same time over plain HTTP
+    """
+
+    section_class: type = BaseScraper
+
+    def __init__(
+        self,
+        name: str,
+        sections: list[Section],
+        use_playwright: bool = True,
+        platform: Optional[str] = None,
+        max_parallel: int = 3,
+    ):
+        super().__init__(
+            name=name,
+            base_url=sections[0].base_url,
+            sale_path=sections[0].sale_path,
+            use_playwright=use_playwright,
+            platform=platform,
+        )
+        self.sections = sections
+        self.max_parallel = max_parallel
+        self._section_scrapers: Optional[list[BaseScraper]] = None
+
+    def section_name(self, section: Section) -> str:
+        return f"{self.name} {section.label}"
+
+    def section_scrapers(self) -> list[BaseScraper]:
+        """One scraper per section, sharing this store's session and family."""
+        if self._section_scrapers is None:
+            self._section_scrapers = []
+            for section in self.sections:
+                scraper = self.section_class(
+                    self.section_name(section),
+                    section.base_url,
+                    section.sale_path,
+                    use_playwright=self.use_playwright,
+                    platform=self.platform,
+                )
+                scraper.session = self.session
+                self._section_scrapers.append(scraper)
+        for scraper in self._section_scrapers:
+            for option in SECTION_OPTIONS:
+                setattr(scraper, option, getattr(self, option))
+        return self._section_scrapers
+
+    def section(self, name: str) -> Optional[BaseScraper]:
+        """The section scraper called ``name`` (case-insensitive), if any."""
+        for scraper in self.section_scrapers():
+            if scraper.name.lower() == name.lower():
+                return scraper
+        return None
+
+    def _open_browser(self) -> Optional[FamilySession]:
+        """A browser session for this thread, unless the family already has one open here."""
+        if not self.use_playwright:
+            return None
+        shared = self.family.browser if self.family is not None else None
+        if shared is not None and shared.usable():
+            return None
+        return FamilySession(
+            self.family or StoreFamily(self.name, consent_selectors=self.CONSENT_SELECTORS),
+            self.BROWSER_USER_AGENT,
+            browser_state=self.browser_state,
+        )
+
+    def check(self) -> dict:
+        """Check every section and summarize them."""
+        scrapers = self.section_scrapers()
+        for scraper in scrapers:
+            scraper.bytes_fetched = 0
+
+        browser = self._open_browser()
+        try:
+            if self.use_playwright:
+                for scraper in scrapers:
+                    scraper.browser_session = browser
+                results = [scraper.check() for scraper in scrapers]
+            else:
+                results = self._check_parallel(scrapers)
+        finally:
+            for scraper in scrapers:
+                scraper.browser_session = None
+            if browser is not None:
+                browser.close()
+
+        self.bytes_fetched += sum(scraper.bytes_fetched for scraper in scrapers)
+        return self.summarize({scraper.name: result for scraper, result in zip(scrapers, results)})
+
+    def _check_parallel(self, scrapers: list[BaseScraper]) -> list[dict]:
+        """Check sections over plain HTTP, one session copy per worker thread."""
+        local = threading.local()
+        sessions: list[requests.Session] = []
+        lock = threading.Lock()
+
+        def check(scraper: BaseScraper) -> dict:
+            session = getattr(local, "session", None)
+            if session is None:
+                session = local.session = requests.Session()
+                session.headers.update(self.session.headers)
+                session.cookies.update(self.session.cookies)
+                with lock:
+                    sessions.append(session)
+            scraper.session = session
+            return scraper.check()
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, self.max_parallel)) as executor:
+                return list(executor.map(check, scrapers))
+        finally:
+            for scraper in scrapers:
+                scraper.session = self.session
+            for session in sessions:
+                # Keep cookies the sections picked up for the next run
+                self.session.cookies.update(session.cookies)
+                session.close()
+
+    def summarize(self, sections: dict[str, dict]) -> dict:
+        """Store-level result: on sale if any section is, with each section's result under ``sections``."""
+        active = [result for result in sections.values() if result.get("active")]
+        summary = {
+            "active": bool(active),
+            "store_name": self.name,
+            "url": active[0]["url"] if active else self.base_url,
+            "detection_path": "sections",
+            "sections": sections,
+        }
+        if active:
+            prefix = f"{self.name} "
+            summary["description"] = "; ".join(
+                f"{result['store_name'].removeprefix(prefix)}: {result.get('description', 'Sale active')}"
+                for result in active
+            )
+        if all("error" in result for result in sections.values()):
+            summary["error"] = "All sections failed"
+        return summary
+
+
+def expand_sections(store_name: str, result: dict) -> Iterator[tuple[str, dict]]:
+    """Yield ``(name, result)`` for each section of a summary, or the result itself."""
+    sections = result.get("sections")
+    if not sections:
+        yield store_name, result
+        return
+    for name, section_result in sections.items():
+        if result.get("cached"):
+            section_result = {**section_result, "cached": True}
+        yield name, section_result
+
+
+def section_names(scraper: BaseScraper) -> list[str]:
+    """Names of a store's state entries: its sections, or the store itself."""
+    if isinstance(scraper, SectionedStore):
+        return [scraper.section_name(section) for section in scraper.sections]
+    return [scraper.name]
+
+
+def iter_sections(scrapers: Iterable[BaseScraper]) -> Iterator[BaseScraper]:
+    """Each store's section scrapers, or the store itself if it has no sections."""
+    for scraper in scrapers:
+        if isinstance(scraper, SectionedStore):
+            yield from scraper.section_scrapers()
+        else:
+            yield scraper
@@ -0,0 +1,219 @@
+"""Sitemap pre-pass: cheap change detection before rendering a store.
+
+Sale category pages appearing in or changing in a store's sitemap are an
+early signal. The pre-pass streams the store's sitemaps, keeps the
+``lastmod`` of every sale-related URL and only asks for a full
+``check_sale`` when those changed since the last run, or when the plain
+main page shows a sale the sitemap can't announce (a banner).
+"""
+
+import gzip
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+from urllib.parse import urljoin, urlparse
+
+from ..utils.sitemap_state import SitemapState
+from .base import BaseScraper
+
+# Only follow this many child sitemaps of an index per store
+MAX_CHILD_SITEMAPS = 50
+
+# A first path segment like "sv", "en-gb" or "sv_se" is a locale prefix
+_LOCALE_RE = re.compile(r"^[a-z]{2}(?:[-_][a-z]{2})?$", re.IGNORECASE)
+
+# Child sitemaps that only list products never contain sale categories
+_PRODUCT_SITEMAP_RE = re.compile(r"product|pdp|sku|image|video", re.IGNORECASE)
+
+
+def _local(tag: str) -> str:
+    """Tag name without its XML namespace."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_sitemap(scraper: BaseScraper, url: str) -> Iterator[tuple[str, str, Optional[str]]]:
+    """
+    Stream a sitemap and yield ``(kind, loc, lastmod)`` per entry.
+
+    ``kind`` is ``sitemap`` for entries of a sitemap index and ``url``
+    for page entries. The XML is parsed incrementally from the response
+    stream and the root is cleared after every entry, so read entries
+    don't pile up on it and large sitemaps are never held in memory.
+    """
+    try:
+        response = scraper.session.get(url, timeout=30, stream=True)
+        if response.status_code != 200:
+            return
+        response.raw.decode_content = True
+        stream = response.raw
+        if url.endswith(".gz"):
+            stream = gzip.GzipFile(fileobj=stream)
+
+        loc = lastmod = root = None
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = elem
+                continue
+            tag = _local(elem.tag)
+            if tag == "loc":
+                loc = (elem.text or "").strip()
+            elif tag == "lastmod":
+                lastmod = (elem.text or "").strip() or None
+            elif tag in ("url", "sitemap"):
+                if loc:
+                    yield tag, loc, lastmod
+                loc = lastmod = None
+                root.clear()
+        response.close()
+    except Exception as e:
+        print(f"[{scraper.name}] Sitemap {url} failed: {e}")
+
+
+def discover_roots(scraper: BaseScraper) -> list[str]:
+    """Sitemap URLs listed in robots.txt, or the conventional /sitemap.xml."""
+    robots = urljoin(scraper.base_url, "/robots.txt")
+    try:
+        response = scraper.session.get(robots, timeout=15)
+        if response.status_code == 200:
+            roots = re.findall(r"(?im)^\s*sitemap:\s*(\S+)", response.text)
+            if roots:
+                return roots
+    except Exception:
+        pass
+    return [urljoin(scraper.base_url, "/sitemap.xml")]
+
+
+def _subtree(sitemap_url: str, parents: dict[str, str]) -> set[str]:
+    """A sitemap and every sitemap nested below it, from child-to-parent links."""
+    subtree = {sitemap_url}
+    grew = True
+    while grew:
+        grew = False
+        for child, parent in parents.items():
+            if parent in subtree and child not in subtree:
+                subtree.add(child)
+                grew = True
+    return subtree
+
+
+class SitemapPrepass:
+    """Decides which stores need a full ``check_sale`` this run."""
+
+    def __init__(self, state: SitemapState, max_age_hours: int = 72):
+        self.state = state
+        # Stores are fully re-checked at least this often regardless
+        self.max_age = timedelta(hours=max_age_hours)
+
+    def _is_sale_url(self, scraper: BaseScraper, url: str) -> bool:
+        if scraper.sale_path and url.rstrip("/") == scraper._normalize_url(scraper.sale_path).rstrip("/"):
+            return True
+        if not re.search(BaseScraper.SALE_URL_PATTERN, url, re.IGNORECASE):
+            return False
+        # Stay within the store's locale, e.g. /sv_se/ for H&M
+        segments = [s for s in urlparse(scraper._normalize_url(scraper.sale_path or "/")).path.split("/") if s]
+        if len(segments) >= 2 and _LOCALE_RE.match(segments[0]):
+            return urlparse(url).path.startswith(f"/{segments[0]}/")
+        return True
+
+    def scan(self, scraper: BaseScraper) -> Optional[dict]:
+        """
+        Collect the store's sale URLs and their lastmod values.
+
+        Child sitemaps whose own lastmod did not change are not fetched
+        again; the sale URLs of their whole subtree (including nested
+        sitemaps) are carried over from the previous run.
+
+        Returns:
+            Mapping of sale URL to ``[lastmod, sitemap_url]``, or None if
+            no sitemap was found
+        """
+        entry = self.state.get(scraper.name)
+        if not entry.get("roots"):
+            entry["roots"] = discover_roots(scraper)
+
+        previous_sitemaps = entry.get("sitemaps", {})
+        previous_parents = entry.get("parents", {})
+        previous_urls = entry.get("sale_urls", {})
+        sitemaps: dict[str, Optional[str]] = {}
+        parents: dict[str, str] = {}
+        sale_urls: dict[str, list] = {}
+        found_any = False
+
+        pending = list(entry["roots"])
+        while pending:
+            sitemap_url = pending.pop(0)
+            for kind, loc, lastmod in iter_sitemap(scraper, sitemap_url):
+                found_any = True
+                if kind == "url":
+                    if self._is_sale_url(scraper, loc):
+                        sale_urls[loc] = [lastmod, sitemap_url]
+                    continue
+
+                if _PRODUCT_SITEMAP_RE.search(loc) or len(sitemaps) >= MAX_CHILD_SITEMAPS:
+                    continue
+                sitemaps[loc] = lastmod
+                parents[loc] = sitemap_url
+                if lastmod and previous_sitemaps.get(loc) == lastmod:
+                    # Unchanged child sitemap: reuse what its subtree held last time
+                    subtree = _subtree(loc, previous_parents)
+                    for child in subtree - {loc}:
+                        if child in previous_sitemaps:
+                            sitemaps[child] = previous_sitemaps[child]
+                            parents[child] = previous_parents[child]
+                    sale_urls.update(
+                        (u, info) for u, info in previous_urls.items() if info[1] in subtree
+                    )
+                    continue
+                pending.append(loc)
+
+        if not found_any:
+            entry["roots"] = None
+            return None
+
+        entry["sitemaps"] = sitemaps
+        entry["parents"] = parents
+        return sale_urls
+
+    def needs_check(self, scraper: BaseScraper) -> tuple[bool, str]:
+        """
+        Decide whether a store should get a full check.
+
+        Returns:
+            (needs_check, reason)
+        """
+        entry = self.state.get(scraper.name)
+        previous = dict(entry.get("sale_urls", {}))
+        sale_urls = self.scan(scraper)
+
+        if sale_urls is None:
+            return True, "no sitemap"
+
+        entry["sale_urls"] = sale_urls
+        last = self.state.last_full_check(scraper.name)
+        if last is None:
+            return True, "first run"
+        if datetime.now() - last > self.max_age:
+            return True, "periodic re-check"
+
+        appeared = sale_urls.keys() - previous.keys()
+        if appeared:
+            return True, f"{len(appeared)} new sale URL(s)"
+        removed = previous.keys() - sale_urls.keys()
+        if removed:
+            return True, f"{len(removed)} sale URL(s) removed"
+        changed = [u for u, info in sale_urls.items() if info[0] != previous[u][0]]
+        if changed:
+            return True, f"{len(changed)} sale URL(s) changed"
+
+        # A banner sale doesn't touch the sitemap (and a permanent /sale
+        # page never changes), so the main page is still looked at over
+        # plain HTTP; only the render and the sale page are skipped
+        html = scraper.fetch_plain(scraper.base_url)
+        if not html:
+            return True, "sitemap unchanged, main page not fetched"
+        has_sale, _, _, _ = scraper.detect_page(html)
+        if has_sale:
+            return True, "sitemap unchanged, main page shows a sale"
+        return False, "sitemap unchanged"
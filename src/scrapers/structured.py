@@ -0,0 +1,335 @@
+"""Read product and price data from JSON embedded in storefront HTML.
+
+Next.js, Shopify and Centra storefronts ship their product state as JSON
+inside the page (JSON-LD, ``__NEXT_DATA__``, ``window.__INITIAL_STATE__``,
+Shopify's ``var meta``). Reading those blobs straight from the raw HTML is
+much cheaper than building a soup and guessing at product-card selectors.
+"""
+
+import json
+import re
+from typing import Any, Iterable, Iterator, Optional
+
+from ..utils.products import Product
+
+_SCRIPT_RE = re.compile(
+    r"<script\b([^>]*)>(.*?)</script\s*>", re.IGNORECASE | re.DOTALL
+)
+_LD_JSON_ATTR = re.compile(r"type\s*=\s*[\"']?application/ld\+json", re.IGNORECASE)
+_NEXT_DATA_ATTR = re.compile(r"id\s*=\s*[\"']?__NEXT_DATA__", re.IGNORECASE)
+_JSON_ATTR = re.compile(r"type\s*=\s*[\"']?application/json", re.IGNORECASE)
+
+# Inline assignments of state objects, e.g. window.__INITIAL_STATE__ = {...}
+_ASSIGN_RE = re.compile(
+    r"(?:window\.(__INITIAL_STATE__|__PRELOADED_STATE__|__NUXT__|__CENTRA_?\w*|__STATE__)"
+    r"|var\s+(meta))\s*=\s*(?=[\[{])"
+)
+
+NAME_KEYS = ("name", "title", "productName", "product_name", "displayName")
+BRAND_KEYS = ("brand", "vendor", "brandName", "brand_name", "designer")
+CATEGORY_KEYS = ("category", "product_type", "productType", "categoryName")
+SIZE_KEYS = ("size", "option1", "sizeName", "title")
+ID_KEYS = ("id", "productId", "product_id", "sku", "productID", "handle", "url")
+PRICE_KEYS = (
+    "salePrice", "sale_price", "finalPrice", "final_price", "currentPrice",
+    "current_price", "specialPrice", "price", "lowPrice",
+)
+ORIGINAL_KEYS = (
+    "compare_at_price", "compareAtPrice", "originalPrice", "original_price",
+    "listPrice", "list_price", "regularPrice", "regular_price", "oldPrice",
+    "old_price", "fullPrice", "full_price", "priceBeforeDiscount", "wasPrice",
+)
+
+# A dict with a name and a price is only a product if it also carries one
+# of these; shipping options, gift cards in the cart etc. don't
+PRODUCT_TYPES = ("Product", "ProductGroup", "IndividualProduct", "ProductModel")
+PRODUCT_MARKER_KEYS = ("offers", "variants", "sku", "productId", "product_id", "productID", "handle")
+
+_decoder = json.JSONDecoder()
+
+
+def find_blobs(html: str) -> Iterator[tuple[str, Any]]:
+    """
+    Yield ``(source, data)`` for every known JSON blob in the page.
+
+    Sources are ``json-ld``, ``next-data``, ``json-script`` and the name
+    of any inline state assignment (e.g. ``__INITIAL_STATE__``, ``meta``).
+    Blobs that fail to decode are skipped.
+    """
+    for match in _SCRIPT_RE.finditer(html):
+        attrs, body = match.group(1), match.group(2).strip()
+        if not body:
+            continue
+
+        if _LD_JSON_ATTR.search(attrs):
+            source = "json-ld"
+        elif _NEXT_DATA_ATTR.search(attrs):
+            source = "next-data"
+        elif _JSON_ATTR.search(attrs):
+            source = "json-script"
+        else:
+            # Plain inline script: look for state assignments
+            for assign in _ASSIGN_RE.finditer(body):
+                try:
+                    data, _ = _decoder.raw_decode(body, assign.end())
+                except ValueError:
+                    continue
+                yield assign.group(1) or assign.group(2), data
+            continue
+
+        try:
+            yield source, json.loads(body)
+        except ValueError:
+            continue
+
+
+def parse_price(value: Any) -> Optional[float]:
+    """Parse a price from a number, a string like "1 299,00 kr" or a money dict."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value > 0 else None
+    if isinstance(value, dict):
+        if "centAmount" in value:
+            # commercetools money: minor units, 2 decimals unless stated
+            cents = parse_price(value["centAmount"])
+            digits = value.get("fractionDigits")
+            if cents is None:
+                return None
+            return cents / 10 ** (digits if isinstance(digits, int) and digits >= 0 else 2)
+        for key in ("amount", "value", "price", "raw"):
+            if key in value:
+                return parse_price(value[key])
+        return None
+    if not isinstance(value, str):
+        return None
+
+    match = re.search(r"\d[\d\s., ]*", value)
+    if not match:
+        return None
+    number = re.sub(r"[\s ]", "", match.group(0)).rstrip(".,")
+    if "," in number and "." in number:
+        # Whichever separator comes last is the decimal separator
+        if number.rfind(",") > number.rfind("."):
+            number = number.replace(".", "").replace(",", ".")
+        else:
+            number = number.replace(",", "")
+    elif "," in number or "." in number:
+        # A lone separator followed by exactly three digits groups thousands
+        # ("1.299 kr", "1,299"); otherwise the last one is the decimal point
+        separator = "," if "," in number else "."
+        head, _, tail = number.rpartition(separator)
+        if len(tail) < 3:
+            number = f"{head.replace(separator, '')}.{tail}"
+        else:
+            number = number.replace(separator, "")
+    try:
+        price = float(number)
+    except ValueError:
+        return None
+    return price if price > 0 else None
+
+
+def _first(node: dict, keys: tuple[str, ...]) -> Any:
+    for key in keys:
+        if key in node and node[key] not in (None, ""):
+            return node[key]
+    return None
+
+
+def _offer_prices(offers: Any) -> tuple[Optional[float], Optional[float]]:
+    """Read (price, original) from schema.org offers."""
+    if isinstance(offers, list):
+        offers = offers[0] if offers and isinstance(offers[0], dict) else {}
+    if not isinstance(offers, dict):
+        return None, None
+
+    price = parse_price(_first(offers, PRICE_KEYS))
+    original = parse_price(_first(offers, ORIGINAL_KEYS))
+
+    specs = offers.get("priceSpecification") or []
+    if isinstance(specs, dict):
+        specs = [specs]
+    for spec in specs:
+        if not isinstance(spec, dict):
+            continue
+        price_type = str(spec.get("priceType", ""))
+        if "Strikethrough" in price_type or "ListPrice" in price_type:
+            original = parse_price(spec.get("price")) or original
+        elif price is None:
+            price = parse_price(spec.get("price"))
+    return price, original
+
+
+def _variant_prices(variants: Any) -> tuple[Optional[float], Optional[float]]:
+    """
+    Price and compare-at price of the most discounted variant.
+
+    Only a variant whose own compare-at price is above its price counts as
+    marked down; without one, the cheapest price and no original is returned.
+    """
+    if not isinstance(variants, list):
+        return None, None
+    prices = []
+    best: Optional[tuple[float, float]] = None
+    for variant in variants:
+        if not isinstance(variant, dict):
+            continue
+        price = parse_price(_first(variant, PRICE_KEYS))
+        original = parse_price(_first(variant, ORIGINAL_KEYS))
+        if not price:
+            continue
+        prices.append(price)
+        if original and original > price and (best is None or price / original < best[0] / best[1]):
+            best = (price, original)
+    if best is not None:
+        return best
+    return (min(prices) if prices else None), None
+
+
+def _label(value: Any) -> Optional[str]:
+    """Read a brand or category that may be a string, a named dict or a list."""
+    if isinstance(value, list):
+        value = value[-1] if value else None
+    if isinstance(value, dict):
+        value = _first(value, NAME_KEYS)
+    return value.strip() if isinstance(value, str) and value.strip() else None
+
+
+def _sizes(node: dict) -> Optional[tuple[str, ...]]:
+    """Sizes from a ``sizes`` list or from the product's variants."""
+    raw = node.get("sizes")
+    if not isinstance(raw, list):
+        variants = node.get("variants")
+        if not isinstance(variants, list):
+            return None
+        raw = [_first(v, SIZE_KEYS) for v in variants if isinstance(v, dict)]
+    sizes = tuple(dict.fromkeys(_label(s) or str(s) for s in raw if s not in (None, "")))
+    return sizes or None
+
+
+def _is_product_node(node: dict) -> bool:
+    """Whether ``node`` is typed as a product or carries offer/variant data."""
+    types = node.get("@type") or node.get("__typename") or ()
+    if isinstance(types, str):
+        types = (types,)
+    if any(isinstance(t, str) and (t in PRODUCT_TYPES or t.endswith("Product")) for t in types):
+        return True
+    return any(key in node for key in PRODUCT_MARKER_KEYS + ORIGINAL_KEYS)
+
+
+def _product_fields(node: dict) -> Optional[Product]:
+    """Return a :class:`Product` if ``node`` looks like a product."""
+    name = _first(node, NAME_KEYS)
+    if not isinstance(name, str) or not _is_product_node(node):
+        return None
+
+    price = parse_price(_first(node, PRICE_KEYS))
+    original = parse_price(_first(node, ORIGINAL_KEYS))
+    if "offers" in node:
+        offer_price, offer_original = _offer_prices(node["offers"])
+        price = price or offer_price
+        original = original or offer_original
+    if "variants" in node:
+        variant_price, variant_original = _variant_prices(node["variants"])
+        price = price or variant_price
+        original = original or variant_original
+
+    if not price:
+        return None
+    product_id = _first(node, ID_KEYS)
+    url = _first(node, ("url", "link", "href"))
+    return Product(
+        str(product_id if product_id is not None else name),
+        name,
+        price,
+        original,
+        url if isinstance(url, str) else None,
+        _label(_first(node, BRAND_KEYS)),
+        _label(_first(node, CATEGORY_KEYS)),
+        _sizes(node),
+    )
+
+
+def iter_products(data: Any) -> Iterator[Product]:
+    """
+    Walk a decoded blob and yield every product found in it.
+
+    A dict with a name, a price and a product type or offer marker is
+    taken as a product and not descended into further, so variants are
+    folded into their parent product.
+    """
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            product = _product_fields(node)
+            if product:
+                yield product
+                continue
+            stack.extend(v for v in node.values() if isinstance(v, (dict, list)))
+        elif isinstance(node, list):
+            stack.extend(v for v in node if isinstance(v, (dict, list)))
+
+
+def decode_blobs(raw_blobs: Iterable[tuple[str, str]]) -> Iterator[tuple[str, Any]]:
+    """Decode ``(source, json_text)`` pairs collected elsewhere, e.g. in a browser."""
+    for source, text in raw_blobs:
+        try:
+            yield source, json.loads(text)
+        except (TypeError, ValueError):
+            continue
+
+
+def collect_products(blobs: Iterable[tuple[str, Any]]) -> tuple[list[str], list[Product]]:
+    """
+    Collect the products from decoded blobs.
+
+    Returns:
+        (sources, products) where ``sources`` lists the blobs that held
+        products and ``products`` is de-duplicated by product id.
+    """
+    seen: dict[str, Product] = {}
+    sources = []
+    for source, data in blobs:
+        found = False
+        for product in iter_products(data):
+            found = True
+            seen.setdefault(product.id, product)
+        if found and source not in sources:
+            sources.append(source)
+    return sources, list(seen.values())
+
+
+def summarize_products(sources: list[str], products: list[Product]) -> Optional[dict]:
+    """
+    Summarise extracted products.
+
+    Returns:
+        Dict with ``sources``, ``products``, ``on_sale`` and ``max_discount``,
+        or None if there are no products.
+    """
+    if not products:
+        return None
+
+    discounts = [d for d in (p.discount for p in products) if d > 0]
+    return {
+        "sources": sources,
+        "products": len(products),
+        "on_sale": len(discounts),
+        "max_discount": max(discounts) if discounts else None,
+    }
+
+
+def extract_products(html: str) -> tuple[list[str], list[Product]]:
+    """Collect the products from every known blob on the page."""
+    return collect_products(find_blobs(html))
+
+
+def extract_structured(html: str) -> Optional[dict]:
+    """
+    Summarise the products found in the page's embedded JSON.
+
+    Returns None if no known blob on the page contains product prices.
+    """
+    return summarize_products(*extract_products(html))
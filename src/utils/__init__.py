@@ -1,3 +1,62 @@
+from .browser_state import BrowserStateStore
+from .cascade_stats import CascadeStats
+from .events import EventStream
+from .perf_history import PerfHistory, format_regression
+from .platform_cache import PlatformCache
+from .profiling import StoreProfiler
+from .products import Product, ProductDiff, ProductState, diff_products
+from .redirects import RedirectCache
+from .result_cache import ResultCache
+from .sale_links import SaleLinkCache
+from .sharding import (
+    assign_shards,
+    load_partials,
+    load_shard_plan,
+    parse_shard,
+    shards_from_plan,
+    write_partial,
+    write_shard_plan,
+)
+from .sitemap_state import SitemapState
+from .snapshots import SnapshotArchive
 from .state import SaleState
+from .subscribers import Subscriber, load_subscribers
+from .watchlist import WatchIndex, WatchRule, load_watchlist
+from .work_queue import Job, SQLiteQueue, WorkQueue, default_worker_name, open_queue
 
-__all__ = ["SaleState"]
+__all__ = [
+    "SaleState",
+    "PlatformCache",
+    "SitemapState",
+    "Product",
+    "ProductDiff",
+    "ProductState",
+    "diff_products",
+    "WatchIndex",
+    "WatchRule",
+    "load_watchlist",
+    "assign_shards",
+    "load_partials",
+    "parse_shard",
+    "write_partial",
+    "load_shard_plan",
+    "shards_from_plan",
+    "write_shard_plan",
+    "Subscriber",
+    "load_subscribers",
+    "ResultCache",
+    "SnapshotArchive",
+    "StoreProfiler",
+    "PerfHistory",
+    "format_regression",
+    "SaleLinkCache",
+    "RedirectCache",
+    "CascadeStats",
+    "EventStream",
+    "Job",
+    "WorkQueue",
+    "SQLiteQueue",
+    "default_worker_name",
+    "open_queue",
+    "BrowserStateStore",
+]
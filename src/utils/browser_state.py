@@ -0,0 +1,108 @@
+"""Persisted browser cookies and localStorage per store."""
+
+import json
+import re
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+
+class BrowserStateStore:
+    """
+    Playwright storage state (cookies and localStorage) saved per store.
+
+    A store's first render accepts its cookie banner and saves the
+    context's storage state; later renders start from it and skip the
+    consent overlay and region picker. A state older than
+    ``max_age_days`` is not used, and one whose banner shows up again is
+    refreshed. Render times with and without a warm state are averaged
+    per store so the time saved can be reported.
+
+    Args:
+        root: Directory of the state files and ``index.json``
+        max_age_days: Age after which a state is rebuilt from scratch
+    """
+
+    def __init__(self, root: str = ".cache/browser_state", max_age_days: float = 7):
+        self.root = Path(root)
+        self.max_age = timedelta(days=max_age_days)
+        self.index_file = self.root / "index.json"
+        self.index: dict[str, dict] = self._load()
+        self.dirty = False
+        self._lock = threading.Lock()
+        # Renders this run that started warm and the time they saved
+        self.warm_renders = 0
+        self.cold_renders = 0
+        self.seconds_saved = 0.0
+
+    def _load(self) -> dict:
+        if self.index_file.exists():
+            try:
+                with open(self.index_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, IOError):
+                pass
+        return {}
+
+    def path(self, key: str) -> Path:
+        slug = re.sub(r"[^a-z0-9]+", "-", key.lower()).strip("-") or "store"
+        return self.root / f"{slug}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """Path of a usable saved state for ``key``, or None to start cold."""
+        entry = self.index.get(key)
+        path = self.path(key)
+        if not entry or not entry.get("saved") or not path.exists():
+            return None
+        try:
+            saved = datetime.fromisoformat(entry["saved"])
+        except ValueError:
+            return None
+        if datetime.now() - saved > self.max_age:
+            return None
+        return str(path)
+
+    def save_state(self, key: str, context) -> None:
+        """Save a browser context's storage state for ``key``."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        try:
+            context.storage_state(path=str(self.path(key)))
+        except Exception as e:
+            print(f"[{key}] Could not save browser state: {e}")
+            return
+        with self._lock:
+            self.index.setdefault(key, {})["saved"] = datetime.now().isoformat()
+            self.dirty = True
+
+    def invalidate(self, key: str) -> None:
+        """Drop a state that no longer gets past the banner."""
+        with self._lock:
+            entry = self.index.get(key)
+            if entry and entry.pop("saved", None):
+                self.dirty = True
+
+    def record_render(self, key: str, seconds: float, warm: bool) -> None:
+        """Average a render's time into the store's warm or cold figure."""
+        field = "warm_seconds" if warm else "cold_seconds"
+        with self._lock:
+            entry = self.index.setdefault(key, {})
+            previous = entry.get(field)
+            entry[field] = round((previous + seconds) / 2 if previous else seconds, 2)
+            self.dirty = True
+            if warm:
+                self.warm_renders += 1
+                if entry.get("cold_seconds"):
+                    self.seconds_saved += max(0.0, entry["cold_seconds"] - seconds)
+            else:
+                self.cold_renders += 1
+
+    def save(self) -> None:
+        """Write the index to disk if it changed."""
+        if not self.dirty:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.index_file, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=2, ensure_ascii=False)
+        self.dirty = False
+
@@ -0,0 +1,78 @@
+"""Per-store statistics of which detector cascade step decided."""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+
+class CascadeStats:
+    """
+    Per-store counts of how often each step ran and decided.
+
+    A step that ran at least ``min_runs`` times for a store without ever
+    deciding is skipped for that store, except on every
+    ``explore_every``-th run so a change in the store is noticed.
+    """
+
+    def __init__(self, stats_file: str = "cascade_stats.json", min_runs: int = 10, explore_every: int = 10):
+        self.stats_file = Path(stats_file)
+        self.min_runs = min_runs
+        self.explore_every = explore_every
+        self.stores: dict[str, dict] = self._load()
+        self.dirty = False
+
+    def _load(self) -> dict:
+        if self.stats_file.exists():
+            try:
+                with open(self.stats_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, IOError):
+                pass
+        return {}
+
+    def should_skip(self, store_name: str, step: str) -> bool:
+        entry = self.stores.get(store_name)
+        if not entry:
+            return False
+        tried, decided = entry["tried"].get(step, 0), entry["decided"].get(step, 0)
+        if tried < self.min_runs or decided:
+            return False
+        return entry["runs"] % self.explore_every != 0
+
+    def record(self, store_name: str, tried: list[str]) -> None:
+        """Record one cascade run; the last step tried is the one that decided."""
+        if not tried:
+            return
+        entry = self.stores.setdefault(store_name, {"runs": 0, "tried": {}, "decided": {}})
+        entry["runs"] += 1
+        for step in tried:
+            entry["tried"][step] = entry["tried"].get(step, 0) + 1
+        entry["decided"][tried[-1]] = entry["decided"].get(tried[-1], 0) + 1
+        entry["updated"] = datetime.now().isoformat()
+        self.dirty = True
+
+    def record_results(self, results: dict[str, dict]) -> None:
+        """Record the ``cascade`` steps of check results by store (or section) name."""
+        for name, result in results.items():
+            if result.get("sections"):
+                # Multi-section stores run the cascade once per section
+                if not result.get("cached"):
+                    self.record_results(result["sections"])
+            elif result.get("cascade") and not result.get("cached"):
+                self.record(name, result["cascade"])
+
+    def deciders(self) -> dict[str, int]:
+        """How often each step decided, over all stores."""
+        totals: dict[str, int] = {}
+        for entry in self.stores.values():
+            for step, count in entry["decided"].items():
+                totals[step] = totals.get(step, 0) + count
+        return totals
+
+    def save(self) -> None:
+        """Write the stats to disk if they changed."""
+        if not self.dirty:
+            return
+        with open(self.stats_file, "w", encoding="utf-8") as f:
+            json.dump(self.stores, f, indent=2, ensure_ascii=False)
+        self.dirty = False
@@ -0,0 +1,73 @@
+"""Newline-delimited JSON stream of check events for downstream tools."""
+
+import json
+import sys
+import threading
+from datetime import datetime
+from typing import IO, Optional
+
+
+class EventStream:
+    """
+    Writes one JSON object per line as each store's result comes in.
+
+    Every event has ``event`` (its type) and ``ts``. Types are
+    ``run_started``, ``result`` (one per store), ``notified`` and
+    ``run_finished``. Lines are flushed immediately so a consumer can
+    follow the stream with ``tail -f`` or a pipe.
+
+    Args:
+        path: File to append to, or "-" for stdout. With "-" the stream
+            keeps stdout to itself: everything else printed afterwards
+            (the human-readable progress) goes to stderr, so stdout can be
+            piped straight into ``jq`` or another consumer.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = None
+        self._stdout: Optional[IO[str]] = None
+        if path == "-":
+            self._stdout = sys.stdout
+            sys.stdout = sys.stderr
+
+    def _out(self) -> IO[str]:
+        if self._stdout is not None:
+            return self._stdout
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def emit(self, event: str, **fields) -> None:
+        """Write one event line."""
+        record = {"event": event, "ts": datetime.now().isoformat(timespec="seconds"), **fields}
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            out = self._out()
+            out.write(line + "\n")
+            out.flush()
+
+    def result(self, store_name: str, result: dict, change: Optional[str]) -> None:
+        """
+        Write a store's check result.
+
+        Args:
+            change: "new", "ended" or None when the sale state didn't change
+        """
+        self.emit(
+            "result",
+            store=store_name,
+            active=bool(result.get("active")),
+            change=change,
+            description=result.get("description"),
+            url=result.get("url"),
+            detection_path=result.get("detection_path"),
+            cached=bool(result.get("cached")),
+            error=result.get("error"),
+        )
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
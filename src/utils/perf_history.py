@@ -0,0 +1,117 @@
+"""Rolling per-store performance history and regression detection."""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from statistics import median
+from typing import Optional
+
+# Scale factor that makes the MAD comparable to a standard deviation
+MAD_SCALE = 1.4826
+
+METRICS = ("seconds", "bytes")
+
+
+class PerfHistory:
+    """
+    Check duration and page bytes of the last ``window`` runs per store.
+
+    A run is flagged as a regression when it is well above the store's
+    baseline: more than ``threshold`` scaled MADs above the median of the
+    earlier runs, and at least ``min_ratio`` times that median.
+    """
+
+    def __init__(
+        self,
+        history_file: str = "perf_history.json",
+        window: int = 20,
+        min_runs: int = 5,
+        threshold: float = 3.0,
+        min_ratio: float = 1.5,
+    ):
+        self.history_file = Path(history_file)
+        self.window = window
+        self.min_runs = min_runs
+        self.threshold = threshold
+        self.min_ratio = min_ratio
+        # store -> [[seconds, bytes], ...], oldest first
+        self.stores: dict[str, list[list]] = self._load()
+        # Measurements recorded during this run
+        self.current: dict[str, list] = {}
+
+    def _load(self) -> dict[str, list[list]]:
+        if self.history_file.exists():
+            try:
+                with open(self.history_file, "r", encoding="utf-8") as f:
+                    return json.load(f).get("stores", {})
+            except (json.JSONDecodeError, IOError, AttributeError):
+                pass
+        return {}
+
+    def record(self, store_name: str, seconds: float, page_bytes: Optional[int]) -> None:
+        """Add one run's measurements for a store."""
+        entry = [round(seconds, 2), page_bytes or None]
+        self.current[store_name] = entry
+        runs = self.stores.setdefault(store_name, [])
+        runs.append(entry)
+        del runs[:-self.window]
+
+    def _check(self, store_name: str, metric: str) -> Optional[dict]:
+        index = METRICS.index(metric)
+        runs = self.stores.get(store_name, [])
+        value = runs[-1][index] if runs else None
+        baseline = [r[index] for r in runs[:-1] if r[index] is not None]
+        if value is None or len(baseline) < self.min_runs:
+            return None
+
+        mid = median(baseline)
+        mad = median(abs(v - mid) for v in baseline) * MAD_SCALE
+        if mid <= 0 or value < mid * self.min_ratio or value <= mid + self.threshold * mad:
+            return None
+        return {
+            "store_name": store_name,
+            "metric": metric,
+            "value": value,
+            "median": mid,
+            "ratio": round(value / mid, 1),
+        }
+
+    def regressions(self) -> list[dict]:
+        """
+        Stores whose measurements in this run regressed.
+
+        Returns:
+            ``{"store_name", "metric", "value", "median", "ratio"}`` dicts,
+            worst first
+        """
+        found = [
+            regression
+            for name in self.current
+            for metric in METRICS
+            if (regression := self._check(name, metric))
+        ]
+        return sorted(found, key=lambda r: r["ratio"], reverse=True)
+
+    def save(self) -> None:
+        """Write the history to disk (atomically)."""
+        directory = self.history_file.parent
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(
+                {"window": self.window, "stores": self.stores},
+                f,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_path, self.history_file)
+
+
+def format_regression(regression: dict) -> str:
+    """One-line description of a regression."""
+    if regression["metric"] == "seconds":
+        value, baseline = f"{regression['value']:.1f}s", f"{regression['median']:.1f}s"
+    else:
+        value, baseline = f"{regression['value'] / 1000:.0f} kB", f"{regression['median'] / 1000:.0f} kB"
+    return f"{regression['store_name']}: {value} vs usual {baseline} ({regression['ratio']}x)"
@@ -0,0 +1,87 @@
+"""Persistent cache of which commerce platform each store runs on."""
+
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+
+class PlatformCache:
+    """
+    Remembers the detected platform per store so detection runs once.
+
+    Entries expire after ``ttl_days`` and are dropped as soon as the
+    platform adapter fails, so the store gets re-detected next time. A
+    store on a known platform without a sale listing (e.g. no Shopify
+    ``/collections/sale``) keeps its entry, marked so its HTML is checked
+    directly.
+    """
+
+    def __init__(self, cache_file: str = "platform_cache.json", ttl_days: int = 7):
+        self.cache_file = Path(cache_file)
+        self.ttl = timedelta(days=ttl_days)
+        self.entries = self._load()
+        self.dirty = False
+
+    def _load(self) -> dict:
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, IOError):
+                pass
+        return {}
+
+    def lookup(self, store_name: str) -> tuple[bool, Optional[str]]:
+        """
+        Look up a store's platform.
+
+        Returns:
+            (found, platform) where platform is None for stores known to
+            run on no supported platform
+        """
+        entry = self.entries.get(store_name)
+        if not entry:
+            return False, None
+        try:
+            detected = datetime.fromisoformat(entry["detected"])
+        except (KeyError, ValueError):
+            return False, None
+        if datetime.now() - detected > self.ttl:
+            return False, None
+        return True, entry.get("platform")
+
+    def set(self, store_name: str, platform: Optional[str]) -> None:
+        """Record the detected platform (None for no supported platform)."""
+        self.entries[store_name] = {
+            "platform": platform,
+            "detected": datetime.now().isoformat(),
+        }
+        self.dirty = True
+
+    def has_sale_listing(self, store_name: str) -> bool:
+        """False if the platform's sale listing was found missing for this store."""
+        return not self.entries.get(store_name, {}).get("no_sale_listing", False)
+
+    def mark_no_sale_listing(self, store_name: str) -> None:
+        """
+        Remember that the store has no sale listing on its platform, so the
+        adapter isn't asked again until the entry expires.
+        """
+        entry = self.entries.get(store_name)
+        if entry is not None and not entry.get("no_sale_listing"):
+            entry["no_sale_listing"] = True
+            self.dirty = True
+
+    def invalidate(self, store_name: str) -> None:
+        """Forget a store's platform, e.g. after its adapter failed."""
+        if self.entries.pop(store_name, None) is not None:
+            self.dirty = True
+
+    def save(self) -> None:
+        """Write the cache to disk if it changed."""
+        if not self.dirty:
+            return
+        with open(self.cache_file, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2, ensure_ascii=False)
+        self.dirty = False
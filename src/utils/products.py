@@ -0,0 +1,203 @@
+"""Product-level tracking of sale pages between runs."""
+
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+
+def discount_percent(price: Optional[float], original: Optional[float]) -> int:
+    """Discount in whole percent, or 0 if the product is not marked down."""
+    if not price or not original or original <= price:
+        return 0
+    return round((original - price) / original * 100)
+
+
+class Product:
+    """A single product listed on a store's sale page."""
+
+    __slots__ = ("id", "name", "price", "original_price", "url", "brand", "category", "sizes")
+
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        price: float,
+        original_price: Optional[float] = None,
+        url: Optional[str] = None,
+        brand: Optional[str] = None,
+        category: Optional[str] = None,
+        sizes: Optional[tuple[str, ...]] = None,
+    ):
+        self.id = id
+        self.name = name
+        self.price = price
+        self.original_price = original_price
+        self.url = url
+        self.brand = brand
+        self.category = category
+        self.sizes = sizes
+
+    @property
+    def discount(self) -> int:
+        """Discount in whole percent (0 if not marked down)."""
+        return discount_percent(self.price, self.original_price)
+
+    def to_row(self) -> list:
+        """Compact list representation used in the state files."""
+        return [
+            self.name,
+            self.price,
+            self.original_price,
+            self.url,
+            self.brand,
+            self.category,
+            list(self.sizes) if self.sizes else None,
+        ]
+
+    @classmethod
+    def from_row(cls, product_id: str, row: list) -> "Product":
+        """Rebuild a product from :meth:`to_row` output."""
+        name, price, original_price, url, brand, category, sizes = (list(row) + [None] * 7)[:7]
+        return cls(
+            product_id,
+            name,
+            price,
+            original_price,
+            url,
+            brand,
+            category,
+            tuple(sizes) if sizes else None,
+        )
+
+    def __repr__(self) -> str:
+        return f"Product({self.id!r}, {self.name!r}, {self.price}, {self.original_price})"
+
+
+class ProductDiff:
+    """Changes in a store's sale products since the previous run."""
+
+    __slots__ = ("added", "repriced", "deeper", "removed")
+
+    def __init__(self):
+        self.added: list[Product] = []
+        self.repriced: list[Product] = []
+        self.deeper: list[Product] = []
+        self.removed: list[str] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.repriced or self.removed)
+
+    @property
+    def new_markdowns(self) -> list[Product]:
+        """Newly listed products that are marked down."""
+        return [p for p in self.added if p.discount > 0]
+
+
+def diff_products(previous: dict[str, Product], current: dict[str, Product]) -> ProductDiff:
+    """
+    Compare two product sets keyed by product id.
+
+    ``repriced`` holds every product whose price changed and ``deeper``
+    the subset whose discount grew.
+    """
+    diff = ProductDiff()
+    for product_id, product in current.items():
+        old = previous.get(product_id)
+        if old is None:
+            diff.added.append(product)
+        elif old.price != product.price or old.original_price != product.original_price:
+            diff.repriced.append(product)
+            if product.discount > old.discount:
+                diff.deeper.append(product)
+    diff.removed = [pid for pid in previous if pid not in current]
+    return diff
+
+
+class ProductState:
+    """
+    Persists the products seen on each store's sale page.
+
+    Every store gets its own compact JSON file in ``state_dir`` which is
+    only rewritten when that store's product set actually changed.
+    """
+
+    def __init__(self, state_dir: str = "product_state"):
+        self.state_dir = Path(state_dir)
+
+    def _path(self, store_name: str) -> Path:
+        slug = re.sub(r"[^a-z0-9]+", "-", store_name.lower()).strip("-")
+        return self.state_dir / f"{slug or 'store'}.json"
+
+    def has_store(self, store_name: str) -> bool:
+        """Whether products have been recorded for this store before."""
+        return self._path(store_name).exists()
+
+    def load(self, store_name: str) -> dict[str, Product]:
+        """Load the last recorded products for a store."""
+        rows = self._read(store_name).get("products", {})
+        return {pid: Product.from_row(pid, row) for pid, row in rows.items()}
+
+    def _read(self, store_name: str) -> dict:
+        path = self._path(store_name)
+        if not path.exists():
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return {}
+
+    def save(
+        self,
+        store_name: str,
+        url: str,
+        products: dict[str, Product],
+        reported: Optional[dict[str, float]] = None,
+    ) -> None:
+        """Write a store's product set, keeping reported prices of listed products."""
+        if reported is None:
+            reported = self.reported(store_name)
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        data = {
+            "store_name": store_name,
+            "url": url,
+            "updated": datetime.now().isoformat(),
+            "products": {pid: p.to_row() for pid, p in products.items()},
+            "reported": {pid: price for pid, price in reported.items() if pid in products},
+        }
+        with open(self._path(store_name), "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+
+    def reported(self, store_name: str) -> dict[str, float]:
+        """Lowest price at which each product was reported as a watchlist match."""
+        return self._read(store_name).get("reported", {})
+
+    def mark_reported(self, store_name: str, prices: dict[str, float]) -> None:
+        """Record products reported (or seen on the baseline run) at these prices."""
+        if not prices:
+            return
+        data = self._read(store_name)
+        reported = {**data.get("reported", {}), **prices}
+        products = {pid: Product.from_row(pid, row) for pid, row in data.get("products", {}).items()}
+        self.save(store_name, data.get("url", ""), products, reported)
+
+    def update(self, store_name: str, url: str, products: list[Product]) -> ProductDiff:
+        """
+        Diff a freshly scraped product list against the stored one.
+
+        The store's file is written only if something changed. An empty
+        list where products were recorded before is taken as a suspect
+        fetch (a consent wall or captcha served instead of the page): it is
+        neither diffed nor saved, so the next real fetch isn't all "new".
+        """
+        current = {p.id: p for p in products}
+        previous = self.load(store_name)
+        if not current and previous:
+            print(f"[{store_name}] ⚠️  Sale page listed no products (had {len(previous)}); suspect fetch ignored")
+            return ProductDiff()
+        diff = diff_products(previous, current)
+        if diff or not self.has_store(store_name):
+            self.save(store_name, url, current)
+        return diff
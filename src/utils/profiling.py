@@ -0,0 +1,164 @@
+"""CPU and memory profiling of individual store checks."""
+
+import cProfile
+import pstats
+import re
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+# (file, line, function) as used by pstats
+FuncKey = tuple[str, int, str]
+
+
+def _label(func: FuncKey) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name  # built-in, e.g. "<method 'search' of 're.Pattern' objects>"
+    return f"{name} ({Path(filename).name}:{line})"
+
+
+def collapse_stats(stats: pstats.Stats, max_depth: int = 64) -> dict[str, int]:
+    """
+    Turn profile stats into collapsed stacks for flamegraph tools.
+
+    cProfile only records caller/callee pairs, so each function's time is
+    split over its callers in proportion to the time spent through each
+    of them. The result is an approximation of the real stacks.
+
+    Returns:
+        ``{"root;caller;callee": microseconds}``
+    """
+    raw = stats.stats  # func -> (cc, nc, tt, ct, callers)
+    callees: dict[FuncKey, dict[FuncKey, float]] = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[func] = edge[3]
+
+    stacks: dict[str, int] = {}
+
+    def walk(func: FuncKey, inclusive: float, path: list[str], seen: set) -> None:
+        _, _, tt, ct, _ = raw[func]
+        if ct <= 0 or inclusive <= 0:
+            return
+        share = inclusive / ct
+        frame = path + [_label(func).replace(";", ",")]
+        own = int(tt * share * 1_000_000)
+        if own:
+            key = ";".join(frame)
+            stacks[key] = stacks.get(key, 0) + own
+        if len(frame) >= max_depth:
+            return
+        for callee, edge_time in callees.get(func, {}).items():
+            if callee in seen or callee not in raw:
+                continue
+            walk(callee, edge_time * share, frame, seen | {callee})
+
+    roots = [f for f, (_, _, _, _, callers) in raw.items() if not callers]
+    for root in roots:
+        walk(root, raw[root][3], [], {root})
+    return stacks
+
+
+class StoreProfiler:
+    """
+    Profiles calls per store with cProfile and tracemalloc.
+
+    For every profiled name it keeps the pstats, the wall time and the
+    peak traced memory, and :meth:`write` saves them as ``.prof`` files
+    (for snakeviz or pstats) and ``.collapsed`` stacks (for flamegraph.pl
+    or speedscope), per store and for the whole run.
+    """
+
+    def __init__(self, output_dir: str = "profiles"):
+        self.output_dir = Path(output_dir)
+        self.stats: dict[str, pstats.Stats] = {}
+        self.memory_peaks: dict[str, int] = {}
+        self.wall_times: dict[str, float] = {}
+
+    def run(self, name: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call ``func`` under the profiler and record the result as ``name``."""
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            self.wall_times[name] = self.wall_times.get(name, 0.0) + time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            self.memory_peaks[name] = max(self.memory_peaks.get(name, 0), peak)
+            if started_tracing:
+                tracemalloc.stop()
+            if name in self.stats:
+                self.stats[name].add(profile)
+            else:
+                self.stats[name] = pstats.Stats(profile)
+
+    def aggregate(self) -> pstats.Stats:
+        """Stats of every profiled call combined."""
+        combined = pstats.Stats()
+        for stats in self.stats.values():
+            combined.add(stats)
+        return combined
+
+    @staticmethod
+    def _write_collapsed(path: Path, stacks: dict[str, int]) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, micros in sorted(stacks.items()):
+                f.write(f"{stack} {micros}\n")
+
+    def write(self) -> Path:
+        """
+        Save per-store and aggregate profiles.
+
+        Returns:
+            The output directory
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for name, stats in self.stats.items():
+            slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "store"
+            stats.dump_stats(str(self.output_dir / f"{slug}.prof"))
+            self._write_collapsed(self.output_dir / f"{slug}.collapsed", collapse_stats(stats))
+
+        if self.stats:
+            combined = self.aggregate()
+            combined.dump_stats(str(self.output_dir / "all.prof"))
+            self._write_collapsed(self.output_dir / "all.collapsed", collapse_stats(combined))
+        return self.output_dir
+
+    def hot_functions(self, limit: int = 15) -> list[tuple[str, float, float, int]]:
+        """
+        Functions with the most time spent in their own code, across the run.
+
+        Returns:
+            (function, own_seconds, cumulative_seconds, calls), hottest first
+        """
+        if not self.stats:
+            return []
+        rows = [
+            (_label(func), tt, ct, nc)
+            for func, (_, nc, tt, ct, _) in self.aggregate().stats.items()
+        ]
+        rows.sort(key=lambda row: row[1], reverse=True)
+        return rows[:limit]
+
+    def print_report(self, limit: int = 15) -> None:
+        """Print per-store time and memory and the hottest functions."""
+        if not self.stats:
+            return
+
+        print("\n⏱️  Profile per store (wall time, peak traced memory):")
+        for name in sorted(self.wall_times, key=self.wall_times.get, reverse=True):
+            peak_mb = self.memory_peaks.get(name, 0) / 1_000_000
+            print(f"   {self.wall_times[name]:7.2f}s  {peak_mb:7.1f} MB  {name}")
+
+        print(f"\n🔥 Top {limit} functions by own time:")
+        for label, own, cumulative, calls in self.hot_functions(limit):
+            print(f"   {own:7.3f}s own  {cumulative:7.3f}s cum  {calls:>8} calls  {label}")
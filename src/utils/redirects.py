@@ -0,0 +1,110 @@
+"""Persistent cache of where configured store URLs redirect to."""
+
+import json
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+
+class RedirectCache:
+    """
+    Maps each fetched URL to the final URL its redirects end at.
+
+    Fetches go straight to the cached final URL and skip the region,
+    locale and consent hops. Entries expire after ``ttl_days`` and are
+    dropped as soon as a fetch through the shortcut fails, so the next
+    fetch follows the redirects again and records the new target.
+    """
+
+    def __init__(self, cache_file: str = "redirects.json", ttl_days: int = 7):
+        self.cache_file = Path(cache_file)
+        self.ttl = timedelta(days=ttl_days)
+        self.entries = self._load()
+        self.dirty = False
+        self._lock = threading.Lock()
+        # Hops skipped this run and the time they took when last measured
+        self.hops_saved = 0
+        self.seconds_saved = 0.0
+
+    def _load(self) -> dict:
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, IOError):
+                pass
+        return {}
+
+    def resolve(self, url: str) -> str:
+        """Return the cached final URL for ``url``, or ``url`` itself."""
+        entry = self.entries.get(url)
+        if not entry:
+            return url
+        try:
+            checked = datetime.fromisoformat(entry["checked"])
+        except (KeyError, ValueError):
+            return url
+        if datetime.now() - checked > self.ttl:
+            return url
+        return entry["final"]
+
+    def hit(self, url: str) -> None:
+        """Count the hops skipped by a successful fetch through the shortcut."""
+        entry = self.entries.get(url)
+        if entry:
+            with self._lock:
+                self.hops_saved += entry.get("hops", 0)
+                self.seconds_saved += entry.get("seconds") or 0.0
+
+    def record(
+        self,
+        url: str,
+        final_url: str,
+        status: int,
+        hops: int,
+        seconds: Optional[float] = None,
+    ) -> None:
+        """
+        Remember where ``url`` ended up after following its redirects.
+
+        Args:
+            seconds: Time the redirect hops took, if it was measured
+        """
+        if hops == 0 or final_url == url:
+            self.invalidate(url)
+            return
+        with self._lock:
+            entry = self.entries.get(url, {})
+            if seconds is None:
+                seconds = entry.get("seconds")
+            if entry.get("final") == final_url and entry.get("hops") == hops:
+                # Only refresh the date once it is half way to expiring
+                try:
+                    checked = datetime.fromisoformat(entry["checked"])
+                    if datetime.now() - checked < self.ttl / 2:
+                        return
+                except (KeyError, ValueError):
+                    pass
+            self.entries[url] = {
+                "final": final_url,
+                "status": status,
+                "hops": hops,
+                "seconds": round(seconds, 2) if seconds is not None else None,
+                "checked": datetime.now().isoformat(),
+            }
+            self.dirty = True
+
+    def invalidate(self, url: str) -> None:
+        """Forget a URL's redirect target, e.g. after the shortcut failed."""
+        with self._lock:
+            if self.entries.pop(url, None) is not None:
+                self.dirty = True
+
+    def save(self) -> None:
+        """Write the cache to disk if it changed."""
+        if not self.dirty:
+            return
+        with open(self.cache_file, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2, ensure_ascii=False)
+        self.dirty = False
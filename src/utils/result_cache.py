@@ -0,0 +1,103 @@
+"""Local TTL cache of store check results shared across CLI invocations."""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+
+class ResultCache:
+    """
+    LRU cache of ``check()`` results keyed by store and URL.
+
+    Entries younger than ``ttl`` seconds are served as fresh. Older ones
+    up to ``stale_ttl`` can still be served while a refresh runs in the
+    background (stale-while-revalidate). The cache is bounded both by
+    number of entries and by their total serialized size.
+    """
+
+    def __init__(
+        self,
+        cache_file: str = ".cache/results.json",
+        ttl: float = 900,
+        stale_ttl: float = 24 * 3600,
+        max_entries: int = 1000,
+        max_bytes: int = 5_000_000,
+        fresh: bool = False,
+    ):
+        self.cache_file = Path(cache_file)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # Ignore cached entries for reads but still store new results
+        self.fresh = fresh
+        self._lock = threading.Lock()
+        self.entries: "OrderedDict[str, dict]" = self._load()
+        self.total_bytes = sum(e.get("size", 0) for e in self.entries.values())
+        self.dirty = False
+
+    @staticmethod
+    def key(store_name: str, url: str) -> str:
+        return f"{store_name}|{url}"
+
+    def _load(self) -> "OrderedDict[str, dict]":
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    return OrderedDict(json.load(f))
+            except (json.JSONDecodeError, IOError, TypeError, ValueError):
+                pass
+        return OrderedDict()
+
+    def get(self, key: str) -> Optional[tuple[dict, float]]:
+        """
+        Look up a cached result.
+
+        Returns:
+            (result, age_seconds), or None if missing, older than
+            ``stale_ttl`` or the cache is in fresh mode
+        """
+        if self.fresh:
+            return None
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            age = time.time() - entry["cached_at"]
+            if age > self.stale_ttl:
+                return None
+            self.entries.move_to_end(key)
+            return entry["result"], age
+
+    def put(self, key: str, result: dict) -> None:
+        """Store a result and evict least recently used entries if over budget."""
+        size = len(json.dumps(result, ensure_ascii=False).encode("utf-8"))
+        with self._lock:
+            old = self.entries.pop(key, None)
+            if old:
+                self.total_bytes -= old.get("size", 0)
+            self.entries[key] = {"result": result, "cached_at": time.time(), "size": size}
+            self.total_bytes += size
+            while self.entries and (
+                len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes
+            ):
+                _, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= evicted.get("size", 0)
+            self.dirty = True
+
+    def save(self) -> None:
+        """Write the cache to disk (atomically) if it changed."""
+        with self._lock:
+            if not self.dirty:
+                return
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_file.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_file)
+            self.dirty = False
@@ -0,0 +1,70 @@
+"""Persistent cache of the sale section URL learned for each store."""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+
+class SaleLinkCache:
+    """
+    Remembers where each store's sale section lives.
+
+    Each entry holds the discovered sale URL and the URL it redirected to.
+    A remembered URL is trusted as long as a cheap request to it succeeds;
+    when it fails the entry is dropped and the store's links are scanned
+    again. Every change of a store's sale URL is kept in ``changes`` so it
+    can be reported at the end of the run.
+    """
+
+    def __init__(self, cache_file: str = "sale_links.json"):
+        self.cache_file = Path(cache_file)
+        self.entries = self._load()
+        self.changes: list[dict] = []
+        self.dirty = False
+
+    def _load(self) -> dict:
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, IOError):
+                pass
+        return {}
+
+    def get(self, store_name: str) -> Optional[dict]:
+        """Return ``{"url", "final_url", "verified"}`` for a store, if known."""
+        return self.entries.get(store_name)
+
+    def set(self, store_name: str, url: str, final_url: str, previous: Optional[str] = None) -> None:
+        """
+        Remember a store's sale URL and its redirect target.
+
+        Args:
+            previous: URL the store used before (remembered or configured);
+                recorded as a change if it differs
+        """
+        old = self.entries.get(store_name, {})
+        self.entries[store_name] = {
+            "url": url,
+            "final_url": final_url,
+            "verified": datetime.now().isoformat(),
+        }
+        self.dirty = True
+        if previous and previous != url:
+            self.changes.append({"store_name": store_name, "old": previous, "new": url})
+        elif old and old.get("final_url") != final_url:
+            self.changes.append({"store_name": store_name, "old": old.get("final_url"), "new": final_url})
+
+    def invalidate(self, store_name: str) -> None:
+        """Forget a store's sale URL, e.g. after it stopped answering."""
+        if self.entries.pop(store_name, None) is not None:
+            self.dirty = True
+
+    def save(self) -> None:
+        """Write the cache to disk if it changed."""
+        if not self.dirty:
+            return
+        with open(self.cache_file, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2, ensure_ascii=False)
+        self.dirty = False
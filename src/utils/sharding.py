@@ -0,0 +1,180 @@
+"""Deterministic sharding of stores across parallel jobs."""
+
+import json
+import zlib
+from datetime import datetime
+from pathlib import Path
+from statistics import median
+from typing import Optional
+
+# Assumed check duration (seconds) for stores that were never timed
+DEFAULT_DURATION = 15.0
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """
+    Parse a ``i/N`` shard spec (1-based).
+
+    Raises:
+        ValueError: If the spec is malformed or out of range
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected i/N (e.g. 1/4)")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{value}', need 1 <= i <= N")
+    return index, count
+
+
+def assign_shards(names: list[str], durations: dict[str, float], count: int) -> list[list[str]]:
+    """
+    Split store names into ``count`` shards balanced by past duration.
+
+    Stores are placed longest first on the currently lightest shard. Ties
+    are broken by name and shard index, so every job computing this from
+    the same state file gets the same assignment.
+    """
+    known = [d for d in durations.values() if d > 0]
+    fallback = median(known) if known else DEFAULT_DURATION
+
+    shards: list[list[str]] = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for name in sorted(names, key=lambda n: (-durations.get(n, fallback), n)):
+        target = min(range(count), key=lambda i: (loads[i], i))
+        shards[target].append(name)
+        loads[target] += durations.get(name, fallback)
+    return shards
+
+
+def hash_shard(name: str, count: int) -> int:
+    """0-based shard of a store by a stable hash of its name."""
+    return zlib.crc32(name.encode("utf-8")) % count
+
+
+def write_shard_plan(path: str, shards: list[list[str]]) -> None:
+    """Write a shard assignment for the shard jobs to share."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"count": len(shards), "shards": shards}, f, indent=2, ensure_ascii=False)
+
+
+def load_shard_plan(path: str) -> Optional[list[list[str]]]:
+    """Read a shard assignment written by :func:`write_shard_plan`, or None."""
+    try:
+        with open(Path(path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return None
+    shards = data.get("shards")
+    if not isinstance(shards, list) or len(shards) != data.get("count"):
+        return None
+    return shards
+
+
+def shards_from_plan(names: list[str], plan: Optional[list[list[str]]], count: int) -> list[list[str]]:
+    """
+    Split store names the way a shared plan says.
+
+    Stores the plan doesn't list (added since it was made), and every
+    store when there is no plan for ``count`` shards, are placed by
+    :func:`hash_shard`. Either way the result depends only on the plan and
+    the names, never on a job's own copy of the durations.
+    """
+    planned = {}
+    if plan is not None and len(plan) == count:
+        planned = {name: index for index, shard in enumerate(plan) for name in shard}
+    shards: list[list[str]] = [[] for _ in range(count)]
+    for name in sorted(names):
+        shards[planned.get(name, hash_shard(name, count))].append(name)
+    return shards
+
+
+def write_partial(
+    path: str,
+    shard: str,
+    results: dict[str, dict],
+    durations: dict[str, float],
+    alerts: list[dict],
+    platforms: Optional[dict[str, dict]] = None,
+    perf: Optional[dict[str, list]] = None,
+    sale_links: Optional[dict[str, dict]] = None,
+    redirects: Optional[dict[str, dict]] = None,
+    notified: Optional[list[str]] = None,
+) -> None:
+    """
+    Write one shard's raw results for a later ``merge-state``.
+
+    Args:
+        notified: Stores whose new sale the shard already notified
+            (priority stores), so the merge doesn't notify them again
+    """
+    data = {
+        "shard": shard,
+        "finished": datetime.now().isoformat(),
+        "results": results,
+        "durations": durations,
+        "alerts": alerts,
+        "platforms": platforms or {},
+        "perf": perf or {},
+        "sale_links": sale_links or {},
+        "redirects": redirects or {},
+        "notified": notified or [],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def load_partials(
+    paths: list[str],
+) -> tuple[
+    dict[str, dict],
+    dict[str, float],
+    list[dict],
+    dict[str, dict],
+    dict[str, list],
+    dict[str, dict],
+    dict[str, dict],
+    list[str],
+]:
+    """
+    Load and combine partial state files, in any order.
+
+    If a store shows up in more than one file, the most recently checked
+    result wins.
+
+    Returns:
+        (results, durations, alerts, platforms, perf, sale_links, redirects,
+        notified); ``perf`` maps each store to this run's ``[seconds, bytes]``
+    """
+    results: dict[str, dict] = {}
+    durations: dict[str, float] = {}
+    alerts: list[dict] = []
+    platforms: dict[str, dict] = {}
+    perf: dict[str, list] = {}
+    sale_links: dict[str, dict] = {}
+    redirects: dict[str, dict] = {}
+    notified: list[str] = []
+
+    for path in paths:
+        try:
+            with open(Path(path), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"   ⚠️  Skipping partial state {path}: {e}")
+            continue
+
+        for name, result in data.get("results", {}).items():
+            existing = results.get(name)
+            if existing is None or result.get("checked_at", "") > existing.get("checked_at", ""):
+                results[name] = result
+                if name in data.get("durations", {}):
+                    durations[name] = data["durations"][name]
+                if name in data.get("perf", {}):
+                    perf[name] = data["perf"][name]
+        alerts.extend(data.get("alerts", []))
+        platforms.update(data.get("platforms", {}))
+        sale_links.update(data.get("sale_links", {}))
+        redirects.update(data.get("redirects", {}))
+        notified.extend(data.get("notified", []))
+
+    return results, durations, alerts, platforms, perf, sale_links, redirects, notified
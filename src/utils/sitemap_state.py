@@ -0,0 +1,49 @@
+"""Persisted sitemap lastmod values per store."""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+
+class SitemapState:
+    """
+    Remembers each store's sitemap roots, child-sitemap and sale-URL
+    ``lastmod`` values and when the store was last fully checked.
+    """
+
+    def __init__(self, state_file: str = "sitemap_state.json"):
+        self.state_file = Path(state_file)
+        self.stores = self._load()
+
+    def _load(self) -> dict:
+        if self.state_file.exists():
+            try:
+                with open(self.state_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, IOError):
+                pass
+        return {}
+
+    def get(self, store_name: str) -> dict:
+        """Return (and create) the entry for a store."""
+        return self.stores.setdefault(
+            store_name,
+            {"roots": None, "sitemaps": {}, "sale_urls": {}, "last_full_check": None},
+        )
+
+    def mark_checked(self, store_name: str) -> None:
+        """Record that the store just got a full ``check_sale``."""
+        self.get(store_name)["last_full_check"] = datetime.now().isoformat()
+
+    def last_full_check(self, store_name: str) -> Optional[datetime]:
+        value = self.get(store_name).get("last_full_check")
+        try:
+            return datetime.fromisoformat(value) if value else None
+        except ValueError:
+            return None
+
+    def save(self) -> None:
+        """Save state to file."""
+        with open(self.state_file, "w", encoding="utf-8") as f:
+            json.dump(self.stores, f, indent=2, ensure_ascii=False)
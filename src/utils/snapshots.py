@@ -0,0 +1,284 @@
+"""Content-addressed archive of fetched pages for reproducing verdicts."""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:  # Optional: fall back to gzip
+    zstandard = None
+
+
+class SnapshotArchive:
+    """
+    Stores every fetched page once per distinct content.
+
+    Pages are compressed (zstd when available, else gzip) under
+    ``objects/<hash[:2]>/<hash>``, and ``index.json`` records which store
+    fetched which URL in which run. In-browser detection payloads and
+    platform JSON responses are archived the same way, with a ``kind`` of
+    ``payload`` or ``platform:<name>`` on their entry. Old runs are
+    dropped by age and, when the archive grows past ``max_bytes``, oldest
+    first.
+    """
+
+    def __init__(
+        self,
+        root: str = ".cache/snapshots",
+        max_bytes: int = 200_000_000,
+        max_age_days: int = 30,
+    ):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.index_file = self.root / "index.json"
+        self.run_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+        self._lock = threading.Lock()
+        self.index = self._load_index()
+        self.dirty = False
+
+    def _load_index(self) -> dict:
+        if self.index_file.exists():
+            try:
+                with open(self.index_file, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+                if isinstance(index, dict):
+                    index.setdefault("runs", {})
+                    index.setdefault("objects", {})
+                    return index
+            except (json.JSONDecodeError, IOError):
+                pass
+        return {"runs": {}, "objects": {}}
+
+    def _object_path(self, digest: str, codec: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.{codec}"
+
+    @staticmethod
+    def _compress(data: bytes) -> tuple[bytes, str]:
+        if zstandard is not None:
+            return zstandard.ZstdCompressor(level=10).compress(data), "zst"
+        return gzip.compress(data, compresslevel=6), "gz"
+
+    @staticmethod
+    def _decompress(data: bytes, codec: str) -> bytes:
+        if codec == "zst":
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read this snapshot")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def add(self, store_name: str, url: str, html: str, kind: Optional[str] = None) -> str:
+        """
+        Archive a fetched page for the current run.
+
+        Args:
+            kind: ``payload`` for an in-browser detection payload (as
+                JSON), ``platform:<name>`` for a platform endpoint's JSON;
+                None for an HTML page
+
+        Returns:
+            The content hash of the page
+        """
+        raw = html.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        now = datetime.now().isoformat()
+
+        with self._lock:
+            obj = self.index["objects"].get(digest)
+            if obj is None or not self._object_path(digest, obj["codec"]).exists():
+                data, codec = self._compress(raw)
+                path = self._object_path(digest, codec)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(data)
+                obj = {"codec": codec, "size": len(data), "raw_size": len(raw)}
+                self.index["objects"][digest] = obj
+
+            run = self.index["runs"].setdefault(self.run_id, {"started": now, "pages": {}})
+            entry = {"url": url, "hash": digest, "fetched_at": now}
+            if kind:
+                entry["kind"] = kind
+            run["pages"].setdefault(store_name, []).append(entry)
+            self.dirty = True
+        return digest
+
+    def load(self, digest: str) -> Optional[str]:
+        """Return the archived page with this hash, or None if it is gone."""
+        obj = self.index["objects"].get(digest)
+        if obj is None:
+            return None
+        path = self._object_path(digest, obj["codec"])
+        if not path.exists():
+            return None
+        return self._decompress(path.read_bytes(), obj["codec"]).decode("utf-8")
+
+    def runs(self) -> list[str]:
+        """Archived run ids, oldest first."""
+        return sorted(self.index["runs"])
+
+    def pages(self, store_name: str, run_id: Optional[str] = None) -> list[dict]:
+        """
+        Pages archived for a store.
+
+        Args:
+            store_name: Store to look up (case-insensitive)
+            run_id: Run to look in; defaults to the latest run that has the store
+
+        Returns:
+            ``{"url", "hash", "fetched_at", "run"}`` entries in fetch order
+        """
+        for run in reversed(self.runs()) if run_id is None else [run_id]:
+            for name, entries in self.index["runs"].get(run, {}).get("pages", {}).items():
+                if name.lower() == store_name.lower():
+                    return [{**entry, "run": run} for entry in entries]
+        return []
+
+    def replay(self, scraper, entry: dict, kind: Optional[str] = None) -> Optional[dict]:
+        """
+        Run detection again on an archived page.
+
+        Args:
+            scraper: Scraper for the store that fetched the page
+            entry: Page entry from :meth:`pages`
+            kind: ``main`` or ``sale``; inferred from the URL if omitted
+
+        Payload entries are detected with the payload methods. A platform
+        entry replays the adapter's whole check on every JSON response of
+        that store in the entry's run.
+
+        Returns:
+            Dict with ``has_sale``, ``description``, ``sale_link`` and
+            ``detection_path``, or None if the snapshot is gone
+        """
+        html = self.load(entry["hash"])
+        if html is None:
+            return None
+        if entry.get("kind", "").startswith("platform:"):
+            return self._replay_platform(scraper, entry)
+        if kind is None:
+            kind = "main" if entry["url"] == scraper.base_url else "sale"
+
+        if entry.get("kind") == "payload":
+            payload = json.loads(html)
+            if kind == "sale":
+                has_sale, description, path = scraper.detect_sale_page_payload(payload)
+                sale_link = None
+            else:
+                has_sale, description, sale_link, path = scraper.detect_page_payload(payload)
+        elif kind == "sale":
+            has_sale, description, path = scraper.detect_sale_page(html)
+            sale_link = None
+        else:
+            has_sale, description, sale_link, path = scraper.detect_page(html)
+        return {
+            "has_sale": has_sale,
+            "description": description,
+            "sale_link": sale_link,
+            "detection_path": path,
+        }
+
+    def _replay_platform(self, scraper, entry: dict) -> Optional[dict]:
+        """Run a platform adapter's check against the archived JSON of one run."""
+        from ..scrapers.platforms import NoSaleListing, get_adapter
+
+        adapter = get_adapter(entry["kind"].partition(":")[2])
+        if adapter is None:
+            return None
+        responses = {
+            page["url"]: self.load(page["hash"])
+            for page in self.pages(scraper.name, entry.get("run"))
+            if page.get("kind") == entry["kind"]
+        }
+        session, snapshots = scraper.session, scraper.snapshots
+        scraper.session, scraper.snapshots = _ReplaySession(responses), None
+        try:
+            result = adapter.check(scraper)
+        except NoSaleListing:
+            result = None
+        finally:
+            scraper.session, scraper.snapshots = session, snapshots
+        if result is None:
+            return None
+        return {
+            "has_sale": result["active"],
+            "description": result.get("description", ""),
+            "sale_link": result["url"] if result["active"] else None,
+            "detection_path": result["detection_path"],
+        }
+
+    def prune(self) -> int:
+        """
+        Drop runs older than ``max_age_days``, then the oldest runs until
+        the archive fits in ``max_bytes``, and delete unreferenced objects.
+
+        Returns:
+            Number of objects deleted
+        """
+        cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+        with self._lock:
+            runs = self.index["runs"]
+            for run_id in [r for r, run in runs.items() if run.get("started", "") < cutoff]:
+                del runs[run_id]
+
+            def referenced() -> set[str]:
+                return {
+                    entry["hash"]
+                    for run in runs.values()
+                    for entries in run.get("pages", {}).values()
+                    for entry in entries
+                }
+
+            live = referenced()
+            objects = self.index["objects"]
+            # Keep at least the current run even if it alone is over budget
+            while len(runs) > 1 and sum(objects[h]["size"] for h in live if h in objects) > self.max_bytes:
+                del runs[min(runs)]
+                live = referenced()
+
+            deleted = 0
+            for digest in [h for h in objects if h not in live]:
+                path = self._object_path(digest, objects.pop(digest)["codec"])
+                if path.exists():
+                    path.unlink()
+                deleted += 1
+            self.dirty = True
+        return deleted
+
+    def save(self) -> None:
+        """Write the index to disk (atomically) if it changed."""
+        with self._lock:
+            if not self.dirty:
+                return
+            self.root.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.index, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.index_file)
+            self.dirty = False
+
+
+class _ReplayResponse:
+    __slots__ = ("status_code", "text")
+
+    def __init__(self, text: Optional[str]):
+        self.status_code = 200 if text is not None else 404
+        self.text = text or ""
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class _ReplaySession:
+    """Stands in for a ``requests.Session``, answering from archived responses."""
+
+    def __init__(self, responses: dict[str, Optional[str]]):
+        self.responses = responses
+
+    def get(self, url: str, **kwargs) -> _ReplayResponse:
+        return _ReplayResponse(self.responses.get(url))
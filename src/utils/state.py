@@ -1,33 +1,238 @@
 """State management for tracking seen sales."""
 
 import json
+import os
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locking
+    fcntl = None
+
+
+# Sale entry fields that only change when the sale itself does; everything
+# else (last_seen, checked_at, detection_path, ...) is per-run data
+DURABLE_SALE_FIELDS = ("active", "store_name", "url", "description", "discount", "first_seen", "ended")
+
+
+def split_state(state: dict) -> tuple[dict, dict]:
+    """
+    Split a state into its durable facts and its per-run data.
+
+    Returns:
+        (durable, volatile); combining them with :func:`join_state` gives
+        the state back
+    """
+    durable: dict = {}
+    volatile: dict = {}
+    for key, value in state.items():
+        if key == "sales":
+            durable["sales"] = {
+                name: {k: v for k, v in entry.items() if k in DURABLE_SALE_FIELDS}
+                for name, entry in value.items()
+            }
+            volatile["sales"] = {
+                name: rest
+                for name, entry in value.items()
+                if (rest := {k: v for k, v in entry.items() if k not in DURABLE_SALE_FIELDS})
+            }
+        elif key == "stores":
+            durable["stores"] = {
+                name: {k: v for k, v in entry.items() if k != "last_check"} for name, entry in value.items()
+            }
+            volatile["stores"] = {
+                name: {"last_check": entry["last_check"]} for name, entry in value.items() if "last_check" in entry
+            }
+        elif key in ("durations", "last_check"):
+            volatile[key] = value
+        else:
+            durable[key] = value
+    return durable, volatile
+
+
+def join_state(durable: dict, volatile: dict) -> dict:
+    """Combine a durable state file with its per-run data."""
+    state = {**durable, **{k: v for k, v in volatile.items() if k not in ("sales", "stores")}}
+    for key in ("sales", "stores"):
+        entries = {name: dict(entry) for name, entry in durable.get(key, {}).items()}
+        for name, extra in volatile.get(key, {}).items():
+            if name in entries:
+                entries[name].update(extra)
+        if entries or key == "sales":
+            state[key] = entries
+    return state
+
+
+def _observed_at(entry: dict) -> str:
+    """Latest timestamp at which a sale entry was observed."""
+    return max(entry.get("last_seen") or "", entry.get("ended") or "")
+
+
+def merge_sale_entries(ours: dict, theirs: dict) -> dict:
+    """
+    Merge two observations of the same store's sale.
+
+    The newer observation wins field by field, the earliest ``first_seen``
+    and latest ``last_seen`` are kept, and an ``ended`` marker only
+    survives if nothing saw the sale active after it.
+    """
+    older, newer = (ours, theirs) if _observed_at(ours) <= _observed_at(theirs) else (theirs, ours)
+    merged = {**older, **newer}
+
+    first_seen = [e["first_seen"] for e in (ours, theirs) if e.get("first_seen")]
+    if first_seen:
+        merged["first_seen"] = min(first_seen)
+    last_seen = [e["last_seen"] for e in (ours, theirs) if e.get("last_seen")]
+    if last_seen:
+        merged["last_seen"] = max(last_seen)
+
+    if merged.get("active", False):
+        merged.pop("ended", None)
+    elif merged.get("ended") and merged.get("last_seen", "") > merged["ended"]:
+        # Seen active after the recorded end: the end was stale
+        merged["active"] = True
+        merged.pop("ended")
+    return merged
 
 
 class SaleState:
-    """Manages the state of detected sales to prevent duplicate notifications."""
+    """
+    Manages the state of detected sales to prevent duplicate notifications.
 
-    def __init__(self, state_file: str = "sale_state.json"):
+    The state is kept in two files. ``state_file`` holds the durable facts
+    (which sales are active, since when, their URL and description) and is
+    only rewritten when one of them changes, so it can be committed without
+    churn. Per-run data (last seen and check timestamps, durations,
+    detection paths) goes to a compact ``volatile_file`` next to it, which
+    is not meant to be committed.
+    """
+
+    def __init__(self, state_file: str = "sale_state.json", volatile_file: Optional[str] = None):
         self.state_file = Path(state_file)
+        self.volatile_file = (
+            Path(volatile_file)
+            if volatile_file
+            else self.state_file.with_name(f"{self.state_file.stem}.volatile.json")
+        )
         self.state = self._load_state()
+        # Stores changed by this process, merged into the file on save
+        self._dirty_sales: set[str] = set()
+        self._dirty_durations: set[str] = set()
+        self._dirty_stores: set[str] = set()
 
-    def _load_state(self) -> dict:
-        """Load state from file or create new state."""
-        if self.state_file.exists():
+    @staticmethod
+    def _read(path: Path) -> Optional[dict]:
+        if path.exists():
             try:
-                with open(self.state_file, "r", encoding="utf-8") as f:
+                with open(path, "r", encoding="utf-8") as f:
                     return json.load(f)
             except (json.JSONDecodeError, IOError):
                 pass
-        return {"sales": {}, "last_check": None}
+        return None
+
+    def _load_state(self) -> dict:
+        """Load state from file or create new state."""
+        durable = self._read(self.state_file)
+        if durable is None:
+            return {"sales": {}, "last_check": None}
+        return join_state(durable, self._read(self.volatile_file) or {})
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold an exclusive advisory lock next to the state file."""
+        if fcntl is None:
+            yield
+            return
+        lock_path = self.state_file.with_name(self.state_file.name + ".lock")
+        with open(lock_path, "a") as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
 
-    def save(self) -> None:
-        """Save current state to file."""
+    def _write_atomic(self, path: Path, data: dict, compact: bool = False) -> None:
+        """Write through a temp file and rename so readers never see half a file."""
+        directory = path.parent
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                if compact:
+                    json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+                else:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _merge_into(self, disk: dict) -> dict:
+        """Apply this process's changes on top of the state currently on disk."""
+        merged = {
+            **disk,
+            **{k: v for k, v in self.state.items() if k not in ("sales", "durations", "stores", "last_check")},
+        }
+
+        sales = dict(disk.get("sales", {}))
+        for name in self._dirty_sales:
+            ours = self.state["sales"].get(name)
+            if ours is None:
+                continue
+            sales[name] = merge_sale_entries(ours, sales[name]) if name in sales else ours
+        merged["sales"] = sales
+
+        durations = dict(disk.get("durations", {}))
+        for name in self._dirty_durations:
+            if name in self.state.get("durations", {}):
+                durations[name] = self.state["durations"][name]
+        if durations:
+            merged["durations"] = durations
+
+        stores = dict(disk.get("stores", {}))
+        for name in self._dirty_stores:
+            if name in self.state.get("stores", {}):
+                stores[name] = self.state["stores"][name]
+        if stores:
+            merged["stores"] = stores
+
+        merged["last_check"] = max(
+            disk.get("last_check") or "", self.state.get("last_check") or ""
+        ) or None
+        return merged
+
+    def save(self) -> bool:
+        """
+        Save current state to file.
+
+        Takes an advisory lock, re-reads the files and merges this run's
+        changes into them per store and field, so runs that overlap don't
+        overwrite each other's observations. The durable file is only
+        rewritten if its content changed; per-run data is always written.
+
+        Returns:
+            True if the durable state file changed
+        """
         self.state["last_check"] = datetime.now().isoformat()
-        with open(self.state_file, "w", encoding="utf-8") as f:
-            json.dump(self.state, f, indent=2, ensure_ascii=False)
+        with self._locked():
+            merged = self._merge_into(self._load_state())
+            durable, volatile = split_state(merged)
+            changed = durable != self._read(self.state_file)
+            if changed:
+                self._write_atomic(self.state_file, durable)
+            self._write_atomic(self.volatile_file, volatile, compact=True)
+        self.state = merged
+        self._dirty_sales.clear()
+        self._dirty_durations.clear()
+        self._dirty_stores.clear()
+        return changed
 
     def is_new_sale(self, store_name: str, sale_info: dict) -> bool:
         """
@@ -48,21 +253,30 @@ class SaleState:
 
         return False
 
-    def record_sale(self, store_name: str, sale_info: dict) -> None:
-        """Record a sale in the state."""
+    def record_sale(self, store_name: str, sale_info: dict, observed_at: Optional[str] = None) -> None:
+        """
+        Record a sale in the state.
+
+        Args:
+            observed_at: When the sale was seen, for a result checked
+                earlier (e.g. served from the result cache); default now.
+                It never moves ``last_seen`` backwards.
+        """
+        self._dirty_sales.add(store_name)
+        existing = self.state["sales"].get(store_name, {})
+        seen = observed_at or datetime.now().isoformat()
         self.state["sales"][store_name] = {
-            **sale_info,
-            "first_seen": self.state["sales"].get(store_name, {}).get(
-                "first_seen", datetime.now().isoformat()
-            ),
-            "last_seen": datetime.now().isoformat(),
+            **{k: v for k, v in sale_info.items() if k not in ("cached", "stale")},
+            "first_seen": existing.get("first_seen", seen),
+            "last_seen": max(seen, existing.get("last_seen") or ""),
         }
 
-    def mark_inactive(self, store_name: str) -> None:
-        """Mark a store's sale as inactive (sale has ended)."""
+    def mark_inactive(self, store_name: str, observed_at: Optional[str] = None) -> None:
+        """Mark a store's sale as inactive (sale has ended), as of ``observed_at`` or now."""
         if store_name in self.state["sales"]:
+            self._dirty_sales.add(store_name)
             self.state["sales"][store_name]["active"] = False
-            self.state["sales"][store_name]["ended"] = datetime.now().isoformat()
+            self.state["sales"][store_name]["ended"] = observed_at or datetime.now().isoformat()
 
     def get_active_sales(self) -> dict:
         """Get all currently active sales."""
@@ -72,6 +286,42 @@ class SaleState:
             if info.get("active", False)
         }
 
+    def record_store(self, store_name: str, sections: dict[str, dict]) -> None:
+        """
+        Record a multi-section store's summary, derived from its section
+        results (each section has its own entry under ``sales``).
+        """
+        active = sorted(name for name, result in sections.items() if result.get("active"))
+        self.state.setdefault("stores", {})[store_name] = {
+            "sections": sorted(sections),
+            "active_sections": active,
+            "active": bool(active),
+            "last_check": datetime.now().isoformat(),
+        }
+        self._dirty_stores.add(store_name)
+
+    def get_stores(self) -> dict:
+        """Get the summary of every multi-section store."""
+        return self.state.get("stores", {})
+
+    def record_duration(self, store_name: str, seconds: float) -> None:
+        """Record how long a store's check took (smoothed over runs)."""
+        durations = self.state.setdefault("durations", {})
+        previous = durations.get(store_name)
+        if previous:
+            seconds = (previous + seconds) / 2
+        durations[store_name] = round(seconds, 2)
+        self._dirty_durations.add(store_name)
+
+    def update_durations(self, durations: dict[str, float]) -> None:
+        """Overwrite recorded durations, e.g. with values from shard jobs."""
+        self.state.setdefault("durations", {}).update(durations)
+        self._dirty_durations.update(durations)
+
+    def get_durations(self) -> dict[str, float]:
+        """Get the recorded check duration per store."""
+        return self.state.get("durations", {})
+
     def get_last_check(self) -> Optional[str]:
         """Get the timestamp of the last check."""
         return self.state.get("last_check")
@@ -0,0 +1,103 @@
+"""Subscriber profiles for checking once and notifying many people."""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+
+class Subscriber:
+    """
+    One person's stores, notification channels and thresholds.
+
+    Secrets can be given directly or, preferably, as the name of an
+    environment variable (``ntfy_topic_env``, ``email_password_env``).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        stores: Optional[list[str]] = None,
+        exclude: Optional[list[str]] = None,
+        state_file: Optional[str] = None,
+        min_discount: Optional[int] = None,
+        ntfy_topic: Optional[str] = None,
+        email_address: Optional[str] = None,
+        email_password: Optional[str] = None,
+    ):
+        self.name = name
+        # None means every store
+        self.stores = {s.lower() for s in stores} if stores else None
+        self.exclude = {s.lower() for s in exclude or []}
+        slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "subscriber"
+        self.state_file = state_file or f"state/{slug}.json"
+        self.min_discount = min_discount
+        self.ntfy_topic = ntfy_topic
+        self.email_address = email_address
+        self.email_password = email_password
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Subscriber":
+        def secret(key: str) -> Optional[str]:
+            if data.get(key):
+                return data[key]
+            env = data.get(f"{key}_env")
+            return os.getenv(env) if env else None
+
+        stores = data.get("stores")
+        return cls(
+            name=data["name"],
+            stores=None if stores in (None, "*", ["*"]) else stores,
+            exclude=data.get("exclude"),
+            state_file=data.get("state_file"),
+            min_discount=data.get("min_discount"),
+            ntfy_topic=secret("ntfy_topic"),
+            email_address=secret("email_address"),
+            email_password=secret("email_password"),
+        )
+
+    def wants(self, store_name: str, parent: Optional[str] = None) -> bool:
+        """
+        Whether this subscriber follows a store.
+
+        Args:
+            store_name: Store or section name, e.g. "H&M Dam"
+            parent: The multi-section store it belongs to, e.g. "H&M";
+                listing (or excluding) the parent covers all its sections
+        """
+        names = {store_name.lower()}
+        if parent:
+            names.add(parent.lower())
+        if names & self.exclude:
+            return False
+        return self.stores is None or bool(names & self.stores)
+
+    def passes(self, sale: dict) -> bool:
+        """Whether a new sale meets this subscriber's thresholds."""
+        if not self.min_discount:
+            return True
+        match = re.search(r"(\d{1,2})\s*%", sale.get("description", ""))
+        return bool(match) and int(match.group(1)) >= self.min_discount
+
+
+def load_subscribers(path: str) -> list[Subscriber]:
+    """
+    Load subscriber profiles.
+
+    The file holds ``{"subscribers": [{"name": ..., "stores": [...],
+    "ntfy_topic_env": ..., ...}]}``. Returns an empty list if the file is
+    missing or invalid.
+    """
+    config = Path(path)
+    if not config.exists():
+        return []
+    try:
+        with open(config, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError) as e:
+        print(f"Failed to load subscribers {path}: {e}")
+        return []
+
+    entries = data.get("subscribers", []) if isinstance(data, dict) else data
+    return [Subscriber.from_dict(e) for e in entries if isinstance(e, dict) and e.get("name")]
@@ -0,0 +1,184 @@
+"""Watchlist rules matched against extracted sale products."""
+
+import json
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .products import Product
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: Optional[str]) -> set[str]:
+    """Lowercase word tokens of a string."""
+    return set(_TOKEN_RE.findall(text.lower())) if text else set()
+
+
+class WatchRule:
+    """
+    A single thing to watch for, e.g. "Our Legacy shirts in 48 under 800 kr".
+
+    Every given field must match. ``brand``, ``keywords`` and ``category``
+    are matched as words against the product's name, brand and category.
+    """
+
+    __slots__ = ("name", "brand", "keywords", "category", "size", "max_price", "min_discount", "store", "tokens")
+
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        brand: Optional[str] = None,
+        keywords: Optional[list[str]] = None,
+        category: Optional[str] = None,
+        size: Optional[str] = None,
+        max_price: Optional[float] = None,
+        min_discount: Optional[int] = None,
+        store: Optional[str] = None,
+    ):
+        self.brand = brand
+        self.keywords = keywords or []
+        self.category = category
+        self.size = str(size).lower() if size is not None else None
+        self.max_price = max_price
+        self.min_discount = min_discount
+        self.store = store.lower() if store else None
+        self.tokens = frozenset(
+            tokenize(brand).union(tokenize(category), *(tokenize(k) for k in self.keywords))
+        )
+        self.name = name or self._default_name()
+
+    def _default_name(self) -> str:
+        parts = [self.brand or "", " ".join(self.keywords), self.category or ""]
+        label = " ".join(p for p in parts if p) or "Bevakning"
+        if self.size:
+            label += f" stl {self.size}"
+        if self.max_price:
+            label += f" under {self.max_price:g} kr"
+        if self.min_discount:
+            label += f" {self.min_discount}%+"
+        return label
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "WatchRule":
+        keywords = data.get("keywords") or []
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        return cls(
+            name=data.get("name"),
+            brand=data.get("brand"),
+            keywords=keywords,
+            category=data.get("category"),
+            size=data.get("size"),
+            max_price=data.get("max_price"),
+            min_discount=data.get("min_discount"),
+            store=data.get("store"),
+        )
+
+
+class WatchIndex:
+    """
+    Inverted index over watch rules.
+
+    Rules are indexed by their word tokens (postings). Every posting list,
+    and the list of rules without tokens, is sorted by the rule's
+    ``max_price``, so a product priced p only visits the tail of each list
+    whose price limit is at least p, found by bisection.
+    """
+
+    def __init__(self, rules: Iterable[WatchRule]):
+        self.rules = list(rules)
+
+        # Rank of each rule by price limit (no limit ranks last)
+        order = sorted(
+            range(len(self.rules)),
+            key=lambda i: self.rules[i].max_price if self.rules[i].max_price is not None else float("inf"),
+        )
+        self.price_limits = [
+            self.rules[i].max_price if self.rules[i].max_price is not None else float("inf")
+            for i in order
+        ]
+
+        postings: dict[str, list[int]] = defaultdict(list)
+        untokenized: list[int] = []
+        for rank, idx in enumerate(order):
+            rule = self.rules[idx]
+            for token in rule.tokens:
+                postings[token].append(rank)
+            if not rule.tokens:
+                untokenized.append(rank)
+        # Postings hold price ranks in ascending order; map back through order
+        self.order = order
+        self.postings: dict[str, list[int]] = dict(postings)
+        self.untokenized = untokenized
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def match(self, product: Product, store_name: Optional[str] = None) -> list[WatchRule]:
+        """Return the rules a single product satisfies."""
+        tokens = tokenize(product.name) | tokenize(product.brand) | tokenize(product.category)
+
+        min_rank = bisect_left(self.price_limits, product.price) if product.price else 0
+        hits: dict[int, int] = defaultdict(int)
+        for token in tokens:
+            ranks = self.postings.get(token)
+            if ranks:
+                for rank in ranks[bisect_left(ranks, min_rank):]:
+                    hits[rank] += 1
+
+        candidates = [
+            self.order[rank] for rank, n in hits.items() if n == len(self.rules[self.order[rank]].tokens)
+        ]
+        candidates.extend(self.order[rank] for rank in self.untokenized[bisect_left(self.untokenized, min_rank):])
+
+        store = store_name.lower() if store_name else None
+        sizes = None
+        if product.sizes:
+            sizes = {s.lower() for s in product.sizes}.union(*(tokenize(s) for s in product.sizes))
+        matched = []
+        for idx in sorted(candidates):
+            rule = self.rules[idx]
+            if rule.min_discount and product.discount < rule.min_discount:
+                continue
+            if rule.store and rule.store != store:
+                continue
+            # Products without size data are not ruled out on size
+            if rule.size and sizes is not None and rule.size not in sizes:
+                continue
+            matched.append(rule)
+        return matched
+
+    def match_many(
+        self, products: Iterable[Product], store_name: Optional[str] = None
+    ) -> list[tuple[WatchRule, Product]]:
+        """Match a batch of products, e.g. the new and repriced ones from a diff."""
+        return [
+            (rule, product)
+            for product in products
+            for rule in self.match(product, store_name)
+        ]
+
+
+def load_watchlist(path: str) -> Optional[WatchIndex]:
+    """
+    Load and compile a watchlist file.
+
+    The file holds ``{"rules": [{"brand": ..., "keywords": [...],
+    "category": ..., "size": ..., "max_price": ..., "min_discount": ...,
+    "store": ...}]}``. Returns None if the file is missing or invalid.
+    """
+    watch_file = Path(path)
+    if not watch_file.exists():
+        return None
+    try:
+        with open(watch_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError) as e:
+        print(f"Failed to load watchlist {path}: {e}")
+        return None
+
+    rules = data.get("rules", []) if isinstance(data, dict) else data
+    return WatchIndex(WatchRule.from_dict(r) for r in rules if isinstance(r, dict))
@@ -0,0 +1,316 @@
+"""Job queue for checking stores on several machines or containers."""
+
+import json
+import os
+import socket
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class Job:
+    """A leased store check."""
+
+    __slots__ = ("id", "run_id", "store", "attempts")
+
+    def __init__(self, id: int, run_id: str, store: str, attempts: int):
+        self.id = id
+        self.run_id = run_id
+        self.store = store
+        self.attempts = attempts
+
+
+class WorkQueue(ABC):
+    """
+    Interface of a store-check queue.
+
+    The coordinator calls :meth:`put`, then :meth:`take_results` until
+    :meth:`pending` is zero, and :meth:`close_run` if it gives up first.
+    Workers call :meth:`lease`, keep the lease alive with
+    :meth:`heartbeat` and finish with :meth:`complete` or :meth:`fail`. A
+    lease that isn't renewed in time expires and the job is handed to the
+    next worker.
+    """
+
+    @abstractmethod
+    def put(self, run_id: str, stores: list[str]) -> None:
+        """Queue a check of each store for a run."""
+
+    @abstractmethod
+    def lease(self, worker: str) -> Optional[Job]:
+        """Take the next queued job of an open run, or None if there is none."""
+
+    @abstractmethod
+    def heartbeat(self, job: Job, worker: str) -> bool:
+        """Extend a lease; False if the job was taken away from this worker."""
+
+    @abstractmethod
+    def complete(self, job: Job, worker: str, result: dict) -> bool:
+        """Store a job's result; False if this worker no longer holds the job."""
+
+    @abstractmethod
+    def fail(self, job: Job, worker: str, error: str) -> None:
+        """Give a job back for another attempt, or fail it."""
+
+    @abstractmethod
+    def requeue_expired(self) -> int:
+        """Requeue jobs whose lease expired; returns how many."""
+
+    @abstractmethod
+    def take_results(self, run_id: str) -> list[tuple[str, dict, float]]:
+        """Finished jobs not taken before, as ``(store, result, seconds)``."""
+
+    @abstractmethod
+    def pending(self, run_id: str) -> int:
+        """Jobs of a run whose results haven't been taken yet."""
+
+    @abstractmethod
+    def close_run(self, run_id: str) -> int:
+        """Cancel a run's unfinished jobs so no worker picks them up; returns how many."""
+
+    @abstractmethod
+    def worker_stats(self) -> list[dict]:
+        """Per-worker totals."""
+
+
+def default_worker_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class SQLiteQueue(WorkQueue):
+    """
+    Work queue in a local SQLite file.
+
+    Every operation runs in its own short ``BEGIN IMMEDIATE`` transaction,
+    so any number of worker processes can lease jobs without handing one
+    job to two workers. The file is opened in WAL mode, which needs shared
+    memory between the processes: all of them must run on the host that
+    holds the file (containers sharing a local volume are fine), never on
+    a network filesystem. Workers on other machines need another
+    :class:`WorkQueue` backend.
+
+    Args:
+        path: Database file
+        lease_seconds: How long a lease lasts without a heartbeat
+        max_attempts: Leases per job before it is given up as failed
+    """
+
+    def __init__(self, path: str = "queue.db", lease_seconds: float = 180, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_id TEXT NOT NULL,
+                    store TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    worker TEXT,
+                    lease_until REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    started REAL,
+                    finished REAL,
+                    taken INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+                CREATE INDEX IF NOT EXISTS jobs_run ON jobs (run_id, status);
+                CREATE TABLE IF NOT EXISTS workers (
+                    name TEXT PRIMARY KEY,
+                    jobs_done INTEGER NOT NULL DEFAULT 0,
+                    jobs_failed INTEGER NOT NULL DEFAULT 0,
+                    busy_seconds REAL NOT NULL DEFAULT 0,
+                    first_seen REAL,
+                    last_seen REAL
+                );
+                """
+            )
+        finally:
+            db.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+        finally:
+            db.close()
+
+    def _seen(self, db: sqlite3.Connection, worker: str, now: float) -> None:
+        db.execute(
+            "INSERT INTO workers (name, first_seen, last_seen) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET last_seen = excluded.last_seen",
+            (worker, now, now),
+        )
+
+    def _requeue_expired(self, db: sqlite3.Connection, now: float) -> int:
+        requeued = db.execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL, lease_until = NULL "
+            "WHERE status = 'leased' AND lease_until < ? AND attempts < ?",
+            (now, self.max_attempts),
+        ).rowcount
+        db.execute(
+            "UPDATE jobs SET status = 'failed', error = 'Lease expired', finished = ? "
+            "WHERE status = 'leased' AND lease_until < ?",
+            (now, now),
+        )
+        return requeued
+
+    def put(self, run_id: str, stores: list[str]) -> None:
+        with self._transaction() as db:
+            db.executemany(
+                "INSERT INTO jobs (run_id, store) VALUES (?, ?)", [(run_id, store) for store in stores]
+            )
+
+    def lease(self, worker: str) -> Optional[Job]:
+        now = time.time()
+        with self._transaction() as db:
+            self._seen(db, worker, now)
+            self._requeue_expired(db, now)
+            row = db.execute(
+                "SELECT id, run_id, store, attempts FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE jobs SET status = 'leased', worker = ?, lease_until = ?, "
+                "attempts = attempts + 1, started = ? WHERE id = ?",
+                (worker, now + self.lease_seconds, now, row[0]),
+            )
+        return Job(row[0], row[1], row[2], row[3] + 1)
+
+    def heartbeat(self, job: Job, worker: str) -> bool:
+        now = time.time()
+        with self._transaction() as db:
+            self._seen(db, worker, now)
+            return db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (now + self.lease_seconds, job.id, worker),
+            ).rowcount == 1
+
+    def complete(self, job: Job, worker: str, result: dict) -> bool:
+        """Store a job's result; False if the lease was lost and the job went to another worker."""
+        now = time.time()
+        with self._transaction() as db:
+            self._seen(db, worker, now)
+            updated = db.execute(
+                "UPDATE jobs SET status = 'done', result = ?, finished = ?, lease_until = NULL "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (json.dumps(result, ensure_ascii=False), now, job.id, worker),
+            ).rowcount == 1
+            if updated:
+                db.execute(
+                    "UPDATE workers SET jobs_done = jobs_done + 1, "
+                    "busy_seconds = busy_seconds + (? - (SELECT started FROM jobs WHERE id = ?)) "
+                    "WHERE name = ?",
+                    (now, job.id, worker),
+                )
+        return updated
+
+    def fail(self, job: Job, worker: str, error: str) -> None:
+        """Give a job back for another attempt, or fail it after ``max_attempts``."""
+        now = time.time()
+        with self._transaction() as db:
+            self._seen(db, worker, now)
+            status = "queued" if job.attempts < self.max_attempts else "failed"
+            db.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, lease_until = NULL, error = ?, "
+                "finished = CASE WHEN ? = 'failed' THEN ? END "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (status, error, status, now, job.id, worker),
+            )
+            db.execute("UPDATE workers SET jobs_failed = jobs_failed + 1 WHERE name = ?", (worker,))
+
+    def requeue_expired(self) -> int:
+        with self._transaction() as db:
+            return self._requeue_expired(db, time.time())
+
+    def take_results(self, run_id: str) -> list[tuple[str, dict, float]]:
+        with self._transaction() as db:
+            rows = db.execute(
+                "SELECT id, store, status, result, error, started, finished FROM jobs "
+                "WHERE run_id = ? AND status IN ('done', 'failed') AND taken = 0 ORDER BY id",
+                (run_id,),
+            ).fetchall()
+            db.executemany("UPDATE jobs SET taken = 1 WHERE id = ?", [(row[0],) for row in rows])
+
+        results = []
+        for _, store, status, result, error, started, finished in rows:
+            if status == "done":
+                results.append((store, json.loads(result), (finished or 0) - (started or 0)))
+            else:
+                results.append((store, {"active": False, "store_name": store, "error": error}, 0.0))
+        return results
+
+    def pending(self, run_id: str) -> int:
+        """Jobs of a run whose results haven't been taken yet."""
+        with self._transaction() as db:
+            return db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE run_id = ? AND taken = 0",
+                (run_id,),
+            ).fetchone()[0]
+
+    def close_run(self, run_id: str) -> int:
+        """
+        Cancel a run's queued and leased jobs.
+
+        A worker still checking one of them loses its lease: its heartbeat
+        and :meth:`complete` return False and the result is discarded.
+        """
+        with self._transaction() as db:
+            return db.execute(
+                "UPDATE jobs SET status = 'cancelled', worker = NULL, lease_until = NULL, "
+                "error = 'Run closed', finished = ?, taken = 1 "
+                "WHERE run_id = ? AND status IN ('queued', 'leased')",
+                (time.time(), run_id),
+            ).rowcount
+
+    def worker_stats(self) -> list[dict]:
+        """Per-worker totals: jobs done and failed, busy time and jobs per minute."""
+        with self._transaction() as db:
+            rows = db.execute(
+                "SELECT name, jobs_done, jobs_failed, busy_seconds, first_seen, last_seen "
+                "FROM workers ORDER BY name"
+            ).fetchall()
+        stats = []
+        for name, done, failed, busy, first_seen, last_seen in rows:
+            active = max((last_seen or 0) - (first_seen or 0), busy, 1e-9)
+            stats.append(
+                {
+                    "worker": name,
+                    "jobs_done": done,
+                    "jobs_failed": failed,
+                    "busy_seconds": round(busy, 1),
+                    "jobs_per_minute": round(done / active * 60, 2) if done else 0.0,
+                    "last_seen": last_seen,
+                }
+            )
+        return stats
+
+
+def open_queue(spec: str, **options) -> WorkQueue:
+    """
+    Open a work queue from a spec string.
+
+    ``sqlite:///path/queue.db`` or a plain file path opens a
+    :class:`SQLiteQueue`. Other backends implement :class:`WorkQueue`
+    and are added here by scheme.
+    """
+    if spec.startswith("sqlite:///"):
+        return SQLiteQueue(spec[len("sqlite:///"):], **options)
+    if "://" in spec:
+        raise ValueError(f"Unsupported queue backend: {spec.split('://')[0]}")
+    return SQLiteQueue(spec, **options)